@@ -1,9 +1,13 @@
 import streamlit as st
 import platform
 import os
+import time
+
+from doc_core.jobs import JOB_DIR, JobQueue, WorkerPool, QUEUED, RUNNING, DONE, FAILED, share_workers
+from doc_core.ocr.cache import DEFAULT_CACHE_DIR, OcrCache
+from doc_core.ocr.pipeline import remove_old_exports
 
 # Import auxiliary modules
-import utils.image_processing as img_proc
 import utils.ocr_functions as ocr
 import utils.file_handling as file_handler
 import utils.ui_components as ui
@@ -28,6 +32,24 @@ else:
     # For Linux/Mac
     poppler_found = True
 
+# Files OCRed at the same time by the server (for all sessions together)
+CONCURRENT_JOBS = min(4, os.cpu_count() or 2)
+# OCR processes of one running file, so the running files together stay within one process per core
+MAX_JOB_OCR_WORKERS = max(1, (os.cpu_count() or 2) // CONCURRENT_JOBS)
+
+@st.cache_resource
+def get_job_queue():
+    """Starts the OCR worker processes once per server and returns the job queue"""
+    db_path = os.path.join(JOB_DIR, "ocr.sqlite3")
+    # The files of a batch run side by side, a few at a time; each job
+    # spreads its pages over its share of the OCR processes
+    WorkerPool(db_path, workers=CONCURRENT_JOBS).start()
+    # Searchable PDFs are kept as long as the jobs that made them
+    remove_old_exports()
+    return JobQueue(db_path)
+
+job_queue = get_job_queue()
+
 # Application title and description
 ui.render_header()
 
@@ -42,49 +64,107 @@ file_type = st.radio(
 )
 
 # File upload
-uploaded_file = ui.render_file_uploader(file_type)
+uploaded_files = ui.render_file_uploader(file_type)
 
 # OCR settings
-ocr_lang, preprocessing_options = ui.render_sidebar_options()
+ocr_lang, preprocessing_options, performance_options = ui.render_sidebar_options()
+ui.render_cache_stats(OcrCache(DEFAULT_CACHE_DIR))
+
+# Resume the jobs of this browser tab after a refresh or reconnect
+if "ocr_jobs" not in st.session_state and "job" in st.query_params:
+    st.session_state.ocr_jobs = st.query_params.get_all("job")
 
 # Main application logic
-if uploaded_file is not None:
+if uploaded_files:
     # Show file information
-    ui.display_file_info(uploaded_file)
+    ui.display_file_info(uploaded_files)
     
-    # Start OCR process button
+    # Start OCR process button: one background job per file, all running side by side
     if st.button("Start OCR Process"):
-        with st.spinner("Processing file and extracting text..."):
-            try:
-                # Process by file type
-                if file_type == "PDF":
-                    text = ocr.process_pdf(uploaded_file, ocr_lang, preprocessing_options)
-                else:
-                    text = ocr.process_image(uploaded_file, ocr_lang, preprocessing_options)
-                
-                # Create a tab
-                tab1, tab2, tab3 = st.tabs(['Text Output', 'Visual Analysis', 'Download Options'])
-                
-                # Text output tab
-                with tab1:
-                    text = ui.render_text_output_tab(text)
-                
-                # Visual analysis tab
-                with tab2:
+        file_workers = share_workers([f.size for f in uploaded_files], performance_options["ocr_workers"])
+        job_ids = [
+            job_queue.submit(
+                "doc_core.ocr.pipeline:run_ocr_job",
+                {
+                    "file_type": file_type,
+                    "file_name": uploaded_file.name,
+                    "ocr_lang": ocr_lang,
+                    "preprocessing_options": preprocessing_options,
+                    "ocr_workers": min(workers, MAX_JOB_OCR_WORKERS),
+                    "use_text_layer": performance_options["use_text_layer"],
+                    "skip_blank_pages": performance_options["skip_blank_pages"],
+                    "use_ocr_cache": performance_options["use_ocr_cache"],
+                    "render_dpi": performance_options["render_dpi"],
+                    "searchable_pdf": performance_options["searchable_pdf"],
+                    "tesseract_cmd": tesseract_path if platform.system() == "Windows" else None
+                },
+                uploaded_file.getvalue()
+            )
+            for uploaded_file, workers in zip(uploaded_files, file_workers)
+        ]
+        st.session_state.ocr_jobs = job_ids
+        st.query_params["job"] = job_ids
+elif "ocr_jobs" not in st.session_state:
+    st.info("Please upload one or more files for OCR processing.")
+
+# Poll the status of the submitted jobs
+poll_job = False
+if "ocr_jobs" in st.session_state:
+    jobs = [job for job in map(job_queue.get, st.session_state.ocr_jobs) if job is not None]
+    
+    if not jobs:
+        st.warning("The OCR jobs could not be found.")
+        del st.session_state.ocr_jobs
+    else:
+        poll_job = any(job["state"] in (QUEUED, RUNNING) for job in jobs)
+        if len(jobs) > 1:
+            ui.render_batch_status(jobs)
+            ui.render_batch_download(jobs)
+        
+        # Results are shown for one file at a time
+        done_jobs = [job for job in jobs if job["state"] == DONE]
+        if len(jobs) == 1 and jobs[0]["state"] in (QUEUED, RUNNING):
+            ui.render_job_status(jobs[0])
+        elif len(jobs) == 1 and jobs[0]["state"] == FAILED:
+            st.error(f"An error occurred during the OCR process: {jobs[0]['error'].strip().splitlines()[-1]}")
+        elif done_jobs:
+            # Selected by job ID so the choice survives the reruns while other files finish
+            names = {job["id"]: job["payload"]["file_name"] for job in done_jobs}
+            job_id = done_jobs[0]["id"] if len(done_jobs) == 1 else st.selectbox(
+                "Show results for",
+                list(names),
+                format_func=names.get
+            )
+            job = next(job for job in done_jobs if job["id"] == job_id)
+            text = job["result"]["text"]
+            file_name = job["payload"]["file_name"]
+            
+            # Create a tab
+            tab1, tab2, tab3 = st.tabs(['Text Output', 'Visual Analysis', 'Download Options'])
+            
+            # Text output tab
+            with tab1:
+                text = ui.render_text_output_tab(text)
+                ui.render_page_sources(job["result"]["pages"])
+                ui.render_resolution_report(job["result"].get("resolution"))
+                ui.render_language_report(job["result"].get("language"), job["result"]["pages"])
+                ui.render_profile_panel(job["result"].get("profile"), file_name)
+            
+            # Visual analysis tab (needs the uploaded file, which a refresh discards)
+            with tab2:
+                uploaded_file = next((f for f in uploaded_files or [] if f.name == file_name), None)
+                if uploaded_file is not None:
                     ui.render_visual_analysis_tab(
-                        file_type, 
+                        job["payload"]["file_type"], 
                         uploaded_file, 
-                        preprocessing_options
+                        job["payload"]["preprocessing_options"]
                     )
-                
-                # Download options tab
-                with tab3:
-                    ui.render_download_options_tab(text, uploaded_file.name)
-                    
-            except Exception as e:
-                st.error(f"An error occurred during the OCR process: {str(e)}")
-else:
-    st.info("Please upload a file for OCR processing.")
+                else:
+                    st.info("Upload the file again to see the visual analysis.")
+            
+            # Download options tab
+            with tab3:
+                ui.render_download_options_tab(text, file_name, job["result"].get("searchable_pdf"))
 
 # Footer
 st.markdown("---")
@@ -102,4 +182,9 @@ st.markdown("""
             <p style='color: #666; font-size: 14px;'>Thank you for your support!</p>
         </div>
     </div>
-""", unsafe_allow_html=True) 
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Check the running job again after a short pause
+if poll_job:
+    time.sleep(1)
+    st.rerun() 
\ No newline at end of file
@@ -1,7 +1,20 @@
 import io
+import os
+import zipfile
 from docx import Document
 from fpdf import FPDF
 
+# Unicode TrueType fonts tried for PDF export (Linux, Windows, macOS)
+UNICODE_FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+]
+# Without a Unicode font, Turkish letters missing from latin-1 lose their marks instead of becoming '?'
+TURKISH_TO_LATIN1 = str.maketrans("ğĞşŞıİ", "gGsSiI")
+
 def save_as_txt(text):
     """
     Saves text as a TXT file
@@ -33,6 +46,18 @@ def save_as_docx(text):
         output.seek(0)
         return output.read()
 
+def _unicode_font_path():
+    """
+    Finds a TrueType font with Turkish letters for PDF export
+    
+    Returns:
+        str Path of the font, or None when none of the known fonts is installed
+    """
+    for path in UNICODE_FONT_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
 def save_as_pdf(text):
     """
     Saves text as PDF file
@@ -46,18 +71,45 @@ def save_as_pdf(text):
     # PDF creation
     pdf = FPDF()
     pdf.add_page()
-    pdf.set_font("Arial", size=12)
     
-    # Write text to PDF (utf-8 for Turkish characters)
+    # The built-in fonts only cover latin-1, which lacks ğ, ş and ı
+    font_path = _unicode_font_path()
+    if font_path:
+        pdf.add_font("Unicode", "", font_path, uni=True)
+        pdf.set_font("Unicode", size=12)
+    else:
+        pdf.set_font("Arial", size=12)
+        text = text.translate(TURKISH_TO_LATIN1).encode('latin-1', 'replace').decode('latin-1')
+    
     pdf.set_auto_page_break(auto=True, margin=15)
     
-    # Divide the text into lines
-    lines = text.split('\n')
-    for line in lines:
-        # Encode/decode to support Turkish characters
-        pdf.cell(0, 10, line.encode('latin-1', 'replace').decode('latin-1'), ln=True)
+    # One paragraph per line; long lines wrap instead of running off the page
+    for line in text.split('\n'):
+        pdf.multi_cell(0, 6, line)
     
     # Convert PDF to byte array
+    return pdf.output(dest='S').encode('latin-1')
+
+def save_as_zip(texts):
+    """
+    Saves the texts of several files as TXT files in one ZIP archive
+    
+    Args:
+        texts List of (file name, text) pairs
+    
+    Returns:
+        bytes ZIP file contents
+    """
+    names = set()
     with io.BytesIO() as output:
-        pdf.output(output)
-        return output.getvalue() 
\ No newline at end of file
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+            for file_name, text in texts:
+                # Files with the same name in different uploads get a number
+                stem = os.path.splitext(file_name)[0]
+                name, n = f"{stem}.txt", 1
+                while name in names:
+                    n += 1
+                    name = f"{stem} ({n}).txt"
+                names.add(name)
+                archive.writestr(name, save_as_txt(text))
+        return output.getvalue()
@@ -1,12 +1,14 @@
 import streamlit as st
 import os
-import tempfile
-from PIL import Image
-import platform
 
-from utils.file_handling import save_as_txt, save_as_docx, save_as_pdf
-from utils.image_processing import preprocess_image
-import pdf2image
+from utils.file_handling import save_as_txt, save_as_docx, save_as_pdf, save_as_zip
+from utils.ocr_functions import get_page_store
+from doc_core.ocr.engine import backend_name
+from doc_core.ocr.image_processing import preprocess_image
+from doc_core.ocr.language import AUTO_LANG
+from doc_core.ocr.profiling import page_totals, stage_totals, to_json, to_prometheus
+from doc_core.ocr.rendering import PREVIEW_DPI
+from doc_core.ocr.resolution import AUTO_DPI, PROBE_DPI
 
 def render_header():
     """Creates the main title and description"""
@@ -23,11 +25,11 @@ def show_poppler_status(poppler_found, poppler_path):
             st.info("Please install Poppler and set the correct path.")
 
 def render_file_uploader(file_type):
-    """Creates the file upload area"""
+    """Creates the file upload area; several files can be uploaded at once"""
     if file_type == "PDF":
-        return st.file_uploader("Upload PDF file", type=["pdf"])
+        return st.file_uploader("Upload PDF files", type=["pdf"], accept_multiple_files=True)
     else:
-        return st.file_uploader("Upload image file", type=["jpg", "jpeg", "png", "tiff"])
+        return st.file_uploader("Upload image files", type=["jpg", "jpeg", "png", "tiff"], accept_multiple_files=True)
 
 def render_sidebar_options():
     """Generates side panel options"""
@@ -37,45 +39,172 @@ def render_sidebar_options():
         # Dil seçimi
         ocr_lang = st.selectbox(
             "OCR Languages",
-            options=["tur+eng", "tur", "eng"],
+            options=[AUTO_LANG, "tur+eng", "tur", "eng"],
             format_func=lambda x: {
+                AUTO_LANG: "Automatic (detect per document)",
                 "tur+eng": "Turkish + English",
                 "tur": "Turkish only",
                 "eng": "English only"
             }[x],
-            index=0
+            index=0,
+            help="Automatic reads a few pages at low resolution and loads only the language models the text needs"
         )
         
         # Image preprocessing options
         st.subheader("Image Preprocessing")
         apply_threshold = st.checkbox("Apply Thresholding", value=False, 
                                      help="Apply black-and-white thresholding to make text easier to distinguish")
-        threshold_value = st.slider("Threshold Value", 0, 255, 128) if apply_threshold else 128
+        threshold_method = st.selectbox(
+            "Threshold Method",
+            options=["fixed", "otsu", "sauvola"],
+            format_func=lambda x: {
+                "fixed": "Fixed value",
+                "otsu": "Otsu (automatic global)",
+                "sauvola": "Sauvola (adaptive, for uneven lighting)"
+            }[x]
+        ) if apply_threshold else "fixed"
+        threshold_value = st.slider("Threshold Value", 0, 255, 128) if apply_threshold and threshold_method == "fixed" else 128
+        
+        denoise = st.checkbox("Remove Noise", value=False,
+                              help="3x3 median filter against specks and scanner noise")
+        deskew = st.checkbox("Straighten Skewed Pages", value=False,
+                             help="Rotate pages so text lines are horizontal (up to 5 degrees)")
+        auto_crop = st.checkbox("Crop Blank Margins", value=False,
+                                help="Smaller images are recognized faster")
+        
+        render_dpi = st.selectbox(
+            "PDF Render Resolution",
+            options=[AUTO_DPI, 150, 200, 300],
+            format_func=lambda x: "Automatic (from text size)" if x == AUTO_DPI else f"{x} DPI",
+            index=0,
+            help="Automatic renders each PDF at the smallest resolution that gives Tesseract readable text"
+        )
         
         apply_resize = st.checkbox("Resize", value=False,
-                                  help="Can improve OCR accuracy by resizing the image")
+                                  help="Can improve OCR accuracy by resizing the image (ignored for PDFs with automatic resolution)")
         scale_factor = st.slider("Dimension Multiplier", 1.0, 3.0, 1.5, 0.1) if apply_resize else 1.0
         
         # Collect options in a dictionary
         preprocessing_options = {
             'apply_threshold': apply_threshold,
+            'threshold_method': threshold_method,
             'threshold_value': threshold_value,
+            'denoise': denoise,
+            'deskew': deskew,
+            'auto_crop': auto_crop,
             'apply_resize': apply_resize,
             'scale_factor': scale_factor
         }
         
-        return ocr_lang, preprocessing_options
+        # Performance options
+        st.subheader("Performance")
+        cpu_count = os.cpu_count() or 1
+        ocr_workers = st.slider("Parallel OCR Processes", 1, cpu_count, max(1, cpu_count // 2),
+                                help="Number of pages recognized at the same time (one Tesseract thread each)")
+        
+        use_text_layer = st.checkbox("Use Embedded PDF Text", value=True,
+                                     help="Read pages that already contain text directly and OCR only scanned pages")
+        
+        st.caption(f"OCR engine: {backend_name()}"
+                   + ("" if backend_name() == "tesserocr" else " (install tesserocr for faster in-process OCR)"))
+        
+        skip_blank_pages = st.checkbox("Skip Blank Pages", value=True,
+                                       help="Do not OCR separator pages, blank backs and pages with only a stamp")
+        
+        use_ocr_cache = st.checkbox("Use OCR Cache", value=True,
+                                    help="Reuse the text of pages that were already OCRed with the same settings")
+        
+        searchable_pdf = st.checkbox("Create Searchable PDF", value=False,
+                                     help="Write the page images with an invisible text layer while OCR runs")
+        
+        performance_options = {
+            'render_dpi': render_dpi,
+            'ocr_workers': ocr_workers,
+            'use_text_layer': use_text_layer,
+            'skip_blank_pages': skip_blank_pages,
+            'use_ocr_cache': use_ocr_cache,
+            'searchable_pdf': searchable_pdf
+        }
+        
+        return ocr_lang, preprocessing_options, performance_options
+
+def render_cache_stats(cache):
+    """Shows the OCR cache counters in the side panel and offers to clear the cache"""
+    stats = cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    
+    with st.sidebar:
+        with st.expander("OCR Cache"):
+            col1, col2 = st.columns(2)
+            col1.metric("Hits", stats["hits"])
+            col2.metric("Misses", stats["misses"])
+            if lookups:
+                st.caption(f"Hit rate: {stats['hits'] / lookups:.0%}")
+            st.caption(f"Pages updated line by line after a settings change: {stats['partial']}")
+            st.caption(f"{stats['entries']} pages cached, {stats['size_bytes'] / 1024:.1f} KB")
+            
+            if st.button("Clear OCR Cache"):
+                cache.clear()
+                st.rerun()
 
-def display_file_info(uploaded_file):
+def display_file_info(uploaded_files):
     """Shows file information"""
-    file_details = {
-        "File Name": uploaded_file.name,
-        "Dosya File Size": f"{uploaded_file.size / 1024:.2f} KB"
-    }
+    st.write(f"**Uploaded File Information:** {len(uploaded_files)} file(s), "
+             f"{sum(f.size for f in uploaded_files) / 1024:.2f} KB in total")
+    for uploaded_file in uploaded_files:
+        st.write(f"- {uploaded_file.name}: {uploaded_file.size / 1024:.2f} KB")
+
+def render_job_status(job):
+    """Shows the progress of a queued or running OCR job"""
+    if job["state"] == "queued":
+        st.info("Waiting for a free OCR worker...")
+    st.progress(job["progress"], text=job["message"] or "Processing file and extracting text...")
+    st.caption(f"Job ID: {job['id']} - you can refresh this page, the job keeps running.")
+
+def render_batch_status(jobs):
+    """Shows one progress line per file of a batch of OCR jobs"""
+    finished = sum(job["state"] in ("done", "failed") for job in jobs)
+    st.subheader(f"Files ({finished}/{len(jobs)} finished)")
+    
+    for job in jobs:
+        name = job["payload"]["file_name"]
+        if job["state"] == "done":
+            st.progress(1.0, text=f"✅ {name}")
+        elif job["state"] == "failed":
+            st.progress(job["progress"], text=f"❌ {name}: {job['error'].strip().splitlines()[-1]}")
+        elif job["state"] == "queued":
+            st.progress(0.0, text=f"{name}: waiting for a free OCR worker...")
+        else:
+            st.progress(job["progress"], text=f"{name}: {job['message'] or 'processing...'}")
     
-    st.write("**Uploaded File Information:**")
-    for k, v in file_details.items():
-        st.write(f"- {k}: {v}")
+    if finished < len(jobs):
+        st.caption("You can refresh this page, the jobs keep running.")
+
+def render_batch_download(jobs):
+    """
+    Offers the texts of all finished files of a batch as one ZIP file
+
+    The ZIP is built once the whole batch has finished and kept for the
+    session, so reruns do not compress the texts again.
+    """
+    if any(job["state"] in ("queued", "running") for job in jobs):
+        return
+    done = [job for job in jobs if job["state"] == "done"]
+    if len(done) < 2:
+        return
+    
+    job_ids = [job["id"] for job in done]
+    cached = st.session_state.get("batch_zip")
+    if cached is None or cached[0] != job_ids:
+        cached = (job_ids, save_as_zip([(job["payload"]["file_name"], job["result"]["text"]) for job in done]))
+        st.session_state.batch_zip = cached
+    zip_data = cached[1]
+    st.download_button(
+        label=f"Download all texts as ZIP ({len(done)} files)",
+        data=zip_data,
+        file_name="ocr_results.zip",
+        mime="application/zip"
+    )
 
 def render_text_output_tab(text):
     """Creates the text output tab"""
@@ -101,6 +230,102 @@ def render_text_output_tab(text):
     
     return text
 
+def render_page_sources(pages):
+    """Shows how many pages were read from the text layer, OCRed or skipped as blank"""
+    text_layer_pages = [page["page"] for page in pages if page["source"] == "text_layer"]
+    ocr_pages = [page["page"] for page in pages if page["source"] == "ocr"]
+    blank_pages = [page["page"] for page in pages if page["source"] == "blank"]
+    
+    st.subheader("Page Sources")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("From Embedded Text", len(text_layer_pages))
+    col2.metric("OCR", len(ocr_pages))
+    col3.metric("Skipped (Blank)", len(blank_pages))
+    
+    with st.expander("Pages per source"):
+        st.write(f"**Embedded text:** {', '.join(map(str, text_layer_pages)) or '-'}")
+        st.write(f"**OCR:** {', '.join(map(str, ocr_pages)) or '-'}")
+        st.write(f"**Skipped as blank:** {', '.join(map(str, blank_pages)) or '-'}")
+
+def render_resolution_report(resolution):
+    """Shows the render resolution chosen for a PDF and the pixels it saved"""
+    if not resolution or resolution.get("x_height") is None:
+        return
+    
+    st.subheader("Render Resolution")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Render DPI", resolution["dpi"])
+    col2.metric("Measured x-height", f"{resolution['x_height']:.0f} px @ {PROBE_DPI} DPI")
+    baseline = resolution["pixels"] + resolution["pixels_saved"]
+    change = f"{resolution['pixels_saved'] / baseline:.0%}" if baseline else None
+    col3.metric("Pixels Saved", f"{resolution['pixels_saved'] / 1e6:.1f} Mpx", change)
+
+def render_language_report(language, pages):
+    """Shows which OCR languages were used and the time the language detection saved"""
+    if not language:
+        return
+    
+    names = {"tur": "Turkish", "eng": "English"}
+    st.subheader("OCR Language")
+    col1, col2 = st.columns(2)
+    col1.metric("Languages Used", " + ".join(names.get(lang, lang) for lang in language["lang"].split("+")))
+    seconds_saved = sum(page.get("seconds_saved", 0.0) for page in pages)
+    col2.metric("Time Saved (estimated)", f"{seconds_saved:.1f} s")
+    
+    if language["shares"]:
+        shares = ", ".join(f"{names.get(lang, lang)} {share:.0%}" for lang, share in language["shares"].items())
+        st.caption(f"Detected from a low-resolution probe in {language['probe_seconds']:.1f} s (words: {shares}); "
+                   f"the chosen models read the probe {language['speedup']:.1f}x faster than {language['candidates']}.")
+        with st.expander("Language per page"):
+            for page in pages:
+                if page.get("lang"):
+                    st.write(f"**Page {page['page']}:** {page['lang']}, {page['seconds_saved']:.2f} s saved")
+
+def _profile_rows(totals, key_name):
+    """Table rows of stage or page totals"""
+    return [
+        {key_name: key, "Runs": total["count"], "Wall (s)": round(total["wall_seconds"], 3),
+         "CPU (s)": round(total["cpu_seconds"], 3),
+         "Peak memory (MB)": round(total["peak_memory_mb"]) if total["peak_memory_mb"] is not None else None}
+        for key, total in totals.items()
+    ]
+
+def render_profile_panel(profile, filename):
+    """Shows the wall time, CPU time and peak memory of each OCR stage and page, with JSON and Prometheus exports"""
+    if not profile:
+        return
+    
+    with st.expander("Performance Profile"):
+        st.caption("Stage CPU time is that of the thread running the stage; the 'document' row covers the whole worker "
+                   "process, including Tesseract and Poppler, and has its peak memory. Rendering overlaps with OCR, so "
+                   "'render' is the time OCR waited for a page.")
+        st.write("**Per stage**")
+        st.dataframe(_profile_rows(stage_totals(profile), "Stage"), use_container_width=True, hide_index=True)
+        pages = page_totals(profile)
+        if pages:
+            st.write("**Per page**")
+            st.dataframe(_profile_rows(pages, "Page"), use_container_width=True, hide_index=True)
+        
+        stem = filename.split('.')[0]
+        col1, col2 = st.columns(2)
+        col1.download_button(
+            label="Download as JSON",
+            data=to_json(profile),
+            file_name=f"{stem}_profile.json",
+            mime="application/json"
+        )
+        col2.download_button(
+            label="Download as Prometheus metrics",
+            data=to_prometheus(profile, {"file": filename}),
+            file_name=f"{stem}_profile.prom",
+            mime="text/plain"
+        )
+
+def render_preprocessing_timings(timings):
+    """Shows how long each preprocessing operation took on the previewed image"""
+    if timings:
+        st.caption("Preprocessing time: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()))
+
 def render_visual_analysis_tab(file_type, uploaded_file, preprocessing_options):
     """Creates the visual analysis tab"""
     st.subheader("Processed Image Examples")
@@ -108,123 +333,103 @@ def render_visual_analysis_tab(file_type, uploaded_file, preprocessing_options):
     if file_type == "PDF":
         st.write("Select page to see image preprocessing results:")
         
-        # Convert PDF back to images (first 5 pages only)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_pdf:
-            temp_pdf.write(uploaded_file.getvalue())
-            temp_pdf_path = temp_pdf.name
+        # Pages come from the session's page store, which keeps recent previews
+        store = get_page_store(uploaded_file, is_pdf=True)
         
         try:
-            if platform.system() == "Windows":
-                poppler_path = r'C:\\Program Files\\poppler-24.08.0\\Library\bin'
-                try:
-                    if os.path.exists(poppler_path):
-                        all_images = pdf2image.convert_from_path(temp_pdf_path, poppler_path=poppler_path)
-                    else:
-                        raise Exception("Poppler path not found")
-                except Exception as e:
-                    st.error(f"Error converting PDF to image: {str(e)}")
-                    st.warning("Alternative methods are being tested...")
-                    if os.path.exists(poppler_path):
-                        all_images = pdf2image.convert_from_bytes(
-                            uploaded_file.getvalue(),
-                            poppler_path=poppler_path
-                        )
-                    else:
-                        raise Exception("Poppler path not found")
-            else:
-                try:
-                    all_images = pdf2image.convert_from_path(temp_pdf_path)
-                except Exception as e:
-                    st.error(f"Error converting PDF to image: {str(e)}")
-                    st.warning("Alternative methods are being tested...")
-                    all_images = pdf2image.convert_from_bytes(uploaded_file.getvalue())
-                
-            # Show up to 5 pages
-            images = all_images[:5]
+            page_count = store.page_count()
+            selected_page = st.number_input("Select Page", min_value=1, max_value=page_count, value=1)
             
-            if os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
-            
-            selected_page = st.selectbox("Select Page", range(1, len(images) + 1))
+            # Only the selected page is rendered, at preview resolution
+            with st.spinner("Rendering page..."):
+                image = store.image(selected_page - 1, PREVIEW_DPI)
             
             # Show original and processed images
             orig_col, proc_col = st.columns(2)
             
             with orig_col:
                 st.write("Original Image")
-                selected_img = images[selected_page - 1]
-                st.image(selected_img, use_column_width=True)
+                st.image(image, use_column_width=True)
             
             with proc_col:
                 st.write("Processed Image")
-                processed_img = preprocess_image(images[selected_page - 1], preprocessing_options)
+                timings = {}
+                processed_img = preprocess_image(image, preprocessing_options, timings)
                 st.image(processed_img, use_column_width=True)
+                render_preprocessing_timings(timings)
                 
         except Exception as e:
             st.error(f"Error processing images: {str(e)}")
-            if os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
     else:
         # Operation for image file
         st.write("Image preprocessing results:")
         
         try:
-            # Write the image to a temporary file and upload it again
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as temp_img:
-                temp_img.write(uploaded_file.getvalue())
-                temp_img_path = temp_img.name
+            # Decoded once per upload and shared with OCR
+            image = get_page_store(uploaded_file, is_pdf=False).image()
             
-            try:
-                # Upload image
-                image = Image.open(temp_img_path)
-                
-                # Show original and processed images
-                orig_col, proc_col = st.columns(2)
-                
-                with orig_col:
-                    st.write("Original Image")
-                    st.image(image, use_column_width=True)
-                
-                with proc_col:
-                    st.write("Processed Image")
-                    processed_img = preprocess_image(image, preprocessing_options)
-                    st.image(processed_img, use_column_width=True)
-            finally:
-                # Clear temporary file
-                if os.path.exists(temp_img_path):
-                    os.unlink(temp_img_path)
+            # Show original and processed images
+            orig_col, proc_col = st.columns(2)
+            
+            with orig_col:
+                st.write("Original Image")
+                st.image(image, use_column_width=True)
+            
+            with proc_col:
+                st.write("Processed Image")
+                timings = {}
+                processed_img = preprocess_image(image, preprocessing_options, timings)
+                st.image(processed_img, use_column_width=True)
+                render_preprocessing_timings(timings)
                 
         except Exception as e:
             st.error(f"Error processing the image: {str(e)}")
 
-def render_download_options_tab(text, filename):
-    """İndirme seçenekleri Creates the download options tab oluşturur"""
+# Export formats built from the text: file name suffix and MIME type
+EXPORT_FORMATS = {
+    "TXT": (".txt", "text/plain"),
+    "DOCX": (".docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    "PDF": ("_metin.pdf", "application/pdf"),
+}
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_export(text, export_format):
+    """Builds an export file once per text and format; reruns reuse the result"""
+    if export_format == "DOCX":
+        return save_as_docx(text)
+    if export_format == "PDF":
+        return save_as_pdf(text)
+    return save_as_txt(text)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def read_export(path):
+    """Reads an export file written by an OCR job"""
+    with open(path, "rb") as f:
+        return f.read()
+
+def render_download_options_tab(text, filename, searchable_pdf=None):
+    """Creates the download options tab; only the chosen format is built, and only once"""
     st.subheader("Download Options")
-    col1, col2, col3 = st.columns(3)
     
-    with col1:
-        txt_data = save_as_txt(text)
-        st.download_button(
-            label="Download as TXT",
-            data=txt_data,
-            file_name=f"{filename.split('.')[0]}.txt",
-            mime="text/plain"
-        )
+    formats = list(EXPORT_FORMATS)
+    if searchable_pdf and os.path.exists(searchable_pdf):
+        formats.append("Searchable PDF")
+    export_format = st.radio("Format", formats, horizontal=True,
+                             help="Searchable PDF: the original pages with the recognized text as an invisible, "
+                                  "selectable layer (enable it in the sidebar before starting OCR)")
     
-    with col2:
-        docx_data = save_as_docx(text)
-        st.download_button(
-            label="Download as DOCX",
-            data=docx_data,
-            file_name=f"{filename.split('.')[0]}.docx",
-            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        )
+    stem = filename.split('.')[0]
+    if export_format == "Searchable PDF":
+        data, file_name, mime = read_export(searchable_pdf), f"{stem}_searchable.pdf", "application/pdf"
+    else:
+        suffix, mime = EXPORT_FORMATS[export_format]
+        with st.spinner(f"Preparing {export_format}..."):
+            data = build_export(text, export_format)
+        file_name = stem + suffix
     
-    with col3:
-        pdf_data = save_as_pdf(text)
-        st.download_button(
-            label="Download as PDF",
-            data=pdf_data,
-            file_name=f"{filename.split('.')[0]}_metin.pdf",
-            mime="application/pdf"
-        ) 
\ No newline at end of file
+    st.download_button(
+        label=f"Download as {export_format}",
+        data=data,
+        file_name=file_name,
+        mime=mime
+    )
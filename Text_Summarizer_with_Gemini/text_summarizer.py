@@ -1,5 +1,4 @@
 import streamlit as st
-import PyPDF2
 import docx
 import google.generativeai as genai
 import nltk
@@ -7,6 +6,8 @@ import io
 import os
 from dotenv import load_dotenv
 
+from doc_core.pdf_text import extract_pdf_text
+
 # Download required NLTK data
 nltk.download('punkt')
 
@@ -28,10 +29,13 @@ st.markdown("Upload your PDF,TXT, DOCX, or DOC files and generate automatic summ
 uploaded_file = st.file_uploader("Upload your file here", type=['pdf', 'txt', 'docx', 'doc'])
 
 def extract_text_from_pdf(file):
-    pdf_reader = PyPDF2.PdfReader(file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text()
+    progress_bar = st.progress(0.0, text="Reading PDF pages...")
+    text = extract_pdf_text(
+        file,
+        separator="",
+        progress_callback=lambda done, total: progress_bar.progress(done / total, text=f"Reading page {done}/{total}...")
+    )
+    progress_bar.empty()
     return text
 
 def extract_text_from_docx(file):
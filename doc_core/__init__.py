@@ -0,0 +1 @@
+# Shared document processing helpers used by the apps in this repository
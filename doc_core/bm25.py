@@ -0,0 +1,202 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+from rank_bm25 import BM25Okapi
+
+
+def simple_tokenize(text):
+    """Lower-cases the text and splits it into word tokens"""
+    return re.findall(r"\w+", text.lower())
+
+
+def split_into_chunks(text, max_chars=1000):
+    """
+    Splits text into chunks of whole paragraphs
+
+    Args:
+        text: Text to split
+        max_chars: Approximate maximum chunk length
+
+    Returns:
+        list: Non-empty text chunks
+    """
+    chunks = []
+    current = []
+    current_len = 0
+    for paragraph in re.split(r"\n\s*\n|\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and current_len + len(paragraph) > max_chars:
+            chunks.append("\n".join(current))
+            current = []
+            current_len = 0
+        current.append(paragraph)
+        current_len += len(paragraph)
+
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def split_into_paragraphs(text):
+    """
+    Groups sentences into short paragraphs of 1-3 sentences
+
+    Args:
+        text: Text to split
+
+    Returns:
+        list: Paragraphs
+    """
+    from nltk.tokenize import sent_tokenize
+
+    paragraphs = []
+    current_paragraph = []
+    for sent in sent_tokenize(text):
+        current_paragraph.append(sent)
+        if len(current_paragraph) >= 3 or len(''.join(current_paragraph)) > 300:
+            paragraphs.append(' '.join(current_paragraph))
+            current_paragraph = []
+
+    # Add the remaining sentences
+    if current_paragraph:
+        paragraphs.append(' '.join(current_paragraph))
+
+    return paragraphs
+
+
+@lru_cache(maxsize=None)
+def _turkish_stopwords(is_query):
+    """Turkish stop words; queries only drop the very short ones"""
+    from nltk.corpus import stopwords
+
+    stop_words = set(stopwords.words('turkish'))
+    if is_query:
+        return frozenset(w for w in stop_words if len(w) < 3)
+    return frozenset(stop_words)
+
+
+def turkish_tokenize(text, is_query=False):
+    """
+    Lower-cases, strips punctuation, tokenizes and removes Turkish stop words
+
+    Args:
+        text: Text to tokenize
+        is_query: Keep longer stop words, which often carry meaning in questions
+
+    Returns:
+        list: Tokens
+    """
+    from nltk.tokenize import word_tokenize
+
+    text = re.sub(r'[^\w\s]', '', text.lower())
+    stop_words = _turkish_stopwords(is_query)
+    return [word for word in word_tokenize(text) if word not in stop_words]
+
+
+def turkish_query_tokenize(text):
+    """Tokenizer for search queries (see turkish_tokenize)"""
+    return turkish_tokenize(text, is_query=True)
+
+
+def index_document(text):
+    """
+    Splits a document into paragraphs and builds a Turkish BM25 index
+
+    Args:
+        text: Document text
+
+    Returns:
+        dict: Index for search_bm25 (use turkish_query_tokenize for queries)
+    """
+    return create_bm25_index(split_into_paragraphs(text), tokenizer=turkish_tokenize)
+
+
+def create_bm25_index(chunks, tokenizer=simple_tokenize):
+    """
+    Creates a BM25 index over text chunks
+
+    Args:
+        chunks: List of text chunks
+        tokenizer: Function turning a text into a list of tokens
+
+    Returns:
+        dict: Index with the BM25 model, the chunks, the tokenizer and the
+            number of chunks each term occurs in
+    """
+    tokenized_chunks = [tokenizer(chunk) or [""] for chunk in chunks]
+    return {
+        "bm25": BM25Okapi(tokenized_chunks) if tokenized_chunks else None,
+        "chunks": chunks,
+        "tokenizer": tokenizer,
+        "term_counts": Counter(term for tokens in tokenized_chunks for term in set(tokens))
+    }
+
+
+def collection_idf(indexes, query_tokens):
+    """
+    IDF weights of query terms over the chunks of several indexes together
+
+    Searching each index with the same weights gives scores that can be
+    compared across indexes, as if all chunks were in one index.
+
+    Args:
+        indexes: Indexes created by create_bm25_index
+        query_tokens: Tokenized search text
+
+    Returns:
+        dict: Non-negative IDF weight per query term
+    """
+    total = sum(len(index["chunks"]) for index in indexes)
+    idf = {}
+    for term in set(query_tokens):
+        count = sum(index["term_counts"].get(term, 0) for index in indexes)
+        idf[term] = math.log((total - count + 0.5) / (count + 0.5) + 1)
+    return idf
+
+
+def _weighted_scores(bm25, query_tokens, idf):
+    """BM25Okapi scores of every chunk with the given IDF weights"""
+    scores = np.zeros(bm25.corpus_size)
+    doc_len = np.array(bm25.doc_len)
+    for term in query_tokens:
+        if not idf.get(term):
+            continue
+        term_freq = np.array([doc.get(term, 0) for doc in bm25.doc_freqs])
+        scores += idf[term] * (term_freq * (bm25.k1 + 1) /
+                               (term_freq + bm25.k1 * (1 - bm25.b + bm25.b * doc_len / bm25.avgdl)))
+    return scores
+
+
+def search_bm25(index, query, top_k=3, query_tokenizer=None, idf=None):
+    """
+    Searches an index and returns the best matching chunks
+
+    Args:
+        index: Index created by create_bm25_index
+        query: Search text
+        top_k: Maximum number of results
+        query_tokenizer: Optional tokenizer for the query (defaults to the index tokenizer)
+        idf: Optional IDF weights from collection_idf (defaults to the index's own)
+
+    Returns:
+        list: Dictionaries with 'text', 'position' and 'score', best first
+    """
+    if index["bm25"] is None:
+        return []
+
+    tokenizer = query_tokenizer or index["tokenizer"]
+    if idf is None:
+        scores = index["bm25"].get_scores(tokenizer(query))
+    else:
+        scores = _weighted_scores(index["bm25"], tokenizer(query), idf)
+    top_indices = np.argsort(scores)[-top_k:][::-1]
+
+    return [
+        {"text": index["chunks"][i], "position": int(i), "score": float(scores[i])}
+        for i in top_indices if scores[i] > 0
+    ]
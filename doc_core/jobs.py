@@ -0,0 +1,515 @@
+import atexit
+import importlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+import threading
+import traceback
+import uuid
+from contextlib import contextmanager
+
+# Directory holding the job databases (one per app, so pools only see their own tasks)
+JOB_DIR = os.path.join(os.path.expanduser("~"), ".doc_core", "jobs")
+DEFAULT_DB_PATH = os.path.join(JOB_DIR, "jobs.sqlite3")
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Running jobs touch their row this often, so a live worker always holds a fresh lease
+HEARTBEAT_INTERVAL = 10
+# Running jobs not touched for this long belong to a dead worker and are taken back
+LEASE_SECONDS = 120
+# A job whose worker died this many times is failed instead of requeued (e.g. it runs out of memory)
+MAX_ATTEMPTS = 3
+# Seconds between checks of the pool for dead workers and expired leases
+SUPERVISE_INTERVAL = 5
+# Job IDs per query when looking up many jobs (below SQLite's limit of query parameters)
+IDS_PER_QUERY = 500
+# Finished and failed jobs are deleted when a pool starts this long after they ended
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    task TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    input BLOB,
+    state TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state_created ON jobs (state, created_at);
+"""
+
+
+def _id_chunks(job_ids):
+    """Splits job IDs into lists of at most IDS_PER_QUERY, with their '?, ?, ...' placeholders"""
+    job_ids = list(job_ids)
+    for start in range(0, len(job_ids), IDS_PER_QUERY):
+        chunk = job_ids[start:start + IDS_PER_QUERY]
+        yield chunk, ", ".join("?" * len(chunk))
+
+
+def _job_from_row(row):
+    """Turns a jobs row into a dictionary with decoded payload and result"""
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+    return job
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue shared by the apps and the worker processes
+
+    Jobs are identified by a string ID, carry a JSON payload and optional
+    binary input, and keep their progress and result in the database so
+    they outlive the browser session that submitted them.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # Databases created before attempts were counted
+            columns = [row["name"] for row in conn.execute("PRAGMA table_info(jobs)")]
+            if "attempts" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self):
+        """Opens a connection in autocommit mode with WAL for concurrent readers"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def submit(self, task, payload=None, input_bytes=None):
+        """
+        Adds a job to the queue
+
+        Args:
+            task: Task function as 'module:function'
+            payload: JSON-serializable dictionary passed to the task
+            input_bytes: Optional binary input (e.g. an uploaded file)
+
+        Returns:
+            str: Job ID
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, task, payload, input, state, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, task, json.dumps(payload or {}), input_bytes, QUEUED, now, now)
+            )
+        return job_id
+
+    def get(self, job_id):
+        """
+        Returns the status of a job
+
+        Returns:
+            dict: Job fields without the binary input, or None if the ID is unknown
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, task, payload, state, progress, message, result, error, created_at, updated_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _job_from_row(row) if row is not None else None
+
+    def claim(self, worker):
+        """
+        Atomically takes the oldest queued job
+
+        Returns:
+            dict: Job with its payload and input, or None if the queue is empty
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, task, payload, input FROM jobs WHERE state = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET state = ?, worker = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (RUNNING, worker, time.time(), row["id"])
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        return job
+
+    def set_progress(self, job_id, progress, message=""):
+        """Stores the progress (0-1) and a status message of a running job"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, message = ?, updated_at = ? WHERE id = ?",
+                (progress, message, time.time(), job_id)
+            )
+
+    def heartbeat(self, job_id):
+        """Renews the lease of a running job"""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ? AND state = ?", (time.time(), job_id, RUNNING))
+
+    def finish(self, job_id, result):
+        """Stores the JSON-serializable result of a job and frees its input (unless it was cancelled)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, progress = 1, result = ?, input = NULL, updated_at = ? "
+                "WHERE id = ? AND state IN (?, ?)",
+                (DONE, json.dumps(result), time.time(), job_id, QUEUED, RUNNING)
+            )
+
+    def fail(self, job_id, error):
+        """Marks a job as failed (a cancelled job keeps its reason)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE id = ? AND state IN (?, ?)",
+                (FAILED, error, time.time(), job_id, QUEUED, RUNNING)
+            )
+
+    def cancel(self, job_id, reason="Cancelled"):
+        """
+        Fails a queued or running job so that no worker starts it and its result is discarded
+
+        A worker already running the job finishes the task, but can no longer
+        mark the job as done.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, input = NULL, updated_at = ? WHERE id = ? AND state IN (?, ?)",
+                (FAILED, reason, time.time(), job_id, QUEUED, RUNNING)
+            )
+
+    def delete(self, job_ids):
+        """Removes jobs from the database"""
+        with self._connect() as conn:
+            for chunk, placeholders in _id_chunks(job_ids):
+                conn.execute(f"DELETE FROM jobs WHERE id IN ({placeholders})", chunk)
+
+    def delete_finished(self, older_than=JOB_RETENTION_SECONDS):
+        """
+        Removes done and failed jobs that ended more than `older_than` seconds ago
+
+        Returns:
+            int: Number of jobs removed
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE state IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, time.time() - older_than)
+            )
+            return cursor.rowcount
+
+    def list(self, task=None, job_ids=None):
+        """
+        Returns all jobs, optionally only those of one task or with given IDs
+
+        Returns:
+            list: Job dictionaries like get(), oldest first
+        """
+        query = ("SELECT id, task, payload, state, progress, message, result, error, created_at, updated_at "
+                 "FROM jobs WHERE 1 = 1")
+        params = ()
+        if task is not None:
+            query += " AND task = ?"
+            params = (task,)
+        with self._connect() as conn:
+            if job_ids is None:
+                rows = conn.execute(query + " ORDER BY created_at", params).fetchall()
+            else:
+                rows = []
+                for chunk, placeholders in _id_chunks(job_ids):
+                    rows += conn.execute(query + f" AND id IN ({placeholders})", params + tuple(chunk)).fetchall()
+                rows.sort(key=lambda row: row["created_at"])
+
+        return [_job_from_row(row) for row in rows]
+
+    def states(self, job_ids):
+        """
+        Returns the state of each job without loading payloads and results
+
+        Returns:
+            dict: Job ID to state; unknown IDs are left out
+        """
+        states = {}
+        with self._connect() as conn:
+            for chunk, placeholders in _id_chunks(job_ids):
+                states.update(conn.execute(f"SELECT id, state FROM jobs WHERE id IN ({placeholders})", chunk).fetchall())
+        return states
+
+    def counts(self):
+        """Returns the number of jobs per state"""
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+    def running_workers(self):
+        """Returns the names of the workers that hold running jobs"""
+        with self._connect() as conn:
+            return [row["worker"] for row in conn.execute(
+                "SELECT DISTINCT worker FROM jobs WHERE state = ? AND worker IS NOT NULL", (RUNNING,)
+            )]
+
+    def release_worker(self, worker):
+        """Puts the job of a worker stopped on purpose back in the queue; the interrupted attempt does not count"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, attempts = MAX(attempts - 1, 0), updated_at = ? "
+                "WHERE state = ? AND worker = ?",
+                (QUEUED, time.time(), RUNNING, worker)
+            )
+
+    def _recover(self, condition, params):
+        """
+        Takes back running jobs matching a condition from workers that died
+
+        Jobs are queued again, or failed once they used up MAX_ATTEMPTS.
+
+        Returns:
+            int: Number of jobs taken back
+        """
+        error = f"Worker process died while running the job ({MAX_ATTEMPTS} attempts)"
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = CASE WHEN attempts >= ? THEN ? ELSE error END, worker = NULL, updated_at = ? "
+                f"WHERE state = ? AND {condition}",
+                (MAX_ATTEMPTS, FAILED, QUEUED, MAX_ATTEMPTS, error, time.time(), RUNNING, *params)
+            )
+            return cursor.rowcount
+
+    def requeue_worker(self, worker):
+        """Takes back the job of a worker process that is known to be dead"""
+        return self._recover("worker = ?", (worker,))
+
+    def requeue_stale(self, lease_seconds=LEASE_SECONDS):
+        """Takes back running jobs whose worker stopped renewing their lease"""
+        return self._recover("updated_at < ?", (time.time() - lease_seconds,))
+
+
+def _resolve_task(task):
+    """Imports a task function given as 'module:function'"""
+    module_name, func_name = task.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _worker_name(pid):
+    """Name a worker process stores in the jobs it claims"""
+    return f"pid-{pid}"
+
+
+def _worker_alive(worker):
+    """
+    Whether the process of a worker name from _worker_name still runs on this machine
+
+    Windows has no signal-free process check in the standard library, so
+    its workers count as alive and are left to their lease.
+    """
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(int(worker.rsplit("-", 1)[1]), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError, IndexError):
+        # Another user's process, or not a worker name of this module
+        return True
+    return True
+
+
+def _heartbeat_loop(queue, job_id, stopped):
+    """Renews the lease of a job until the stopped event is set"""
+    while not stopped.wait(HEARTBEAT_INTERVAL):
+        queue.heartbeat(job_id)
+
+
+def _worker_loop(db_path, poll_interval):
+    """Runs in each worker process: claims jobs and executes them until terminated"""
+    queue = JobQueue(db_path)
+    worker = _worker_name(os.getpid())
+    parent = multiprocessing.parent_process()
+
+    while True:
+        # Stop when the app that started the pool is gone
+        if parent is not None and not parent.is_alive():
+            return
+
+        job = queue.claim(worker)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        def report(progress, message="", job_id=job["id"]):
+            queue.set_progress(job_id, progress, message)
+
+        # Tasks may go minutes without reporting progress (e.g. one large page)
+        stopped = threading.Event()
+        threading.Thread(target=_heartbeat_loop, args=(queue, job["id"], stopped), daemon=True).start()
+        try:
+            func = _resolve_task(job["task"])
+            result = func(job["payload"], job["input"], report)
+            queue.finish(job["id"], result)
+        except Exception:
+            queue.fail(job["id"], traceback.format_exc())
+        finally:
+            stopped.set()
+
+
+class WorkerPool:
+    """
+    Pool of worker processes executing jobs from a JobQueue
+
+    Task functions are called as func(payload, input_bytes, progress) where
+    progress(fraction, message) updates the job status; their return value
+    must be JSON-serializable.
+
+    A supervisor thread replaces worker processes that die (e.g. killed for
+    running out of memory) and takes back their jobs, as well as jobs whose
+    lease expired.
+
+    Finished and failed jobs older than `retention_seconds` are deleted when
+    the pool starts (None keeps them, e.g. for a batch manifest).
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, workers=None, poll_interval=0.5,
+                 supervise_interval=SUPERVISE_INTERVAL, retention_seconds=JOB_RETENTION_SECONDS):
+        self.db_path = db_path
+        self.workers = workers or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.supervise_interval = supervise_interval
+        self.retention_seconds = retention_seconds
+        self.processes = []
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def _start_worker(self):
+        """Starts one worker process"""
+        # 'spawn' avoids forking the multi-threaded Streamlit server. Workers are
+        # not daemonic so that tasks may start process pools of their own.
+        process = multiprocessing.get_context("spawn").Process(
+            target=_worker_loop, args=(self.db_path, self.poll_interval)
+        )
+        process.start()
+        return process
+
+    def start(self):
+        """
+        Starts the worker processes, resuming jobs interrupted by a previous run
+
+        Only jobs of workers that are gone are taken back: other pools on the
+        same database (a second server process or batch run) keep theirs.
+        Old finished jobs are deleted first.
+        """
+        queue = JobQueue(self.db_path)
+        if self.retention_seconds is not None:
+            queue.delete_finished(self.retention_seconds)
+        for worker in queue.running_workers():
+            if not _worker_alive(worker):
+                queue.requeue_worker(worker)
+        queue.requeue_stale()
+
+        self._stopped.clear()
+        self.processes = [self._start_worker() for _ in range(self.workers)]
+        threading.Thread(target=self._supervise, daemon=True).start()
+        atexit.register(self.stop)
+
+    def check(self):
+        """
+        Replaces dead worker processes and takes back jobs they or others left running
+
+        Returns:
+            int: Number of worker processes restarted
+        """
+        queue = JobQueue(self.db_path)
+        restarted = 0
+        with self._lock:
+            if self._stopped.is_set():
+                return 0
+            for i, process in enumerate(self.processes):
+                if process.is_alive():
+                    continue
+                process.join()
+                queue.requeue_worker(_worker_name(process.pid))
+                self.processes[i] = self._start_worker()
+                restarted += 1
+        queue.requeue_stale()
+        return restarted
+
+    def _supervise(self):
+        """Supervisor thread: checks the pool until it is stopped"""
+        while not self._stopped.wait(self.supervise_interval):
+            try:
+                self.check()
+            except Exception:
+                # A busy or briefly unavailable database is retried at the next check
+                traceback.print_exc()
+
+    def stop(self):
+        """Terminates the worker processes and puts their jobs back in the queue"""
+        with self._lock:
+            self._stopped.set()
+            for process in self.processes:
+                process.terminate()
+            for process in self.processes:
+                process.join()
+            queue = JobQueue(self.db_path)
+            for process in self.processes:
+                queue.release_worker(_worker_name(process.pid))
+            self.processes = []
+
+def share_workers(sizes, workers):
+    """
+    Splits the processes of a batch between its jobs in proportion to their size
+
+    Jobs run side by side, so a batch takes about as long as its largest
+    job; giving that job most of the processes shortens it the most. Every
+    job gets one process and the rest are handed out by largest remainder,
+    so the shares add up to exactly `workers` (or one per job when there
+    are more jobs than processes).
+
+    Args:
+        sizes: Size of each job, e.g. the input file size in bytes
+        workers: Processes for the whole batch
+
+    Returns:
+        list: Processes of each job (at least 1)
+    """
+    shares = [1] * len(sizes)
+    spare = workers - len(sizes)
+    if spare <= 0:
+        return shares
+
+    total = sum(sizes)
+    quotas = [spare * size / total if total else spare / len(sizes) for size in sizes]
+    for i, quota in enumerate(quotas):
+        shares[i] += int(quota)
+    # The processes left after the whole quotas go to the largest fractions
+    left = workers - sum(shares)
+    for i in sorted(range(len(sizes)), key=lambda i: quotas[i] - int(quotas[i]), reverse=True)[:left]:
+        shares[i] += 1
+    return shares
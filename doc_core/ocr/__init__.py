@@ -0,0 +1 @@
+# UI-free OCR pipeline shared by the OCR app, job workers and batch tools
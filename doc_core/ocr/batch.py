@@ -0,0 +1,337 @@
+"""
+Headless, resumable batch OCR of PDF and image files
+
+Usage (from the repository root):
+
+    python -m doc_core.ocr.batch /archive/scans "/archive/inbox/**/*.pdf" --output-dir /archive/text --workers 8
+
+Every input file becomes a job in a manifest (a job queue database). An
+interrupted run started again with the same manifest skips finished files,
+resumes the ones that were in progress and picks up new or modified files.
+Each output keeps the name of its input, e.g. scan.pdf becomes scan.pdf.txt.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import pytesseract
+
+from doc_core.jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue, WorkerPool
+from doc_core.ocr.cache import DEFAULT_CACHE_DIR
+from doc_core.ocr.language import AUTO_LANG
+from doc_core.ocr.pipeline import ocr_image, ocr_pdf_pages, join_pages
+from doc_core.ocr.resolution import AUTO_DPI
+
+# Task run by the worker processes for each file
+TASK = "doc_core.ocr.batch:ocr_file_task"
+# File types picked up from directories
+INPUT_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".tif", ".tiff")
+# Manifest file name used when none is given
+MANIFEST_NAME = ".ocr_manifest.sqlite3"
+
+def collect_inputs(patterns):
+    """
+    Expands directories (recursively) and glob patterns into input files
+
+    Args:
+        patterns: Directory paths, file paths or glob patterns ('**' is recursive)
+
+    Returns:
+        list: Sorted absolute paths of the supported files
+    """
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, files in os.walk(pattern):
+                paths.update(os.path.join(root, name) for name in files
+                             if name.lower().endswith(INPUT_EXTENSIONS))
+        else:
+            paths.update(path for path in glob.glob(pattern, recursive=True)
+                         if os.path.isfile(path) and path.lower().endswith(INPUT_EXTENSIONS))
+    return sorted(os.path.abspath(path) for path in paths)
+
+def output_path(input_path, output_dir=None, base_dir=None):
+    """
+    Returns where the text of an input file is written
+
+    Args:
+        input_path: Absolute input path
+        output_dir: Output directory (next to the input when None)
+        base_dir: Common directory of the inputs; its layout is mirrored in output_dir
+
+    Returns:
+        str: Path of the output, the input name with '.txt' added (scan.pdf and
+            scan.tif next to each other get scan.pdf.txt and scan.tif.txt)
+    """
+    if output_dir is None:
+        return input_path + ".txt"
+    relative = os.path.relpath(input_path, base_dir) if base_dir else os.path.basename(input_path)
+    return os.path.join(os.path.abspath(output_dir), relative + ".txt")
+
+def _check_unchanged(payload):
+    """Raises when the input file changed after the job was submitted (a newer job OCRs it)"""
+    stat = os.stat(payload["path"])
+    if (stat.st_size, stat.st_mtime) != (payload["size"], payload["mtime"]):
+        raise RuntimeError(f"{payload['path']} changed after this job was submitted")
+
+def ocr_file_task(payload, input_bytes, progress):
+    """
+    Job queue task: OCRs one file from disk and writes its text file
+
+    Args:
+        payload: Dictionary with 'path', 'output', 'ocr_lang',
+            'preprocessing_options', 'render_dpi', 'use_text_layer',
+            'skip_blank_pages', 'use_ocr_cache' and optionally 'tesseract_cmd'
+        input_bytes: Unused (files are read from disk)
+        progress: Function called as progress(fraction, message)
+
+    Returns:
+        dict: 'output', 'pages', 'ocr_pages', 'blank_pages', 'text_layer_pages',
+            'lang' (OCR language used) and 'seconds'
+    """
+    if payload.get("tesseract_cmd"):
+        pytesseract.pytesseract.tesseract_cmd = payload["tesseract_cmd"]
+    cache_dir = DEFAULT_CACHE_DIR if payload.get("use_ocr_cache", True) else None
+    start = time.perf_counter()
+
+    _check_unchanged(payload)
+    with open(payload["path"], "rb") as f:
+        file_bytes = f.read()
+
+    language = {}
+    if payload["path"].lower().endswith(".pdf"):
+        pages = ocr_pdf_pages(
+            file_bytes,
+            payload["ocr_lang"],
+            payload["preprocessing_options"],
+            lambda done, total: progress(done / total, f"Page {done}/{total}"),
+            1,
+            payload.get("use_text_layer", True),
+            cache_dir,
+            payload.get("render_dpi", AUTO_DPI),
+            skip_blank=payload.get("skip_blank_pages", True),
+            language_stats=language
+        )
+        text = join_pages(page["text"] for page in pages)
+        sources = [page["source"] for page in pages]
+    else:
+        text = ocr_image(file_bytes, payload["ocr_lang"], payload["preprocessing_options"], cache_dir, language)
+        sources = ["ocr"]
+
+    # A stale job must not overwrite the output of the newer job for the same file
+    _check_unchanged(payload)
+    # Written under a temporary name so an interrupted run never leaves a partial output
+    os.makedirs(os.path.dirname(payload["output"]), exist_ok=True)
+    temp_path = payload["output"] + ".part"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, payload["output"])
+
+    return {
+        "output": payload["output"],
+        "pages": len(sources),
+        "ocr_pages": sources.count("ocr"),
+        "blank_pages": sources.count("blank"),
+        "text_layer_pages": sources.count("text_layer"),
+        "lang": language.get("lang"),
+        "seconds": time.perf_counter() - start,
+    }
+
+def prune_manifest(queue):
+    """
+    Removes manifest entries that no run needs any more
+
+    These are the older jobs of a file that was submitted again, and the
+    finished or failed jobs of files that no longer exist.
+
+    Args:
+        queue: JobQueue of the manifest
+
+    Returns:
+        int: Number of jobs removed
+    """
+    latest = {}
+    stale = []
+    for job in queue.list(TASK):  # Oldest first
+        previous = latest.get(job["payload"]["path"])
+        if previous is not None and previous["state"] in (DONE, FAILED):
+            stale.append(previous["id"])
+        latest[job["payload"]["path"]] = job
+    stale += [job["id"] for path, job in latest.items()
+              if job["state"] in (DONE, FAILED) and not os.path.exists(path)]
+    queue.delete(stale)
+    return len(stale)
+
+def submit_files(queue, paths, settings, output_dir=None):
+    """
+    Adds the files that still need OCR to the manifest
+
+    Files whose job finished with the same size, modification time and OCR
+    settings, and whose output still exists, are skipped. Queued and running jobs of an
+    interrupted run are left to be resumed. A queued or running job of a file
+    that changed since is cancelled before the file is submitted again.
+
+    Args:
+        queue: JobQueue of the manifest
+        paths: Absolute input paths
+        settings: OCR settings added to every payload
+        output_dir: Output directory (next to the inputs when None)
+
+    Returns:
+        tuple: (job IDs to run, submitted, skipped, resumed); the job IDs are
+            those of the submitted and resumed files
+    """
+    latest = {job["payload"]["path"]: job for job in queue.list(TASK)}
+    base_dir = os.path.commonpath([os.path.dirname(path) for path in paths]) if paths else None
+
+    job_ids = []
+    submitted = skipped = resumed = 0
+    for path in paths:
+        stat = os.stat(path)
+        job = latest.get(path)
+        unchanged = job is not None and (
+            (job["payload"]["size"], job["payload"]["mtime"]) == (stat.st_size, stat.st_mtime)
+            and all(job["payload"].get(key) == value for key, value in settings.items())
+        )
+        if unchanged:
+            if job["state"] in (QUEUED, RUNNING):
+                job_ids.append(job["id"])
+                resumed += 1
+                continue
+            if job["state"] == DONE and os.path.exists(job["payload"]["output"]):
+                skipped += 1
+                continue
+        elif job is not None and job["state"] in (QUEUED, RUNNING):
+            queue.cancel(job["id"], "Superseded: the file or the OCR settings changed")
+
+        payload = {
+            **settings,
+            "path": path,
+            "output": output_path(path, output_dir, base_dir),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+        job_ids.append(queue.submit(TASK, payload))
+        submitted += 1
+    return job_ids, submitted, skipped, resumed
+
+def format_progress(finished, remaining, elapsed):
+    """Formats a one-line throughput report"""
+    done = [job for job in finished if job["state"] == DONE]
+    pages = sum(job["result"]["pages"] for job in done)
+    files_per_minute = len(finished) / elapsed * 60 if elapsed else 0
+    pages_per_second = pages / elapsed if elapsed else 0
+    eta = remaining / (len(finished) / elapsed) if finished and elapsed else None
+    return (
+        f"{len(done)} done, {len(finished) - len(done)} failed, {remaining} left | "
+        f"{pages} pages | {files_per_minute:.1f} files/min, {pages_per_second:.2f} pages/s"
+        + (f" | ETA {eta / 60:.0f} min" if eta is not None else "")
+    )
+
+def run_batch(queue, job_ids, workers, report_interval=10):
+    """
+    Runs the files of a batch over a worker pool and reports throughput until all are done
+
+    Only the states of the batch's jobs are polled; a job's result is read
+    once, when it finishes.
+
+    Args:
+        queue: JobQueue of the manifest
+        job_ids: IDs of the jobs of this batch (see submit_files)
+        workers: Number of worker processes (one file each)
+        report_interval: Seconds between progress lines
+
+    Returns:
+        list: Jobs of the batch that finished or failed
+    """
+    started_at = time.time()
+    pending = set(job_ids)
+    finished = []
+    # The manifest keeps finished jobs, so later runs can skip their files
+    pool = WorkerPool(queue.db_path, workers=workers, retention_seconds=None)
+    pool.start()
+    try:
+        last_report = 0
+        while pending:
+            states = queue.states(pending)
+            # Jobs removed from the manifest by another process count as finished too
+            ended = [job_id for job_id in pending if states.get(job_id, DONE) in (DONE, FAILED)]
+            if ended:
+                finished += queue.list(job_ids=ended)
+                pending.difference_update(ended)
+            if pending and time.time() - last_report >= report_interval:
+                print(format_progress(finished, len(pending), time.time() - started_at), flush=True)
+                last_report = time.time()
+            if pending:
+                time.sleep(1)
+    finally:
+        # Jobs interrupted here are requeued by the next run
+        pool.stop()
+    return finished
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR directories and globs of PDF and image files")
+    parser.add_argument("inputs", nargs="+", help="Directories, files or glob patterns (quote patterns with **)")
+    parser.add_argument("--output-dir", help="Write .txt files here, mirroring the input folders (default: next to each input)")
+    parser.add_argument("--manifest", help=f"Job manifest used to resume runs (default: {MANIFEST_NAME} in the output directory or the current directory)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Files processed at the same time")
+    parser.add_argument("--lang", default=AUTO_LANG, help="OCR language, e.g. tur+eng, or 'auto' to detect it per file (default: auto)")
+    parser.add_argument("--dpi", default=AUTO_DPI, help="PDF render resolution or 'auto' (default: auto)")
+    parser.add_argument("--threshold", choices=["fixed", "otsu", "sauvola"], help="Binarize pages before OCR")
+    parser.add_argument("--deskew", action="store_true", help="Straighten skewed pages")
+    parser.add_argument("--no-text-layer", action="store_true", help="OCR every PDF page, even with embedded text")
+    parser.add_argument("--keep-blank", action="store_true", help="OCR blank pages instead of skipping them")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the OCR result cache")
+    parser.add_argument("--tesseract-cmd", help="Path of the tesseract executable")
+    args = parser.parse_args()
+
+    paths = collect_inputs(args.inputs)
+    if not paths:
+        print("No PDF or image files found.", file=sys.stderr)
+        return 1
+
+    manifest = args.manifest or os.path.join(args.output_dir or os.getcwd(), MANIFEST_NAME)
+    queue = JobQueue(manifest)
+    settings = {
+        "ocr_lang": args.lang,
+        "preprocessing_options": {
+            "apply_threshold": args.threshold is not None,
+            "threshold_method": args.threshold or "fixed",
+            "deskew": args.deskew,
+        },
+        "render_dpi": args.dpi if args.dpi == AUTO_DPI else int(args.dpi),
+        "use_text_layer": not args.no_text_layer,
+        "skip_blank_pages": not args.keep_blank,
+        "use_ocr_cache": not args.no_cache,
+        "tesseract_cmd": args.tesseract_cmd,
+    }
+    pruned = prune_manifest(queue)
+    job_ids, submitted, skipped, resumed = submit_files(queue, paths, settings, args.output_dir)
+    print(f"{len(paths)} files: {submitted} new, {resumed} resumed, {skipped} already done (manifest: {manifest}"
+          + (f", {pruned} old entries removed)" if pruned else ")"))
+
+    if not job_ids:
+        return 0
+
+    started = time.time()
+    try:
+        finished = run_batch(queue, job_ids, args.workers)
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume.", file=sys.stderr)
+        return 130
+
+    elapsed = time.time() - started
+    print(format_progress(finished, 0, elapsed))
+    done = [job["result"] for job in finished if job["state"] == DONE]
+    if done:
+        print(f"Pages: {sum(r['ocr_pages'] for r in done)} OCR, {sum(r['text_layer_pages'] for r in done)} embedded text, "
+              f"{sum(r['blank_pages'] for r in done)} blank skipped; {elapsed:.0f} s total")
+    for job in finished:
+        if job["state"] == FAILED:
+            print(f"FAILED {job['payload']['path']}: {job['error'].strip().splitlines()[-1]}", file=sys.stderr)
+    return 1 if any(job["state"] == FAILED for job in finished) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""
+OCR time per page for each preprocessing setting
+
+Usage (from the repository root):
+
+    python -m doc_core.ocr.benchmark scan.pdf page.png --lang tur+eng
+
+Without files, synthetic Turkish and English pages with a known text are
+rendered (several fonts, sizes and noise levels, also bundled into
+multi-page PDFs) and the report adds pages per second, the time of each
+stage, peak memory and the character error rate:
+
+    python -m doc_core.ocr.benchmark --sizes 10 12 --json results.json
+"""
+import argparse
+import json
+import re
+import time
+
+from PIL import Image
+
+from doc_core.ocr import engine
+from doc_core.ocr.image_processing import preprocess_image
+from doc_core.ocr.page_store import PageStore
+from doc_core.ocr.pipeline import ocr_pdf_pages
+from doc_core.ocr.profiling import peak_memory_mb, reset_peak_memory
+from doc_core.ocr.rendering import DEFAULT_DPI
+from doc_core.ocr.synthetic import FONT_SIZES, PAGE_DPI, build_corpus, build_pdfs
+
+# Preprocessing settings compared by default
+PREPROCESSING_PRESETS = {
+    "none": {},
+    "fixed threshold": {"apply_threshold": True, "threshold_value": 128},
+    "otsu": {"apply_threshold": True, "threshold_method": "otsu"},
+    "sauvola": {"apply_threshold": True, "threshold_method": "sauvola"},
+    "denoise": {"denoise": True},
+    "deskew": {"deskew": True},
+    "auto crop": {"auto_crop": True},
+    "resize x1.5": {"apply_resize": True, "scale_factor": 1.5},
+    "deskew + crop + otsu": {"deskew": True, "auto_crop": True, "apply_threshold": True, "threshold_method": "otsu"},
+}
+
+def load_pages(paths, dpi=DEFAULT_DPI):
+    """
+    Loads benchmark pages from PDF and image files
+
+    Args:
+        paths: File paths
+        dpi: Render resolution for PDF pages
+
+    Returns:
+        list: PIL.Image objects
+    """
+    pages = []
+    for path in paths:
+        with open(path, "rb") as f:
+            file_bytes = f.read()
+        if path.lower().endswith(".pdf"):
+            store = PageStore(file_bytes, is_pdf=True)
+            pages.extend(image for _, image in store.iter_images(range(store.page_count()), dpi))
+        else:
+            with Image.open(path) as image:
+                image.load()
+                pages.append(image.copy())
+    return pages
+
+def benchmark_preprocessing(pages, ocr_lang="tur+eng", presets=None):
+    """
+    Preprocesses and OCRs every page with each preset, without the OCR cache
+
+    Args:
+        pages: PIL.Image objects
+        ocr_lang: OCR language
+        presets: Dictionary of preset name to preprocessing options
+            (PREPROCESSING_PRESETS when None)
+
+    Returns:
+        list: One dictionary per preset with 'preset', 'pages',
+            'preprocess_seconds', 'ocr_seconds', 'seconds_per_page',
+            'operations' (seconds per preprocessing operation) and
+            'output_pixels' (average pixels passed to Tesseract)
+    """
+    presets = presets or PREPROCESSING_PRESETS
+    engine.preload(ocr_lang)
+
+    results = []
+    for name, options in presets.items():
+        operations = {}
+        preprocess_seconds = ocr_seconds = 0.0
+        output_pixels = 0
+        for page in pages:
+            start = time.perf_counter()
+            processed = preprocess_image(page, options, operations)
+            preprocess_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            engine.image_to_string(processed, ocr_lang)
+            ocr_seconds += time.perf_counter() - start
+            output_pixels += processed.width * processed.height
+
+        count = max(len(pages), 1)
+        results.append({
+            "preset": name,
+            "pages": len(pages),
+            "preprocess_seconds": preprocess_seconds,
+            "ocr_seconds": ocr_seconds,
+            "seconds_per_page": (preprocess_seconds + ocr_seconds) / count,
+            "operations": operations,
+            "output_pixels": output_pixels // count,
+        })
+    return results
+
+def levenshtein(a, b):
+    """
+    Edit distance between two strings (insertions, deletions and substitutions)
+
+    Uses the bit-parallel algorithm of Myers (in Hyyrö's formulation): one
+    Python integer holds a whole column of the edit matrix, so the cost is
+    one pass over the longer string instead of a character-by-character
+    table, which keeps full-page comparisons fast.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+
+    # Bit i of a character's mask is set where b has that character
+    masks = {}
+    for i, char in enumerate(b):
+        masks[char] = masks.get(char, 0) | (1 << i)
+
+    m = len(b)
+    full = (1 << m) - 1
+    top = 1 << (m - 1)
+    vp, vn = full, 0
+    distance = m
+    for char in a:
+        eq = masks.get(char, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | ~(xh | vp) & full
+        hn = vp & xh
+        if hp & top:
+            distance += 1
+        elif hn & top:
+            distance -= 1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | ~(xv | hp) & full
+        vn = hp & xv
+    return distance
+
+def normalize_text(text):
+    """Collapses whitespace, so line breaks and spacing do not count as OCR errors"""
+    return re.sub(r"\s+", " ", text).strip()
+
+def character_error_rate(reference, hypothesis):
+    """
+    Character error rate of OCR output against the ground truth
+
+    Returns:
+        float: Edit distance divided by the length of the reference (0 is
+            perfect; above 1 when the output is much longer than the text)
+    """
+    reference, hypothesis = normalize_text(reference), normalize_text(hypothesis)
+    if not reference:
+        return float(bool(hypothesis))
+    return levenshtein(reference, hypothesis) / len(reference)
+
+def _error_rates_by(samples, key):
+    """Average character error rate per value of a sample field (e.g. 'noise')"""
+    groups = {}
+    for sample in samples:
+        groups.setdefault(sample[key], []).append(sample["cer"])
+    return {value: sum(rates) / len(rates) for value, rates in groups.items()}
+
+def benchmark_synthetic(corpus, pdfs, ocr_lang="tur+eng", presets=None, dpi=PAGE_DPI):
+    """
+    Measures speed, memory and accuracy of each preset on pages with a known text
+
+    Every corpus page goes through the steps of ocr_image (preprocessing
+    and OCR, timed separately) and every PDF through ocr_pdf_pages
+    (rendering, preprocessing and OCR), without the OCR cache, the text
+    layer or blank page skipping so every page is really recognized.
+
+    Args:
+        corpus: Pages from synthetic.build_corpus
+        pdfs: PDFs from synthetic.build_pdfs
+        ocr_lang: OCR language
+        presets: Dictionary of preset name to preprocessing options
+            (PREPROCESSING_PRESETS when None)
+        dpi: Render resolution of the PDFs (the resolution they were built at)
+
+    Returns:
+        list: One dictionary per preset with 'preset', 'images' and 'pdfs'.
+            'images' has 'pages', 'pages_per_second', 'preprocess_seconds',
+            'ocr_seconds', 'operations', 'peak_memory_mb', 'cer' and
+            'cer_by_noise', 'cer_by_size' and 'cer_by_font'; 'pdfs' has
+            'pages', 'pages_per_second', 'seconds', 'peak_memory_mb', 'cer'
+            and 'cer_by_noise'
+    """
+    presets = presets or PREPROCESSING_PRESETS
+    engine.preload(ocr_lang)
+
+    results = []
+    for name, options in presets.items():
+        reset_peak_memory()
+        operations = {}
+        preprocess_seconds = ocr_seconds = 0.0
+        samples = []
+        for sample in corpus:
+            start = time.perf_counter()
+            processed = preprocess_image(sample["image"], options, operations)
+            preprocess_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            text = engine.image_to_string(processed, ocr_lang)
+            ocr_seconds += time.perf_counter() - start
+            samples.append({**sample, "cer": character_error_rate(sample["text"], text)})
+        image_memory = peak_memory_mb()
+
+        reset_peak_memory()
+        pdf_seconds = 0.0
+        pdf_samples = []
+        for document in pdfs:
+            start = time.perf_counter()
+            pages = ocr_pdf_pages(document["pdf"], ocr_lang, options, use_text_layer=False,
+                                  cache_dir=None, dpi=dpi, skip_blank=False)
+            pdf_seconds += time.perf_counter() - start
+            pdf_samples.extend(
+                {"noise": document["noise"], "cer": character_error_rate(reference, page["text"])}
+                for reference, page in zip(document["texts"], pages)
+            )
+        pdf_memory = peak_memory_mb()
+
+        image_seconds = preprocess_seconds + ocr_seconds
+        results.append({
+            "preset": name,
+            "images": {
+                "pages": len(samples),
+                "pages_per_second": len(samples) / image_seconds if image_seconds else 0.0,
+                "preprocess_seconds": preprocess_seconds,
+                "ocr_seconds": ocr_seconds,
+                "operations": operations,
+                "peak_memory_mb": image_memory,
+                "cer": sum(s["cer"] for s in samples) / max(len(samples), 1),
+                "cer_by_noise": _error_rates_by(samples, "noise"),
+                "cer_by_size": _error_rates_by(samples, "size"),
+                "cer_by_font": _error_rates_by(samples, "font"),
+            },
+            "pdfs": {
+                "pages": len(pdf_samples),
+                "pages_per_second": len(pdf_samples) / pdf_seconds if pdf_seconds else 0.0,
+                "seconds": pdf_seconds,
+                "peak_memory_mb": pdf_memory,
+                "cer": sum(s["cer"] for s in pdf_samples) / max(len(pdf_samples), 1),
+                "cer_by_noise": _error_rates_by(pdf_samples, "noise"),
+            },
+        })
+    return results
+
+def format_results(results):
+    """Formats benchmark results as a plain-text table"""
+    lines = [f"{'preset':<24}{'s/page':>9}{'prep s':>9}{'ocr s':>9}{'Mpx':>7}  operations"]
+    for result in results:
+        operations = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result["operations"].items())
+        lines.append(
+            f"{result['preset']:<24}{result['seconds_per_page']:>9.3f}{result['preprocess_seconds']:>9.2f}"
+            f"{result['ocr_seconds']:>9.2f}{result['output_pixels'] / 1e6:>7.2f}  {operations or '-'}"
+        )
+    return "\n".join(lines)
+
+def _memory(value):
+    return f"{value:.0f}" if value is not None else "-"
+
+def format_synthetic_results(results):
+    """Formats synthetic benchmark results as plain-text tables (speed and memory, then accuracy)"""
+    lines = [f"{'preset':<24}{'img p/s':>9}{'prep s':>9}{'ocr s':>9}{'img MB':>8}"
+             f"{'pdf p/s':>9}{'pdf MB':>8}{'CER':>8}{'pdf CER':>9}"]
+    for result in results:
+        images, pdfs = result["images"], result["pdfs"]
+        lines.append(
+            f"{result['preset']:<24}{images['pages_per_second']:>9.2f}{images['preprocess_seconds']:>9.2f}"
+            f"{images['ocr_seconds']:>9.2f}{_memory(images['peak_memory_mb']):>8}{pdfs['pages_per_second']:>9.2f}"
+            f"{_memory(pdfs['peak_memory_mb']):>8}{images['cer']:>8.1%}{pdfs['cer']:>9.1%}"
+        )
+
+    noise_levels = list(results[0]["images"]["cer_by_noise"]) if results else []
+    sizes = list(results[0]["images"]["cer_by_size"]) if results else []
+    lines += ["", f"{'CER by page':<24}" + "".join(f"{noise:>9}" for noise in noise_levels)
+              + "".join(f"{str(size) + 'pt':>9}" for size in sizes)]
+    for result in results:
+        images = result["images"]
+        lines.append(
+            f"{result['preset']:<24}" + "".join(f"{images['cer_by_noise'][noise]:>9.1%}" for noise in noise_levels)
+            + "".join(f"{images['cer_by_size'][size]:>9.1%}" for size in sizes)
+        )
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR time per page across preprocessing settings")
+    parser.add_argument("files", nargs="*", help="PDF or image files (synthetic pages when none are given)")
+    parser.add_argument("--lang", default="tur+eng", help="OCR language (default: tur+eng)")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI, help="Render resolution for PDF pages")
+    parser.add_argument("--presets", nargs="+", choices=list(PREPROCESSING_PRESETS), metavar="PRESET",
+                        help="Preprocessing presets to compare (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(FONT_SIZES),
+                        help="Font sizes of the synthetic pages in points")
+    parser.add_argument("--pages-per-pdf", type=int, default=4, help="Pages per synthetic PDF")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    presets = {name: PREPROCESSING_PRESETS[name] for name in args.presets} if args.presets else None
+    if args.files:
+        pages = load_pages(args.files, args.dpi)
+        print(f"{len(pages)} pages, OCR engine: {engine.backend_name()}")
+        results = benchmark_preprocessing(pages, args.lang, presets)
+        print(format_results(results))
+    else:
+        corpus = build_corpus(sizes=args.sizes)
+        pdfs = build_pdfs(corpus, args.pages_per_pdf)
+        print(f"{len(corpus)} synthetic pages, {len(pdfs)} PDFs, OCR engine: {engine.backend_name()}")
+        results = benchmark_synthetic(corpus, pdfs, args.lang, presets)
+        print(format_synthetic_results(results))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import numpy as np
+from PIL import Image
+
+# Pages are classified on a copy of this width
+ANALYSIS_WIDTH = 400
+# Pixels this much darker than the paper count as ink
+INK_CONTRAST = 80
+# Pages with less ink than this share of their area are blank
+BLANK_COVERAGE = 0.001
+# Pages with less ink than this are checked for text-like components
+SPARSE_COVERAGE = 0.02
+# Components smaller than this (in analysis pixels) are dust and scanner noise
+MIN_COMPONENT_PIXELS = 3
+# Sparse pages with fewer components than this (a stamp, a signature, a page number) are
+# skipped, unless their components form a text line
+MIN_TEXT_COMPONENTS = 12
+# Heights (in analysis pixels) of components that may be letters: about 6-40pt text on A4
+MIN_GLYPH_HEIGHT = 3
+MAX_GLYPH_HEIGHT = 24
+# A text line has at least this many letter-sized components side by side...
+MIN_LINE_GLYPHS = 3
+# ...with gaps of at most this many times the line height between them...
+MAX_GLYPH_GAP_RATIO = 2.0
+# ...and is at least this many times wider than high (unlike a page number)
+MIN_LINE_ASPECT = 3.0
+
+def ink_mask(image, width=ANALYSIS_WIDTH):
+    """
+    Returns the ink pixels of a downscaled copy of a page
+
+    The paper level is taken from the bright end of the gray-level
+    histogram, so grey or yellowed paper is not mistaken for ink.
+
+    Args:
+        image: PIL.Image of the page
+        width: Width of the analysed copy
+
+    Returns:
+        np.ndarray: 2-D boolean array, True for ink
+    """
+    # Downscaled before the grayscale conversion, so large scans are not copied at full size
+    gray = image
+    if gray.width > width:
+        gray = gray.resize((width, max(1, round(gray.height * width / gray.width))), Image.BOX)
+    gray = gray.convert('L')
+    pixels = np.asarray(gray, dtype=np.int16)
+
+    hist = np.bincount(pixels.ravel(), minlength=256)
+    paper = int(np.searchsorted(np.cumsum(hist), 0.9 * pixels.size))
+    return pixels < paper - INK_CONTRAST
+
+def _row_runs(mask):
+    """Returns (row, start, end) of the horizontal runs of True pixels"""
+    padded = np.pad(mask, ((0, 0), (1, 1))).astype(np.int8)
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows, starts, ends
+
+def find_components(mask):
+    """
+    Labels 8-connected components from the row runs of a sparse mask
+
+    Args:
+        mask: 2-D boolean array
+
+    Returns:
+        list: (pixels, top, left, bottom, right) of each component; bottom
+            and right are exclusive
+    """
+    rows, starts, ends = _row_runs(mask)
+    parent = list(range(len(rows)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Runs are sorted by row; join each run with the overlapping runs of the row above
+    row_first = np.searchsorted(rows, np.arange(mask.shape[0] + 1))
+    for i in range(len(rows)):
+        row = rows[i]
+        if row == 0:
+            continue
+        for j in range(row_first[row - 1], row_first[row]):
+            # 8-connectivity: diagonal neighbours touch as well
+            if starts[j] <= ends[i] and starts[i] <= ends[j]:
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[root_i] = root_j
+
+    components = {}
+    for i in range(len(rows)):
+        root = find(i)
+        pixels, top, left, bottom, right = components.get(root, (0, rows[i], starts[i], rows[i] + 1, ends[i]))
+        components[root] = (pixels + int(ends[i] - starts[i]), int(min(top, rows[i])), int(min(left, starts[i])),
+                            int(max(bottom, rows[i] + 1)), int(max(right, ends[i])))
+    return list(components.values())
+
+def has_text_line(components):
+    """
+    Whether letter-sized components line up horizontally like a line of text
+
+    Components are chained from left to right: a component joins a line when
+    it overlaps the line vertically by at least half its height and starts
+    close enough to the line's right end.
+
+    Args:
+        components: (pixels, top, left, bottom, right) tuples from find_components
+
+    Returns:
+        bool: True when some chain is long enough to be a text line
+    """
+    glyphs = sorted(
+        (component for component in components if MIN_GLYPH_HEIGHT <= component[3] - component[1] <= MAX_GLYPH_HEIGHT),
+        key=lambda component: component[2]
+    )
+    lines = []  # [top, left, bottom, right, glyphs]
+    for _, top, left, bottom, right in glyphs:
+        for line in lines:
+            line_height = line[2] - line[0]
+            overlap = min(bottom, line[2]) - max(top, line[0])
+            if (overlap >= min(bottom - top, line_height) / 2
+                    and left - line[3] <= MAX_GLYPH_GAP_RATIO * max(bottom - top, line_height)):
+                line[0], line[2] = min(line[0], top), max(line[2], bottom)
+                line[3] = max(line[3], right)
+                line[4] += 1
+                break
+        else:
+            lines.append([top, left, bottom, right, 1])
+
+    return any(
+        glyph_count >= MIN_LINE_GLYPHS and right - left >= MIN_LINE_ASPECT * (bottom - top)
+        for top, left, bottom, right, glyph_count in lines
+    )
+
+def classify_page(image):
+    """
+    Decides whether a page is worth OCRing
+
+    Args:
+        image: PIL.Image of the page
+
+    Returns:
+        str: 'blank' (almost no ink), 'near_blank' (a little ink that does not
+            look like text, e.g. a stamp or a page number) or 'content'; pages
+            with a single line of text, such as a heading or a cover title,
+            are content
+    """
+    mask = ink_mask(image)
+    coverage = mask.mean()
+    if coverage >= SPARSE_COVERAGE:
+        return 'content'
+    if not mask.any():
+        return 'blank'
+
+    components = [component for component in find_components(mask) if component[0] >= MIN_COMPONENT_PIXELS]
+    if has_text_line(components):
+        return 'content'
+    if coverage < BLANK_COVERAGE:
+        return 'blank'
+    return 'near_blank' if len(components) < MIN_TEXT_COMPONENTS else 'content'
+
+def is_blank_page(image):
+    """Returns True for pages that can be skipped without OCR"""
+    return classify_page(image) != 'content'
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import pytesseract
+
+from doc_core.ocr.engine import engine_version
+from doc_core.ocr.tiling import PdfPageTiles
+
+# Default cache location and size limit
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".doc_core", "ocr_cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Eviction trims the cache down to this share of the limit
+EVICT_TO_RATIO = 0.9
+# Rows of a page hashed at a time when building its key
+PAGE_KEY_STRIP_ROWS = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS layouts (
+    key TEXT PRIMARY KEY,
+    layout TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS layouts_last_used ON layouts (last_used);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters (name, value) VALUES ('hits', 0), ('misses', 0), ('partial', 0);
+"""
+
+@lru_cache(maxsize=None)
+def tesseract_version(tesseract_cmd):
+    """Returns the OCR engine version string (looked up once per process and binary)"""
+    return engine_version()
+
+class OcrCache:
+    """
+    On-disk OCR result cache addressed by page content and OCR settings
+
+    Entries are keyed by a hash of the page raster, the OCR language, the
+    preprocessing options and the Tesseract engine and version, so a page that was
+    seen before costs only the hashing. The word/line layout of each page
+    is kept as well, keyed by the page alone, so that a page OCRed with
+    other settings can be updated line by line instead of OCRed again.
+    The cache is a SQLite file shared by all processes; the least recently
+    used entries are evicted once the stored data exceeds max_bytes. Hit,
+    miss and partial (layout update) counters are kept in the same file.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Opens a connection to the cache database"""
+        conn = sqlite3.connect(os.path.join(self.cache_dir, "ocr_cache.sqlite3"), timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def make_key(self, page_key, ocr_lang, preprocessing_options):
+        """
+        Builds the cache key of a page OCRed with given settings
+
+        Args:
+            page_key: Key of the page from make_page_key
+            ocr_lang: OCR language
+            preprocessing_options: Preprocessing options
+
+        Returns:
+            str: Hex digest identifying the page content and settings
+        """
+        digest = hashlib.sha256(page_key.encode())
+        digest.update(ocr_lang.encode())
+        digest.update(json.dumps(preprocessing_options, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def make_page_key(self, image):
+        """
+        Builds the key of a page independent of the OCR settings (used for layouts)
+
+        Args:
+            image: PIL.Image of the page before preprocessing, or a
+                PdfPageTiles, which is keyed by its document, page and
+                resolution instead of its raster (it is never rendered whole)
+
+        Returns:
+            str: Hex digest of the page raster and the Tesseract version
+        """
+        digest = hashlib.sha256()
+        if isinstance(image, PdfPageTiles):
+            digest.update(f"pdf:{image.file_hash}:{image.page_index}:{image.dpi}".encode())
+            digest.update(tesseract_version(pytesseract.pytesseract.tesseract_cmd).encode())
+            return digest.hexdigest()
+        digest.update(f"{image.mode}:{image.size}".encode())
+        # Hashed in strips of rows (same digest as the whole raster) so huge scans are not copied at once
+        for top in range(0, image.height, PAGE_KEY_STRIP_ROWS):
+            digest.update(image.crop((0, top, image.width, min(top + PAGE_KEY_STRIP_ROWS, image.height))).tobytes())
+        digest.update(tesseract_version(pytesseract.pytesseract.tesseract_cmd).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Looks up a cached OCR result and counts the hit or miss
+
+        Returns:
+            str: Cached text, or None if the page was not seen before
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT text FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'misses'")
+                return None
+            conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'hits'")
+            return row[0]
+
+    def put(self, key, text):
+        """Stores an OCR result and evicts old entries when the cache is too large"""
+        size = len(text.encode("utf-8"))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, text, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, text, size, time.time())
+            )
+            self._evict_if_full(conn)
+
+    def get_layout(self, page_key):
+        """
+        Returns the last stored layout of a page
+
+        Returns:
+            dict: Layout (see doc_core.ocr.layout), or None
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT layout FROM layouts WHERE key = ?", (page_key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE layouts SET last_used = ? WHERE key = ?", (time.time(), page_key))
+            return json.loads(row[0])
+
+    def put_layout(self, page_key, layout, partial=False):
+        """Stores the layout of a page; partial marks a line-by-line update of an earlier layout"""
+        data = json.dumps(layout)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO layouts (key, layout, size, last_used) VALUES (?, ?, ?, ?)",
+                (page_key, data, len(data), time.time())
+            )
+            if partial:
+                conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'partial'")
+            self._evict_if_full(conn)
+
+    def _evict_if_full(self, conn):
+        """Evicts entries when the stored text and layouts exceed the size limit"""
+        total = conn.execute(
+            "SELECT (SELECT COALESCE(SUM(size), 0) FROM entries) + (SELECT COALESCE(SUM(size), 0) FROM layouts)"
+        ).fetchone()[0]
+        if total > self.max_bytes:
+            self._evict(conn, total)
+
+    def _evict(self, conn, total):
+        """Deletes least recently used entries and layouts until the cache is below the target size"""
+        target = self.max_bytes * EVICT_TO_RATIO
+        rows = conn.execute(
+            "SELECT 'entries', key, size, last_used FROM entries "
+            "UNION ALL SELECT 'layouts', key, size, last_used FROM layouts ORDER BY last_used"
+        ).fetchall()
+        for table, key, size, _ in rows:
+            if total <= target:
+                break
+            conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self):
+        """
+        Returns the cache counters
+
+        Returns:
+            dict: 'hits', 'misses', 'partial' (pages updated line by line),
+                'entries' and 'size_bytes'
+        """
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            layout_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM layouts").fetchone()[0]
+        return {
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "partial": counters["partial"],
+            "entries": entries,
+            "size_bytes": size + layout_size,
+        }
+
+    def clear(self):
+        """Removes all entries and resets the counters"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM layouts")
+            conn.execute("UPDATE counters SET value = 0")
+
+_caches = {}
+
+def get_cache(cache_dir):
+    """Returns the OcrCache of a directory, opened once per process"""
+    if cache_dir not in _caches:
+        _caches[cache_dir] = OcrCache(cache_dir)
+    return _caches[cache_dir]
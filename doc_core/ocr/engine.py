@@ -0,0 +1,146 @@
+import os
+import threading
+
+import pytesseract
+
+# Optional in-process Tesseract binding; pytesseract (one tesseract process per call) is the fallback
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# Tesseract API handles of the current thread, by language
+_local = threading.local()
+# Languages the in-process engine failed to load (e.g. missing traineddata)
+_unavailable = set()
+
+def _tessdata_path():
+    """Returns the tessdata folder next to a configured tesseract executable, if there is one"""
+    tesseract_cmd = pytesseract.pytesseract.tesseract_cmd
+    if os.path.dirname(tesseract_cmd):
+        path = os.path.join(os.path.dirname(tesseract_cmd), "tessdata")
+        if os.path.isdir(path):
+            return path
+    return None
+
+def _get_api(ocr_lang):
+    """
+    Returns this thread's Tesseract API handle for a language, creating it on first use
+
+    Args:
+        ocr_lang: OCR language (e.g. "tur+eng")
+
+    Returns:
+        tesserocr.PyTessBaseAPI: Handle with the language models loaded, or None
+            when the in-process engine cannot be used
+    """
+    if tesserocr is None or ocr_lang in _unavailable:
+        return None
+
+    apis = getattr(_local, "apis", None)
+    if apis is None:
+        apis = _local.apis = {}
+
+    if ocr_lang not in apis:
+        kwargs = {"lang": ocr_lang}
+        tessdata = _tessdata_path()
+        if tessdata:
+            kwargs["path"] = tessdata
+        try:
+            apis[ocr_lang] = tesserocr.PyTessBaseAPI(**kwargs)
+        except RuntimeError:
+            _unavailable.add(ocr_lang)
+            return None
+    return apis[ocr_lang]
+
+def backend_name():
+    """Returns the name of the OCR backend used for new pages"""
+    return "tesserocr" if tesserocr is not None else "pytesseract"
+
+def engine_version():
+    """
+    Returns the version of the Tesseract library doing the recognition
+
+    Returns:
+        str: Backend name and Tesseract version
+    """
+    if tesserocr is not None:
+        return f"tesserocr {tesserocr.tesseract_version().splitlines()[0]}"
+    return f"pytesseract {pytesseract.get_tesseract_version()}"
+
+def preload(ocr_lang):
+    """Loads the language models of this thread's engine ahead of the first page"""
+    _get_api(ocr_lang)
+
+def _set_image(api, img):
+    """Passes an image to a Tesseract handle as a raw 8-bit gray or RGB buffer"""
+    # Other modes (bilevel, palette, alpha) are converted first
+    if img.mode not in ("L", "RGB"):
+        img = img.convert("RGB" if img.mode in ("P", "RGBA", "CMYK") else "L")
+    bytes_per_pixel = 1 if img.mode == "L" else 3
+    width, height = img.size
+    api.SetImageBytes(img.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+
+def image_to_string(img, ocr_lang):
+    """
+    Recognizes the text of an image
+
+    With tesserocr installed the pixels are passed straight to a long-lived
+    Tesseract handle, so there is no process start, temporary image file or
+    model reload per page. Otherwise pytesseract runs the tesseract command.
+
+    Args:
+        img: PIL.Image object
+        ocr_lang: OCR language
+
+    Returns:
+        str: Recognized text
+    """
+    api = _get_api(ocr_lang)
+    if api is None:
+        return pytesseract.image_to_string(img, lang=ocr_lang)
+
+    api.SetPageSegMode(tesserocr.PSM.AUTO)
+    _set_image(api, img)
+    return api.GetUTF8Text()
+
+def _parse_tsv(tsv):
+    """Turns Tesseract's TSV output into word dictionaries"""
+    words = []
+    for row in tsv.splitlines()[1:]:
+        fields = row.split("\t")
+        # Only word rows (level 5) with text; the others describe pages, blocks and lines
+        if len(fields) < 12 or fields[0] != "5" or not fields[11].strip():
+            continue
+        left, top, width, height = map(int, fields[6:10])
+        words.append({
+            "block": int(fields[2]),
+            "par": int(fields[3]),
+            "line": int(fields[4]),
+            "text": fields[11],
+            "conf": float(fields[10]),
+            "box": [left, top, left + width, top + height],
+        })
+    return words
+
+def image_to_data(img, ocr_lang, psm=None):
+    """
+    Recognizes the words of an image with their boxes and confidences
+
+    Args:
+        img: PIL.Image object
+        ocr_lang: OCR language
+        psm: Optional Tesseract page segmentation mode (e.g. 7 for a single line)
+
+    Returns:
+        list: Dictionaries with 'block', 'par', 'line' (Tesseract's layout
+            numbers), 'text', 'conf' (0-100) and 'box' ([left, top, right, bottom])
+    """
+    api = _get_api(ocr_lang)
+    if api is None:
+        config = f"--psm {psm}" if psm else ""
+        return _parse_tsv(pytesseract.image_to_data(img, lang=ocr_lang, config=config))
+
+    api.SetPageSegMode(psm if psm else tesserocr.PSM.AUTO)
+    _set_image(api, img)
+    return _parse_tsv(api.GetTSVText(0))
@@ -0,0 +1,290 @@
+import time
+from functools import partial
+
+import numpy as np
+from PIL import Image
+
+from doc_core.ocr.profiling import stage
+
+# Deskew search: angles tried (degrees) and the width of the image the search runs on
+DESKEW_MAX_ANGLE = 5.0
+DESKEW_STEP = 0.25
+DESKEW_SEARCH_WIDTH = 800
+# Sauvola defaults (window in pixels, sensitivity k, dynamic range of the standard deviation)
+SAUVOLA_WINDOW = 25
+SAUVOLA_K = 0.2
+SAUVOLA_R = 128.0
+# Pixels darker than this count as ink when cropping margins
+INK_THRESHOLD = 160
+# Margin kept around the text when cropping
+CROP_PADDING = 10
+
+def to_gray_array(image):
+    """Returns an 8-bit grayscale NumPy array of a PIL image"""
+    return np.asarray(image.convert('L'), dtype=np.uint8)
+
+def otsu_threshold(gray):
+    """
+    Computes Otsu's global threshold from the gray-level histogram
+
+    Args:
+        gray: 2-D uint8 array
+
+    Returns:
+        int: Threshold maximizing the between-class variance
+    """
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weight = np.cumsum(hist)
+    mean = np.cumsum(hist * np.arange(256))
+    total_weight, total_mean = weight[-1], mean[-1]
+
+    background = weight
+    foreground = total_weight - weight
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (total_mean * background - mean * total_weight) ** 2 / (background * foreground)
+    between[~np.isfinite(between)] = 0
+    return int(np.argmax(between))
+
+def binarize_otsu(gray):
+    """Binarizes with Otsu's threshold; returns a uint8 array of 0 (ink) and 255 (paper)"""
+    return np.where(gray > otsu_threshold(gray), 255, 0).astype(np.uint8)
+
+def _window_sums(values, window):
+    """Sums of each pixel's window x window neighbourhood using an integral image"""
+    padded = np.pad(values, window // 2, mode='edge')
+    # Leading row and column of zeros so every window is a difference of four corners
+    integral = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1))
+    integral[1:, 1:] = padded.cumsum(axis=0).cumsum(axis=1)
+    height, width = values.shape
+    return (integral[window:window + height, window:window + width]
+            - integral[:height, window:window + width]
+            - integral[window:window + height, :width]
+            + integral[:height, :width])
+
+def binarize_sauvola(gray, window=SAUVOLA_WINDOW, k=SAUVOLA_K, r=SAUVOLA_R):
+    """
+    Binarizes with Sauvola's local threshold, which copes with uneven lighting and stains
+
+    Args:
+        gray: 2-D uint8 array
+        window: Odd side length of the local window in pixels
+        k: Sensitivity; higher values keep less ink
+        r: Dynamic range of the local standard deviation
+
+    Returns:
+        np.ndarray: uint8 array of 0 (ink) and 255 (paper)
+    """
+    window = window | 1
+    values = gray.astype(np.float64)
+    count = window * window
+    mean = _window_sums(values, window) / count
+    variance = _window_sums(values * values, window) / count - mean * mean
+    std = np.sqrt(np.maximum(variance, 0))
+    threshold = mean * (1 + k * (std / r - 1))
+    return np.where(values > threshold, 255, 0).astype(np.uint8)
+
+def denoise(gray):
+    """
+    Removes salt-and-pepper noise with a 3x3 median filter
+
+    Args:
+        gray: 2-D uint8 array
+
+    Returns:
+        np.ndarray: Filtered array of the same shape
+    """
+    padded = np.pad(gray, 1, mode='edge')
+    height, width = gray.shape
+    neighbours = np.stack([
+        padded[dy:dy + height, dx:dx + width] for dy in range(3) for dx in range(3)
+    ])
+    return np.partition(neighbours, 4, axis=0)[4]
+
+def estimate_skew(gray, max_angle=DESKEW_MAX_ANGLE, step=DESKEW_STEP):
+    """
+    Estimates the skew of a text page from horizontal projection profiles
+
+    Text lines give the sharpest row profile (highest variance of the row
+    ink sums) when they are horizontal, so the page is rotated over a range
+    of small angles on a downscaled ink mask and the best angle is kept.
+
+    Args:
+        gray: 2-D uint8 array
+        max_angle: Largest skew tried in either direction, in degrees
+        step: Angle resolution in degrees
+
+    Returns:
+        float: Rotation in degrees that straightens the page
+    """
+    mask = Image.fromarray(np.where(gray <= otsu_threshold(gray), 255, 0).astype(np.uint8))
+    if mask.width > DESKEW_SEARCH_WIDTH:
+        scale = DESKEW_SEARCH_WIDTH / mask.width
+        mask = mask.resize((DESKEW_SEARCH_WIDTH, max(1, int(mask.height * scale))), Image.BILINEAR)
+
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_angle, max_angle + step / 2, step):
+        rows = np.asarray(mask.rotate(angle, resample=Image.NEAREST), dtype=np.float64).sum(axis=1)
+        score = float(np.var(rows))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+def deskew(gray, max_angle=DESKEW_MAX_ANGLE, step=DESKEW_STEP, geometry=None):
+    """
+    Rotates a page so its text lines are horizontal; returns the straightened array
+
+    The rotation is recorded as 'deskew_angle' in geometry when a dictionary is given.
+    """
+    angle = estimate_skew(gray, max_angle, step)
+    if geometry is not None:
+        geometry["deskew_angle"] = angle
+    if angle == 0:
+        return gray
+    rotated = Image.fromarray(gray).rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    return np.asarray(rotated, dtype=np.uint8)
+
+def auto_crop(gray, ink_threshold=INK_THRESHOLD, padding=CROP_PADDING, geometry=None):
+    """
+    Crops blank margins around the text
+
+    Args:
+        gray: 2-D uint8 array
+        ink_threshold: Pixels darker than this count as ink
+        padding: Margin kept around the ink in pixels
+        geometry: Optional dictionary that receives the 'crop_box' (left, top, right, bottom)
+
+    Returns:
+        np.ndarray: Cropped array (unchanged when the page has no ink)
+    """
+    ink = gray < ink_threshold
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    if rows.size == 0:
+        return gray
+    top = max(rows[0] - padding, 0)
+    bottom = min(rows[-1] + padding + 1, gray.shape[0])
+    left = max(cols[0] - padding, 0)
+    right = min(cols[-1] + padding + 1, gray.shape[1])
+    if geometry is not None:
+        geometry["crop_box"] = [int(left), int(top), int(right), int(bottom)]
+    return gray[top:bottom, left:right]
+
+def apply_geometry(image, geometry):
+    """
+    Moves a page image the way deskewing and cropping moved it during preprocessing
+
+    The recorded rotation and crop box are applied to the image as it is
+    (e.g. the colour render), so it lines up with the preprocessed page
+    without preprocessing it again.
+
+    Args:
+        image: PIL.Image of the page before preprocessing
+        geometry: Dictionary filled by prepare_image ('deskew_angle', 'crop_box')
+
+    Returns:
+        PIL.Image: Rotated and cropped image
+    """
+    if geometry.get("deskew_angle"):
+        image = image.rotate(geometry["deskew_angle"], resample=Image.BICUBIC, expand=True, fillcolor="white")
+    if geometry.get("crop_box"):
+        image = image.crop(tuple(geometry["crop_box"]))
+    return image
+
+def _timer(timings, profile):
+    """Returns a function that runs an operation, adding its seconds to timings and its stage to profile"""
+    def timed(name, func, *args):
+        with stage(profile, f"preprocess.{name}"):
+            start = time.perf_counter()
+            result = func(*args)
+            if timings is not None:
+                timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+        return result
+    return timed
+
+def prepare_image(image, preprocessing_options, timings=None, profile=None, geometry=None):
+    """
+    Runs the preprocessing steps before thresholding (denoise, deskew, crop and resize)
+
+    Args:
+        image: PIL.Image object
+        preprocessing_options: Dictionary containing preprocessing options
+        timings: Optional dictionary that receives the seconds spent per operation
+        profile: Optional list that receives a 'preprocess.<operation>' stage record per operation
+        geometry: Optional dictionary that receives the 'deskew_angle' and
+            'crop_box' the page was moved by (see apply_geometry)
+
+    Returns:
+        PIL.Image: Prepared image, to be passed to threshold_image
+    """
+    timed = _timer(timings, profile)
+
+    # Every step returns a new image, so the input is never modified and needs no copy
+    img = image
+
+    # Array operations work on grayscale; plain resizing keeps the colour image
+    array_ops = [op for op in ('denoise', 'deskew', 'auto_crop') if preprocessing_options.get(op, False)]
+    if array_ops:
+        gray = timed('grayscale', to_gray_array, img)
+        if 'denoise' in array_ops:
+            gray = timed('denoise', denoise, gray)
+        if 'deskew' in array_ops:
+            gray = timed('deskew', partial(deskew, geometry=geometry), gray)
+        if 'auto_crop' in array_ops:
+            gray = timed('auto_crop', partial(auto_crop, geometry=geometry), gray)
+        img = Image.fromarray(gray)
+
+    # Resizing
+    if preprocessing_options.get('apply_resize', False):
+        scale_factor = preprocessing_options.get('scale_factor', 1.5)
+        width, height = img.size
+        new_width = int(width * scale_factor)
+        new_height = int(height * scale_factor)
+        img = timed('resize', img.resize, (new_width, new_height), Image.LANCZOS)
+
+    return img
+
+def threshold_image(img, preprocessing_options, timings=None, profile=None):
+    """
+    Runs the thresholding step on an image from prepare_image
+
+    Args:
+        img: PIL.Image returned by prepare_image
+        preprocessing_options: Dictionary containing preprocessing options
+        timings: Optional dictionary that receives the seconds spent per operation
+        profile: Optional list that receives a 'preprocess.threshold' stage record
+
+    Returns:
+        PIL.Image: Processed image (the input when thresholding is off)
+    """
+    if not preprocessing_options.get('apply_threshold', False):
+        return img
+
+    timed = _timer(timings, profile)
+    method = preprocessing_options.get('threshold_method', 'fixed')
+    if method == 'otsu':
+        return Image.fromarray(timed('threshold', binarize_otsu, to_gray_array(img)))
+    if method == 'sauvola':
+        return Image.fromarray(timed('threshold', binarize_sauvola, to_gray_array(img)))
+    threshold_value = preprocessing_options.get('threshold_value', 128)
+    img = img.convert('L')  # Convert to grayscale
+    return timed('threshold', img.point, lambda x: 0 if x < threshold_value else 255, '1')  # Apply thresholding
+
+def preprocess_image(image, preprocessing_options, timings=None, profile=None, geometry=None):
+    """
+    Pre-processes image according to user settings
+
+    Args:
+        image PIL.Image object
+        preprocessing_options: Dictionary containing preprocessing options
+        timings: Optional dictionary that receives the seconds spent per operation
+        profile: Optional list that receives a 'preprocess.<operation>' stage
+            record (wall time, CPU time, peak memory) per operation
+        geometry: Optional dictionary that receives the rotation and crop box (see prepare_image)
+
+    Returns:
+        PIL.Image: Processed image
+    """
+    if timings is None:
+        timings = {}
+    prepared = prepare_image(image, preprocessing_options, timings, profile, geometry)
+    return threshold_image(prepared, preprocessing_options, timings, profile)
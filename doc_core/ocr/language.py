@@ -0,0 +1,151 @@
+import re
+import time
+
+from PIL import Image
+
+from doc_core.ocr import engine
+from doc_core.ocr.rendering import PREVIEW_DPI
+
+# Value of the OCR language setting that detects the languages of each document
+AUTO_LANG = "auto"
+# Languages the detection chooses from, also used when it is not sure
+DEFAULT_LANGUAGES = "tur+eng"
+# Pages probed per document (spread evenly over the pages to OCR) and their resolution
+PROBE_PAGES = 3
+PROBE_DPI = PREVIEW_DPI
+# Image pages are probed on a copy at most this wide
+PROBE_WIDTH = 1000
+# Fewer recognized words than this are too little evidence; all candidates are kept
+MIN_PROBE_WORDS = 15
+# A language found in less than this share of the words is left out
+MIN_LANGUAGE_SHARE = 0.1
+# Letters only one of the candidate languages uses count this many trigram hits
+LETTER_WEIGHT = 3
+
+# Frequent character trigrams that tell the languages apart (spaces mark word edges)
+LANGUAGE_TRIGRAMS = {
+    "tur": {
+        "lar", "ler", "bir", "ını", "ini", "ın ", "nın", "nin", "ası", "esi", "yor", "dır",
+        "dir", "lan", "len", "iyo", "mak", "mek", " ve", "ınd", "ind", "dan", "den", " bu",
+        "ık ", "ik ", "rak", "rek", "ya ", "ye ",
+    },
+    "eng": {
+        " th", "the", "he ", "ing", "ng ", "and", "nd ", "ion", "tio", " of", "of ", "ed ",
+        " to", "hat", "tha", "for", " fo", "wit", "ith", " wh", "ly ", "his", "ous", "ts ",
+        "es ", "are", "was", "ll ", "oul", "ght",
+    },
+}
+# Letters that only occur in one of the languages
+LANGUAGE_LETTERS = {
+    "tur": set("çğıöşüâîû"),
+    "eng": set("wqx"),
+}
+
+def _word_language(word, candidates):
+    """Returns the candidate language a word looks like, or None when it is unclear"""
+    padded = f" {word} "
+    trigrams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+    scores = {
+        lang: len(trigrams & LANGUAGE_TRIGRAMS.get(lang, set()))
+        + LETTER_WEIGHT * len(set(word) & LANGUAGE_LETTERS.get(lang, set()))
+        for lang in candidates
+    }
+    best = max(scores.values())
+    winners = [lang for lang, score in scores.items() if score == best]
+    return winners[0] if best and len(winners) == 1 else None
+
+def language_shares(text, candidates):
+    """
+    Counts which candidate language each recognized word looks like
+
+    Args:
+        text: Text from the probe pass
+        candidates: Language codes to choose from
+
+    Returns:
+        tuple: (share of the classified words per language, number of classified words)
+    """
+    counts = dict.fromkeys(candidates, 0)
+    for word in re.findall(r"[^\W\d_]{2,}", text.lower()):
+        lang = _word_language(word, candidates)
+        if lang:
+            counts[lang] += 1
+    total = sum(counts.values())
+    return {lang: count / total if total else 0.0 for lang, count in counts.items()}, total
+
+def choose_languages(text, candidates=DEFAULT_LANGUAGES):
+    """
+    Picks the smallest set of language models that covers a probe text
+
+    Args:
+        text: Text from the probe pass
+        candidates: Tesseract language string to choose from (e.g. "tur+eng")
+
+    Returns:
+        str: Tesseract language string, the candidates themselves when the
+            probe found too few words
+    """
+    langs = candidates.split("+")
+    shares, words = language_shares(text, langs)
+    if words < MIN_PROBE_WORDS:
+        return candidates
+    chosen = [lang for lang in langs if shares[lang] >= MIN_LANGUAGE_SHARE]
+    return "+".join(chosen) if chosen else candidates
+
+def probe_copy(image):
+    """Low-resolution copy of a page image for the language probe"""
+    if image.width <= PROBE_WIDTH:
+        return image
+    return image.resize((PROBE_WIDTH, max(1, round(image.height * PROBE_WIDTH / image.width))), Image.BOX)
+
+def probe_images(store, page_indexes):
+    """Low-resolution copies of a few pages of a PageStore for the language probe"""
+    if not store.is_pdf:
+        return [probe_copy(store.image())]
+    page_indexes = list(page_indexes)
+    step = max(len(page_indexes) // PROBE_PAGES, 1)
+    return [store.image(i, PROBE_DPI) for i in page_indexes[::step][:PROBE_PAGES]]
+
+def detect_language(probes, candidates=DEFAULT_LANGUAGES):
+    """
+    Detects the languages of a document from a fast low-resolution OCR pass
+
+    The probes are read with all candidate models and the recognized words
+    are classified by their character trigrams. When fewer models are
+    chosen, the probes are read again with them to measure how much faster
+    the smaller set is.
+
+    Args:
+        probes: Low-resolution PIL.Images (see probe_images)
+        candidates: Tesseract language string to choose from
+
+    Returns:
+        dict: 'lang' (chosen language string), 'candidates', 'shares' (share
+            of the probe words per language), 'probe_seconds' (time of the
+            probe pass) and 'speedup' (OCR time with all candidates divided
+            by the time with the chosen languages, measured on the probes)
+    """
+    start = time.perf_counter()
+    text = "\n".join(engine.image_to_string(probe, candidates) for probe in probes)
+    full_seconds = time.perf_counter() - start
+
+    lang = choose_languages(text, candidates)
+    speedup = 1.0
+    if lang != candidates and full_seconds:
+        chosen_start = time.perf_counter()
+        for probe in probes:
+            engine.image_to_string(probe, lang)
+        # Timing noise on small probes must not report a slowdown
+        speedup = max(full_seconds / max(time.perf_counter() - chosen_start, 1e-6), 1.0)
+
+    return {
+        "lang": lang,
+        "candidates": candidates,
+        "shares": language_shares(text, candidates.split("+"))[0],
+        "probe_seconds": time.perf_counter() - start,
+        "speedup": speedup,
+    }
+
+def fixed_language(ocr_lang):
+    """Language report for a language chosen by the user (no probe)"""
+    return {"lang": ocr_lang, "candidates": ocr_lang, "shares": {}, "probe_seconds": 0.0, "speedup": 1.0}
@@ -0,0 +1,196 @@
+import hashlib
+
+import numpy as np
+
+from doc_core.ocr import engine
+from doc_core.ocr.image_processing import prepare_image, preprocess_image, threshold_image
+
+# Lines with a lower mean word confidence are re-OCRed when settings change
+MIN_LINE_CONFIDENCE = 60
+# A region counts as changed when this share of its pixels differs after preprocessing
+CHANGED_PIXEL_RATIO = 0.01
+# Above this share of lines to redo, a full page OCR is cheaper than line crops
+MAX_PARTIAL_RATIO = 0.5
+# Margin around a line box when it is cropped for re-OCR
+LINE_PADDING = 4
+# Tesseract page segmentation mode for a single text line
+PSM_SINGLE_LINE = 7
+# Options that move or scale the page; word boxes cannot be reused when they change
+GEOMETRY_OPTIONS = ('apply_resize', 'scale_factor', 'deskew', 'auto_crop')
+# Options of the thresholding step; the steps before it are shared when only these change
+THRESHOLD_OPTIONS = ('apply_threshold', 'threshold_method', 'threshold_value')
+
+def _group_lines(words):
+    """Groups words (in reading order) into line dictionaries"""
+    lines = []
+    for word in words:
+        key = (word["block"], word["par"], word["line"])
+        if not lines or (lines[-1]["block"], lines[-1]["par"], lines[-1]["line"]) != key:
+            lines.append({"block": key[0], "par": key[1], "line": key[2], "words": []})
+        lines[-1]["words"].append({"text": word["text"], "conf": word["conf"], "box": word["box"]})
+
+    for line in lines:
+        boxes = np.array([word["box"] for word in line["words"]])
+        line["box"] = [int(boxes[:, 0].min()), int(boxes[:, 1].min()), int(boxes[:, 2].max()), int(boxes[:, 3].max())]
+    return lines
+
+def line_confidence(line):
+    """Returns the mean word confidence of a line"""
+    return sum(word["conf"] for word in line["words"]) / len(line["words"])
+
+def recognize_layout(processed_img, ocr_lang, preprocessing_options, geometry=None):
+    """
+    OCRs a preprocessed page into lines of words with boxes and confidences
+
+    Args:
+        processed_img: Preprocessed PIL.Image of the page
+        ocr_lang: OCR language
+        preprocessing_options: Options the image was preprocessed with
+        geometry: Rotation and crop box preprocessing applied (see prepare_image)
+
+    Returns:
+        dict: Layout with 'lang', 'preprocessing_options', 'geometry', 'size'
+            and 'lines' (each with 'block', 'par', 'line', 'box' and 'words')
+    """
+    return {
+        "lang": ocr_lang,
+        "preprocessing_options": preprocessing_options,
+        "geometry": geometry or {},
+        "size": list(processed_img.size),
+        "lines": _group_lines(engine.image_to_data(processed_img, ocr_lang)),
+    }
+
+def layout_text(layout):
+    """
+    Rebuilds the page text from a layout
+
+    Lines are separated by a newline and paragraphs by an empty line, as in
+    Tesseract's plain text output.
+    """
+    text = ""
+    previous = None
+    for line in layout["lines"]:
+        if previous is not None:
+            text += "\n" if (line["block"], line["par"]) == previous else "\n\n"
+        text += " ".join(word["text"] for word in line["words"])
+        previous = (line["block"], line["par"])
+    return text + "\n" if text else ""
+
+def _changed_mask(img, old_options, new_options, geometry=None):
+    """
+    Pixels that differ between the page preprocessed with the old and the new options
+
+    The steps before thresholding (deskew, crop, resize) run once and are
+    shared by both versions unless an option of those steps changed. The
+    geometry of the new version is recorded in geometry.
+    """
+    prepared = prepare_image(img, new_options, geometry=geometry)
+    new_img = threshold_image(prepared, new_options)
+    same_preparation = all(
+        old_options.get(op) == new_options.get(op)
+        for op in set(old_options) | set(new_options) if op not in THRESHOLD_OPTIONS
+    )
+    old_img = threshold_image(prepared if same_preparation else prepare_image(img, old_options), old_options)
+    old, new = np.asarray(old_img.convert('L')), np.asarray(new_img.convert('L'))
+    if old.shape != new.shape:
+        return new_img, None
+    return new_img, old != new
+
+def _region_changed(changed, line):
+    """Whether enough pixels of a line's box changed"""
+    left, top, right, bottom = line["box"]
+    region = changed[top:bottom, left:right]
+    return bool(region.size) and region.mean() > CHANGED_PIXEL_RATIO
+
+def _line_crop(processed_img, line):
+    """Returns the padded crop box of a line and the crop"""
+    left, top, right, bottom = line["box"]
+    left, top = max(left - LINE_PADDING, 0), max(top - LINE_PADDING, 0)
+    right = min(right + LINE_PADDING, processed_img.width)
+    bottom = min(bottom + LINE_PADDING, processed_img.height)
+    return (left, top, right, bottom), processed_img.crop((left, top, right, bottom))
+
+def _line_key(crop, ocr_lang):
+    """Key of a line crop and language; a line re-OCRed with the same key would read the same"""
+    # Hashed as grayscale, so a thresholded crop matches the same pixels in gray
+    digest = hashlib.sha256(f"{ocr_lang}:{crop.size}".encode())
+    digest.update(crop.convert('L').tobytes())
+    return digest.hexdigest()
+
+def _reocr_line(crop_box, crop, line, ocr_lang):
+    """OCRs the crop of one line and returns the line with the new words in page coordinates"""
+    left, top = crop_box[:2]
+    words = [
+        {"text": word["text"], "conf": word["conf"],
+         "box": [word["box"][0] + left, word["box"][1] + top, word["box"][2] + left, word["box"][3] + top]}
+        for word in engine.image_to_data(crop, ocr_lang, psm=PSM_SINGLE_LINE)
+    ]
+    return {**line, "words": words, "key": _line_key(crop, ocr_lang)}
+
+def update_layout(img, previous, ocr_lang, preprocessing_options):
+    """
+    Brings a page layout up to date with new preprocessing options
+
+    Only lines whose pixels changed under the new options, or whose
+    confidence was low, are cropped and re-OCRed; the other lines are kept.
+    A line is not re-OCRed again when its crop is the one it was last
+    re-OCRed from (e.g. a low-confidence line whose pixels did not change).
+    A full OCR is done instead when the previous layout cannot be reused:
+    different language, options that move the page, changes outside the
+    known lines (possibly new text), or too many lines to redo.
+
+    Args:
+        img: PIL.Image of the page before preprocessing
+        previous: Layout of the same page from an earlier run, or None
+        ocr_lang: OCR language
+        preprocessing_options: New preprocessing options
+
+    Returns:
+        tuple: (layout, number of re-OCRed lines, or None after a full OCR)
+    """
+    reusable = (
+        previous is not None
+        and previous["lang"] == ocr_lang
+        and all(previous["preprocessing_options"].get(op) == preprocessing_options.get(op) for op in GEOMETRY_OPTIONS)
+    )
+    geometry = {}
+    if not reusable:
+        processed_img = preprocess_image(img, preprocessing_options, geometry=geometry)
+        return recognize_layout(processed_img, ocr_lang, preprocessing_options, geometry), None
+
+    processed_img, changed = _changed_mask(img, previous["preprocessing_options"], preprocessing_options, geometry)
+    if changed is None or list(processed_img.size) != previous["size"]:
+        return recognize_layout(processed_img, ocr_lang, preprocessing_options, geometry), None
+
+    # Changes outside every known line may be text that was not visible before
+    outside = changed.copy()
+    for line in previous["lines"]:
+        left, top, right, bottom = line["box"]
+        outside[top:bottom, left:right] = False
+    redo = {}
+    for i, line in enumerate(previous["lines"]):
+        if _region_changed(changed, line) or line_confidence(line) < MIN_LINE_CONFIDENCE:
+            crop_box, crop = _line_crop(processed_img, line)
+            if line.get("key") != _line_key(crop, ocr_lang):
+                redo[i] = crop_box, crop
+    if outside.mean() > CHANGED_PIXEL_RATIO or len(redo) > MAX_PARTIAL_RATIO * len(previous["lines"]):
+        return recognize_layout(processed_img, ocr_lang, preprocessing_options, geometry), None
+
+    lines = list(previous["lines"])
+    for i, (crop_box, crop) in redo.items():
+        new_line = _reocr_line(crop_box, crop, lines[i], ocr_lang)
+        if _region_changed(changed, lines[i]):
+            # The pixels are different now, so the new reading replaces the old one
+            lines[i] = new_line
+        elif new_line["words"] and line_confidence(new_line) > line_confidence(lines[i]):
+            lines[i] = new_line
+        else:
+            # Keep the old reading, but remember that this crop was tried
+            lines[i] = {**lines[i], "key": new_line["key"]}
+    layout = {
+        **previous,
+        "preprocessing_options": preprocessing_options,
+        "geometry": geometry,
+        "lines": [line for line in lines if line["words"]],
+    }
+    return layout, len(redo)
@@ -0,0 +1,194 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from PIL import Image
+
+from doc_core.ocr.rendering import (DEFAULT_DPI, count_pdf_bytes_pages, iter_rendered_pages, pdf_page_sizes,
+                                    pixel_size, render_pdf_page)
+from doc_core.ocr.tiling import LARGE_IMAGE_PIXELS, PdfPageTiles
+
+# Decoded page images kept per document (previews and recently used pages)
+MAX_STORED_IMAGES = 16
+# Pixel limit of image files opened for OCR: large-format scans (an A0 drawing at
+# 600 DPI is about 560 million pixels) are OCRed in tiles. Other image files keep
+# Pillow's decompression bomb limit.
+MAX_PAGE_PIXELS = 1_000_000_000
+
+# Pillow's limit is a module setting, so raising it is serialized within the process
+_pixel_limit_lock = threading.Lock()
+
+@contextmanager
+def _pixel_limit(max_pixels):
+    """Raises Pillow's decompression bomb limit inside the block (unchanged when max_pixels is None)"""
+    if max_pixels is None or Image.MAX_IMAGE_PIXELS is None:
+        yield
+        return
+    with _pixel_limit_lock:
+        saved = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = max(saved, max_pixels)
+        try:
+            yield
+        finally:
+            Image.MAX_IMAGE_PIXELS = saved
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class PageStore:
+    """
+    Decoded pages of one uploaded document, shared by OCR and previews
+
+    The upload is kept as bytes and every page is decoded or rendered from
+    them at most once per resolution: image files are decoded a single
+    time, PDF pages are rendered on demand. The most recently used images
+    are kept so switching between previews, or OCRing a page that was just
+    previewed, does not decode it again.
+
+    Poppler reads PDFs from a file, so a PDF is written to one temporary
+    file on first use and every page count and render reads that file. It
+    is removed by close() or when the store is garbage collected.
+
+    PDF pages too large to render whole are handed out for OCR as
+    PdfPageTiles, which render one tile at a time.
+    """
+
+    def __init__(self, file_bytes, is_pdf, max_images=MAX_STORED_IMAGES, max_pixels=None):
+        """
+        Args:
+            file_bytes: Content of the uploaded file
+            is_pdf: Whether the file is a PDF
+            max_images: Decoded images kept
+            max_pixels: Pixel limit for opening image files (e.g. MAX_PAGE_PIXELS
+                for OCR); None keeps Pillow's decompression bomb limit
+        """
+        self.file_bytes = file_bytes
+        self.is_pdf = is_pdf
+        self.file_hash = hashlib.sha256(file_bytes).hexdigest()
+        self.max_images = max_images
+        self.max_pixels = max_pixels
+        self._images = OrderedDict()
+        self._page_count = None
+        self._page_sizes = None
+        self._pdf_path = None
+        self._remove_pdf = None
+
+    def pdf_path(self):
+        """Returns the temporary file holding the PDF, writing it on first use"""
+        if self._pdf_path is None:
+            fd, path = tempfile.mkstemp(suffix=".pdf")
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.file_bytes)
+            self._pdf_path = path
+            self._remove_pdf = weakref.finalize(self, _remove_file, path)
+        return self._pdf_path
+
+    def close(self):
+        """Removes the temporary PDF file (it is written again if the store is used later)"""
+        if self._remove_pdf is not None:
+            self._remove_pdf()
+            self._pdf_path = self._remove_pdf = None
+
+    def page_count(self):
+        """Returns the number of pages (1 for image files)"""
+        if self._page_count is None:
+            self._page_count = count_pdf_bytes_pages(self.file_bytes, self.pdf_path()) if self.is_pdf else 1
+        return self._page_count
+
+    def page_size(self, page_index, dpi):
+        """
+        Returns the size in pixels a PDF page renders to, without rendering it
+
+        Returns:
+            tuple: (width, height), or None when the PDF cannot be read without Poppler
+        """
+        if self._page_sizes is None:
+            try:
+                self._page_sizes = pdf_page_sizes(self.file_bytes)
+            except Exception:
+                self._page_sizes = []
+        if page_index >= len(self._page_sizes):
+            return None
+        return pixel_size(self._page_sizes[page_index], dpi)
+
+    def _tiles(self, page_index, dpi):
+        """Returns PdfPageTiles for a page too large to render whole, else None"""
+        size = self.page_size(page_index, dpi)
+        if size is None or size[0] * size[1] <= LARGE_IMAGE_PIXELS:
+            return None
+        return PdfPageTiles(self.pdf_path(), page_index, dpi, size, self.file_hash)
+
+    def _remember(self, key, image):
+        """Stores a decoded image, dropping the least recently used ones"""
+        self._images[key] = image
+        self._images.move_to_end(key)
+        while len(self._images) > self.max_images:
+            self._images.popitem(last=False)
+
+    def image(self, page_index=0, dpi=DEFAULT_DPI):
+        """
+        Returns the image of a page, decoding or rendering it on first use
+
+        Args:
+            page_index: 0-based page index
+            dpi: Render resolution (ignored for image files)
+
+        Returns:
+            PIL.Image: Page image
+        """
+        key = (page_index, dpi if self.is_pdf else None)
+        if key in self._images:
+            self._images.move_to_end(key)
+            return self._images[key]
+
+        if self.is_pdf:
+            image = render_pdf_page(self.file_bytes, page_index, dpi, self.pdf_path())
+        else:
+            with _pixel_limit(self.max_pixels):
+                image = Image.open(io.BytesIO(self.file_bytes))
+            image.load()
+        self._remember(key, image)
+        return image
+
+    def iter_images(self, page_indexes, dpi=DEFAULT_DPI):
+        """
+        Yields page images for OCR without keeping them all in memory
+
+        Pages already in the store are reused; the others are rendered a
+        few at a time and not stored, so memory stays flat on long documents.
+        Pages too large to render whole come as PdfPageTiles.
+
+        Args:
+            page_indexes: Sorted 0-based page indexes
+            dpi: Render resolution
+
+        Yields:
+            tuple: (page_index, PIL.Image or PdfPageTiles) in page order
+        """
+        if not self.is_pdf:
+            for index in page_indexes:
+                yield index, self.image(index)
+            return
+
+        ready = {i: self._images[(i, dpi)] for i in page_indexes if (i, dpi) in self._images}
+        for i in page_indexes:
+            tiles = self._tiles(i, dpi) if i not in ready else None
+            if tiles is not None:
+                ready[i] = tiles
+        missing = [i for i in page_indexes if i not in ready]
+        rendered = (iter_rendered_pages(self.file_bytes, pages=missing, dpi=dpi, pdf_path=self.pdf_path())
+                    if missing else None)
+        try:
+            for index in page_indexes:
+                yield (index, ready[index]) if index in ready else next(rendered)
+        finally:
+            if rendered is not None:
+                rendered.close()
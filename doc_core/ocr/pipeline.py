@@ -0,0 +1,572 @@
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+
+import pytesseract
+
+from doc_core.jobs import JOB_DIR, JOB_RETENTION_SECONDS
+from doc_core.ocr import engine
+from doc_core.ocr.blank_pages import is_blank_page
+from doc_core.ocr.cache import DEFAULT_CACHE_DIR, get_cache
+from doc_core.ocr.image_processing import preprocess_image
+from doc_core.ocr.language import (AUTO_LANG, DEFAULT_LANGUAGES, PROBE_PAGES, detect_language,
+                                   fixed_language, probe_copy, probe_images)
+from doc_core.ocr.layout import layout_text, recognize_layout, update_layout
+from doc_core.ocr.page_store import MAX_PAGE_PIXELS, PageStore
+from doc_core.ocr.profiling import document_stage, set_page, stage
+from doc_core.ocr.rendering import DEFAULT_DPI
+from doc_core.ocr.resolution import AUTO_DPI, choose_render_dpi
+from doc_core.ocr.searchable_pdf import (DEFAULT_IMAGE_DPI, SearchablePdfWriter, insert_original_pages,
+                                         page_image_for_layout)
+from doc_core.ocr.text_layer import probe_text_layer
+from doc_core.ocr.tiling import LARGE_IMAGE_PIXELS, PdfPageTiles, needs_tiling, overview, recognize_tiled
+
+# Searchable PDFs made by OCR jobs
+EXPORT_DIR = os.path.join(JOB_DIR, "exports")
+
+def configure_paths(tesseract_path, poppler_path):
+    """
+    Configures Tesseract and Poppler paths
+    
+    Args:
+        tesseract_path: Path to the tesseract exe file
+        poppler_path: Path to the poppler bin folder
+    
+    Returns:
+        bool Whether the Poppler path exists
+    """
+    # Adjust tesseract path
+    pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    
+    # Check and adjust poppler path
+    if os.path.exists(poppler_path):
+        os.environ["PATH"] += os.pathsep + poppler_path
+        return True
+    else:
+        return False
+
+def remove_old_exports(max_age=JOB_RETENTION_SECONDS):
+    """
+    Deletes searchable PDFs in EXPORT_DIR that were last written more than `max_age` seconds ago
+    
+    Returns:
+        int: Number of files deleted
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(EXPORT_DIR))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            # Removed by another server process, or still open on Windows
+            pass
+    return removed
+
+@contextmanager
+def _child_environment(**variables):
+    """Sets environment variables for the processes started inside the block and restores them after"""
+    saved = {name: os.environ.get(name) for name in variables}
+    os.environ.update(variables)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+def _init_ocr_worker(tesseract_cmd, ocr_lang):
+    """Prepares an OCR worker process"""
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    # Load the language models once, while the first pages are still rendering
+    engine.preload(ocr_lang)
+
+def _recognize(img, ocr_lang, preprocessing_options, cache_dir=None, skip_blank=False, keep_layout=False,
+               profile=None):
+    """
+    Preprocesses and OCRs an image, reusing cached results when possible
+    
+    With a cache, a page seen with the same settings costs only a lookup,
+    and a page seen with other settings is updated from its stored word
+    layout, re-OCRing only the lines that changed or had low confidence.
+    Very large pages are OCRed in tiles.
+    
+    Args:
+        profile: Optional list that receives the stage records of the page
+            ('blank_check', 'cache', 'preprocess.<operation>', 'ocr',
+            'ocr.update' and 'assembly'; see profiling.stage)
+    
+    Returns:
+        tuple: (text, layout); text is None when skip_blank is set and the
+            page is blank or holds only a stamp or page number, and the word
+            layout is returned only with keep_layout
+    """
+    tiled = needs_tiling(img)
+    if skip_blank:
+        with stage(profile, "blank_check"):
+            blank = is_blank_page(overview(img) if tiled else img)
+        if blank:
+            return None, None
+    
+    if not cache_dir:
+        if tiled:
+            layout = recognize_tiled(img, ocr_lang, preprocessing_options, profile)
+        else:
+            geometry = {}
+            processed_img = preprocess_image(img, preprocessing_options, profile=profile, geometry=geometry)
+            with stage(profile, "ocr"):
+                layout = recognize_layout(processed_img, ocr_lang, preprocessing_options, geometry)
+        with stage(profile, "assembly"):
+            text = layout_text(layout)
+        return text, layout if keep_layout else None
+    
+    with stage(profile, "cache"):
+        cache = get_cache(cache_dir)
+        page_key = cache.make_page_key(img)
+        key = cache.make_key(page_key, ocr_lang, preprocessing_options)
+        text = cache.get(key)
+        previous = cache.get_layout(page_key) if text is None or keep_layout else None
+    if text is not None and not keep_layout:
+        return text, None
+    
+    # The stored layout is the page's latest one; it matches the cached text when made with the same settings
+    if (text is not None and previous is not None and previous["lang"] == ocr_lang
+            and previous["preprocessing_options"] == preprocessing_options):
+        return text, previous
+    
+    if tiled:
+        # Line updates compare the whole page under both settings, too much memory for these pages
+        layout, reocr_lines = recognize_tiled(img, ocr_lang, preprocessing_options, profile), None
+    else:
+        with stage(profile, "ocr.update"):
+            layout, reocr_lines = update_layout(img, previous, ocr_lang, preprocessing_options)
+    with stage(profile, "assembly"):
+        text = layout_text(layout)
+    with stage(profile, "cache"):
+        cache.put(key, text)
+        cache.put_layout(page_key, layout, partial=reocr_lines is not None)
+    return text, layout if keep_layout else None
+
+def _recognize_timed(*args, profile=False):
+    """
+    Runs _recognize and returns (text, seconds, layout, stage records), so
+    pooled pages report their OCR time and, with profile, their stages
+    """
+    stages = [] if profile else None
+    start = time.perf_counter()
+    text, layout = _recognize(*args, profile=stages)
+    return text, time.perf_counter() - start, layout, stages or []
+
+def _choose_language(ocr_lang, get_probes):
+    """
+    Resolves the OCR language setting
+    
+    Args:
+        ocr_lang: OCR language, or AUTO_LANG to detect it
+        get_probes: Function returning low-resolution page images for the probe
+    
+    Returns:
+        dict: Language report (see language.detect_language)
+    """
+    if ocr_lang != AUTO_LANG:
+        return fixed_language(ocr_lang)
+    probes = get_probes()
+    return detect_language(probes) if probes else fixed_language(DEFAULT_LANGUAGES)
+
+def _ocr_pages(pages, total, ocr_lang, preprocessing_options, progress_callback=None, workers=1,
+               cache_dir=None, skip_blank=False, page_seconds=None, page_sink=None, profile=None):
+    """
+    OCRs a stream of pages, optionally over a process pool
+    
+    Args:
+        pages: Iterable of (page_index, PIL.Image)
+        total: Number of pages in the stream
+        ocr_lang: OCR language
+        preprocessing_options: Preprocessing options
+        progress_callback: Optional function called as progress_callback(done_pages, total_pages)
+        workers: Number of OCR processes
+        cache_dir: OCR result cache directory (no caching when None)
+        skip_blank: Skip OCR on blank and near-blank pages
+        page_seconds: Optional dictionary that receives the OCR seconds by page index
+        page_sink: Optional function called as page_sink(page_index, image, text, layout)
+            for every page, in stream order, as soon as it and the pages before it are done
+        profile: Optional list that receives the stage records of every page
+    
+    Returns:
+        dict: Page text by page index (None for skipped blank pages)
+    """
+    page_texts = {}
+    done = 0
+    # Pages waiting for page_sink: stream order, images and layouts
+    order = []
+    images = {}
+    layouts = {}
+    
+    def finish(index, result):
+        nonlocal done
+        page_texts[index], seconds, layout, stages = result
+        if page_seconds is not None:
+            page_seconds[index] = seconds
+        if profile is not None:
+            profile.extend(set_page(stages, index + 1))
+        if page_sink:
+            layouts[index] = layout
+            while order and order[0] in layouts:
+                i = order.pop(0)
+                page_sink(i, images.pop(i), page_texts[i], layouts.pop(i))
+        done += 1
+        if progress_callback:
+            progress_callback(done, total)
+    
+    def keep(index, page):
+        if page_sink:
+            order.append(index)
+            images[index] = page
+    
+    keep_layout = page_sink is not None
+    if workers <= 1 or total < 2:
+        for index, page in pages:
+            keep(index, page)
+            finish(index, _recognize_timed(page, ocr_lang, preprocessing_options, cache_dir, skip_blank, keep_layout,
+                                           profile=profile is not None))
+        return page_texts
+    
+    context = multiprocessing.get_context("spawn")
+    # One Tesseract thread per process, since the pool already uses every core. A spawned
+    # worker imports tesserocr (and OpenMP reads the limit) before its initializer runs,
+    # so the limit has to be in the environment the workers start with.
+    with _child_environment(OMP_THREAD_LIMIT="1"):
+        with ProcessPoolExecutor(max_workers=min(workers, total), mp_context=context,
+                                 initializer=_init_ocr_worker,
+                                 initargs=(pytesseract.pytesseract.tesseract_cmd, ocr_lang)) as executor:
+            pending = {}
+            for index, page in pages:
+                keep(index, page)
+                future = executor.submit(_recognize_timed, page, ocr_lang, preprocessing_options, cache_dir,
+                                         skip_blank, keep_layout, profile=profile is not None)
+                pending[future] = index
+                # Keep only a few pages in flight (or waiting for the sink) so memory stays flat
+                while len(images if page_sink else pending) >= workers * 2:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        finish(pending.pop(future), future.result())
+            for future in list(pending):
+                finish(pending.pop(future), future.result())
+    
+    return page_texts
+
+def _timed_pages(pages, profile):
+    """Passes a page stream on, recording the wait for each page as its 'render' stage"""
+    pages = iter(pages)
+    while True:
+        records = []
+        with stage(records, "render"):
+            item = next(pages, None)
+        if item is None:
+            return
+        profile.extend(set_page(records, item[0] + 1))
+        yield item
+
+def join_pages(page_texts):
+    """Joins page texts (in page order) with a "Sayfa N" header per page"""
+    return "".join(f"Sayfa {i+1}\n{page_text}\n\n" for i, page_text in enumerate(page_texts))
+
+def ocr_images(images, ocr_lang, preprocessing_options, progress_callback=None, workers=1, cache_dir=None,
+               skip_blank=False, language_stats=None):
+    """
+    Runs OCR on page images and joins the page texts
+    
+    Args:
+        images: List of PIL.Image objects
+        ocr_lang: OCR language, or AUTO_LANG to detect it from the first pages
+        preprocessing_options: Preprocessing options
+        progress_callback: Optional function called as progress_callback(done_pages, total_pages)
+        workers: Number of OCR processes; pages are spread over a process pool when > 1
+        cache_dir: OCR result cache directory (no caching when None)
+        skip_blank: Leave blank and near-blank pages empty instead of OCRing them
+        language_stats: Optional dictionary that receives the language report
+    
+    Returns:
+        str: Extracted text with a "Sayfa N" header per page
+    """
+    language = _choose_language(ocr_lang, lambda: [probe_copy(img) for img in images[:PROBE_PAGES]])
+    ocr_lang = language["lang"]
+    if language_stats is not None:
+        language_stats.update(language)
+    
+    page_texts = _ocr_pages(enumerate(images), len(images), ocr_lang, preprocessing_options,
+                            progress_callback, workers, cache_dir, skip_blank)
+    return join_pages(page_texts[i] or "" for i in range(len(images)))
+
+def ocr_pdf_pages(pdf, ocr_lang, preprocessing_options, progress_callback=None, workers=1,
+                  use_text_layer=True, cache_dir=None, dpi=DEFAULT_DPI, stats=None, skip_blank=True,
+                  language_stats=None, searchable_pdf=None, profile=None):
+    """
+    Extracts the text of every PDF page, using OCR only where needed
+    
+    Pages with a usable embedded text layer are read directly; the other
+    pages are rendered in memory a few at a time while earlier pages are
+    being recognized, so memory use does not grow with the page count.
+    
+    Args:
+        pdf: PDF file content, or a PageStore whose rendered pages are reused
+        ocr_lang: OCR language, or AUTO_LANG to detect the smallest set of
+            language models from a low-resolution probe of a few pages
+        preprocessing_options: Preprocessing options
+        progress_callback: Optional function called as progress_callback(done_pages, total_pages)
+        workers: Number of OCR processes
+        use_text_layer: Read born-digital pages from their text layer instead of OCRing them
+        cache_dir: OCR result cache directory (no caching when None)
+        dpi: Render resolution, or AUTO_DPI to pick it from the text size of
+            low-resolution probes (the resize option is then ignored)
+        stats: Optional dictionary that receives the render resolution
+            report ('dpi', 'x_height', 'pixels', 'pixels_saved')
+        skip_blank: Skip OCR on blank and near-blank pages (separator pages,
+            blank backs, pages with only a stamp)
+        language_stats: Optional dictionary that receives the language report
+            (see language.detect_language)
+        searchable_pdf: Optional binary file that receives a searchable PDF,
+            written page by page during OCR: OCRed pages show the rendered
+            image under an invisible text layer, text layer pages are copied
+        profile: Optional list that receives the wall time and CPU time of
+            every stage: 'text_layer', 'resolution' and 'language'
+            for the document, and per page 'render' (the wait for the page,
+            which renders while earlier pages are OCRed), the stages of
+            _recognize and 'searchable_pdf' (see profiling.stage)
+    
+    Returns:
+        list: One dictionary per page with 'page' (1-based), 'text', 'source'
+            ('text_layer', 'ocr' or 'blank'; blank pages have no text), 'lang'
+            (OCR language, None for pages that were not OCRed) and
+            'seconds_saved' (estimated OCR time saved by the language detection)
+    """
+    store = pdf if isinstance(pdf, PageStore) else PageStore(pdf, is_pdf=True)
+    
+    with stage(profile, "text_layer"):
+        total = store.page_count()
+        native_texts = probe_text_layer(store.file_bytes) if use_text_layer else [None] * total
+    pages = [
+        {"page": i + 1, "text": text, "source": "text_layer", "lang": None, "seconds_saved": 0.0}
+        if text is not None else None
+        for i, text in enumerate(native_texts)
+    ]
+    
+    ocr_indexes = [i for i, page in enumerate(pages) if page is None]
+    skipped = total - len(ocr_indexes)
+    if progress_callback and skipped:
+        progress_callback(skipped, total)
+    
+    def report(done, _):
+        # Progress over the whole document, not just the OCRed pages
+        if progress_callback:
+            progress_callback(skipped + done, total)
+    
+    if dpi == AUTO_DPI:
+        scale_factor = preprocessing_options.get('scale_factor', 1.5) if preprocessing_options.get('apply_resize') else 1.0
+        with stage(profile, "resolution"):
+            resolution = choose_render_dpi(store, ocr_indexes, DEFAULT_DPI, scale_factor)
+        # The resolution already fits the text size, so no further upscaling
+        dpi = resolution["dpi"]
+        preprocessing_options = {**preprocessing_options, 'apply_resize': False}
+    else:
+        resolution = {"dpi": dpi, "x_height": None, "pixels": None, "pixels_saved": 0}
+    if stats is not None:
+        stats.update(resolution)
+    
+    with stage(profile, "language"):
+        language = _choose_language(ocr_lang, lambda: probe_images(store, ocr_indexes))
+    ocr_lang = language["lang"]
+    if language_stats is not None:
+        language_stats.update(language)
+    
+    writer = None
+    if searchable_pdf is not None:
+        # Pages read from their text layer are copied from the original PDF at the end
+        ocr_output = tempfile.TemporaryFile() if skipped else searchable_pdf
+        writer = SearchablePdfWriter(ocr_output)
+    
+    def add_page(index, image, text, layout):
+        with stage(profile, "searchable_pdf", index + 1):
+            if isinstance(image, PdfPageTiles):
+                # Shown at the pixel count of the largest page OCRed whole; the text layer still fits it
+                width = int(image.width * (LARGE_IMAGE_PIXELS / (image.width * image.height)) ** 0.5)
+                page_image = image.overview(width)
+                writer.add_page(page_image, layout, dpi * page_image.width / image.width)
+            else:
+                writer.add_page(page_image_for_layout(image, layout) if layout else image, layout, dpi)
+    
+    if ocr_indexes:
+        page_seconds = {}
+        page_images = store.iter_images(ocr_indexes, dpi)
+        if profile is not None:
+            page_images = _timed_pages(page_images, profile)
+        page_texts = _ocr_pages(page_images, len(ocr_indexes), ocr_lang, preprocessing_options, report, workers,
+                                cache_dir, skip_blank, page_seconds, add_page if writer else None, profile)
+        for i, page_text in page_texts.items():
+            if page_text is None:
+                pages[i] = {"page": i + 1, "text": "", "source": "blank", "lang": None, "seconds_saved": 0.0}
+            else:
+                # The candidate models would have taken 'speedup' times as long
+                pages[i] = {"page": i + 1, "text": page_text, "source": "ocr", "lang": ocr_lang,
+                            "seconds_saved": page_seconds[i] * (language["speedup"] - 1)}
+    
+    if writer is not None:
+        with stage(profile, "searchable_pdf"):
+            writer.close()
+            if skipped:
+                ocr_output.seek(0)
+                insert_original_pages(ocr_output, store.file_bytes,
+                                      [page["source"] == "text_layer" for page in pages], searchable_pdf)
+                ocr_output.close()
+    
+    return pages
+
+def ocr_pdf(pdf, ocr_lang, preprocessing_options, progress_callback=None, workers=1,
+            use_text_layer=True, cache_dir=None, dpi=DEFAULT_DPI, skip_blank=True, profile=None):
+    """
+    Extracts text from PDF content, using OCR for pages without a usable text layer
+    
+    Args:
+        pdf: PDF file content or a PageStore
+        ocr_lang: OCR language
+        preprocessing_options: Preprocessing options
+        progress_callback: Optional function called as progress_callback(done_pages, total_pages)
+        workers: Number of OCR processes
+        use_text_layer: Read born-digital pages from their text layer instead of OCRing them
+        cache_dir: OCR result cache directory (no caching when None)
+        dpi: Render resolution, or AUTO_DPI to pick it from the text size
+        skip_blank: Skip OCR on blank and near-blank pages
+        profile: Optional list that receives the stage records (see ocr_pdf_pages),
+            and the 'assembly' of the document text
+    
+    Returns:
+        str: Extracted text
+    """
+    pages = ocr_pdf_pages(pdf, ocr_lang, preprocessing_options, progress_callback, workers,
+                          use_text_layer, cache_dir, dpi, skip_blank=skip_blank, profile=profile)
+    with stage(profile, "assembly"):
+        return join_pages(page["text"] for page in pages)
+
+def ocr_image(image, ocr_lang, preprocessing_options, cache_dir=None, language_stats=None, searchable_pdf=None,
+              profile=None):
+    """
+    Extracts text from an image with OCR
+    
+    Args:
+        image: PIL.Image object, image file content or a PageStore
+        ocr_lang: OCR language, or AUTO_LANG to detect it from a low-resolution copy
+        preprocessing_options: Preprocessing options
+        cache_dir: OCR result cache directory (no caching when None)
+        language_stats: Optional dictionary that receives the language report
+            and the 'seconds_saved' by it
+        searchable_pdf: Optional binary file that receives the image as a
+            searchable PDF page, from the same OCR pass
+        profile: Optional list that receives the wall time and CPU time of
+            the 'decode' and 'language' stages and of the stages
+            of _recognize and 'searchable_pdf' for page 1 (see profiling.stage)
+    
+    Returns:
+        str: Extracted text
+    """
+    with stage(profile, "decode", 1):
+        if isinstance(image, (bytes, bytearray)):
+            # Image files may be large-format scans, which are OCRed in tiles
+            image = PageStore(bytes(image), is_pdf=False, max_pixels=MAX_PAGE_PIXELS)
+        if isinstance(image, PageStore):
+            image = image.image()
+    
+    with stage(profile, "language"):
+        language = _choose_language(ocr_lang, lambda: [probe_copy(image)])
+    text, seconds, layout, stages = _recognize_timed(image, language["lang"], preprocessing_options, cache_dir,
+                                                     False, searchable_pdf is not None, profile=profile is not None)
+    if profile is not None:
+        profile.extend(set_page(stages, 1))
+    if language_stats is not None:
+        language_stats.update(language, seconds_saved=seconds * (language["speedup"] - 1))
+    if searchable_pdf is not None:
+        with stage(profile, "searchable_pdf", 1):
+            writer = SearchablePdfWriter(searchable_pdf)
+            writer.add_page(page_image_for_layout(image, layout), layout,
+                            image.info.get("dpi", (DEFAULT_IMAGE_DPI,))[0] or DEFAULT_IMAGE_DPI)
+            writer.close()
+    return text
+
+def run_ocr_job(payload, file_bytes, progress):
+    """
+    Job queue task: extracts text from an uploaded PDF or image in a worker process
+    
+    Args:
+        payload: Dictionary with 'file_type', 'ocr_lang', 'preprocessing_options'
+            and optionally 'ocr_workers', 'use_text_layer', 'use_ocr_cache', 'render_dpi',
+            'skip_blank_pages', 'searchable_pdf' and 'tesseract_cmd'
+        file_bytes: Uploaded file content
+        progress: Function called as progress(fraction, message)
+    
+    Returns:
+        dict: {'text': extracted text, 'pages': [{'page': n, 'source': 'text_layer', 'ocr' or 'blank',
+            'lang': OCR language, 'seconds_saved': seconds}, ...], 'resolution': render resolution
+            report of PDFs (see ocr_pdf_pages), 'language': language report, 'searchable_pdf':
+            path of the searchable PDF in EXPORT_DIR, or None, 'profile': wall time and CPU time
+            per page and stage, and a 'document' record with the peak memory of the worker
+            (see profiling.stage and profiling.document_stage)}
+    """
+    # Worker processes do not inherit the Tesseract path set in the app
+    if payload.get("tesseract_cmd"):
+        pytesseract.pytesseract.tesseract_cmd = payload["tesseract_cmd"]
+    cache_dir = DEFAULT_CACHE_DIR if payload.get("use_ocr_cache", True) else None
+    
+    resolution = {}
+    language = {}
+    profile = []
+    searchable_path = None
+    searchable_pdf = None
+    if payload.get("searchable_pdf"):
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        searchable_path = os.path.join(EXPORT_DIR, f"{uuid.uuid4().hex}.pdf")
+        searchable_pdf = open(searchable_path, "wb")
+    
+    try:
+        with document_stage(profile):
+            if payload["file_type"] == "PDF":
+                progress(0.0, "Reading PDF pages...")
+                pages = ocr_pdf_pages(
+                    file_bytes,
+                    payload["ocr_lang"],
+                    payload["preprocessing_options"],
+                    lambda done, total: progress(done / total, f"Processing page {done}/{total}..."),
+                    payload.get("ocr_workers", 1),
+                    payload.get("use_text_layer", True),
+                    cache_dir,
+                    payload.get("render_dpi", DEFAULT_DPI),
+                    resolution,
+                    payload.get("skip_blank_pages", True),
+                    language,
+                    searchable_pdf,
+                    profile
+                )
+                with stage(profile, "assembly"):
+                    text = join_pages(page["text"] for page in pages)
+                # Page texts are already in 'text'; keep the rest of each page record
+                page_info = [{key: value for key, value in page.items() if key != "text"} for page in pages]
+            else:
+                progress(0.0, "OCR processing is in progress...")
+                text = ocr_image(file_bytes, payload["ocr_lang"], payload["preprocessing_options"], cache_dir, language,
+                                 searchable_pdf, profile)
+                page_info = [{"page": 1, "source": "ocr", "lang": language["lang"], "seconds_saved": language["seconds_saved"]}]
+    finally:
+        if searchable_pdf is not None:
+            searchable_pdf.close()
+    
+    return {"text": text, "pages": page_info, "resolution": resolution, "language": language,
+            "searchable_pdf": searchable_path, "profile": profile}
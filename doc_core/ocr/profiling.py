@@ -0,0 +1,200 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then read from /proc or left out
+    resource = None
+
+# Linux process status file with the peak resident memory (VmHWM), and the
+# file that resets it, so each document gets its own peak
+PROC_STATUS = "/proc/self/status"
+PROC_CLEAR_REFS = "/proc/self/clear_refs"
+# Prefix of the exported Prometheus metric names
+METRIC_PREFIX = "ocr_stage"
+
+def reset_peak_memory():
+    """Resets the peak resident memory of the process where the OS allows it (Linux)"""
+    try:
+        with open(PROC_CLEAR_REFS, "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+def peak_memory_mb():
+    """
+    Peak resident memory of the process in MB
+
+    Returns:
+        float: VmHWM since the last reset_peak_memory() on Linux, the peak
+            since the process started elsewhere, or None when unknown
+    """
+    try:
+        with open(PROC_STATUS) as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+def cpu_seconds():
+    """CPU time of the process and its finished child processes (Tesseract and Poppler run as children)"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+@contextmanager
+def stage(profile, name, page=None):
+    """
+    Measures a block of work as one stage
+
+    The record gets the wall time and the CPU time of the thread running the
+    block, so stages that run at the same time in other threads (such as
+    rendering the next pages) are not counted. Work done by other processes
+    (Poppler, and Tesseract without tesserocr) and the peak memory are only
+    in the record of the whole document (see document_stage).
+
+    Args:
+        profile: List that receives a record {'page', 'stage', 'wall_seconds',
+            'cpu_seconds', 'peak_memory_mb'} (peak memory is None), or None to
+            measure nothing
+        name: Stage name, e.g. 'render', 'preprocess.deskew' or 'ocr'
+        page: 1-based page number, None for stages of the whole document
+            or when the caller fills it in later (see set_page)
+    """
+    if profile is None:
+        yield
+        return
+    start_wall, start_cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        profile.append({
+            "page": page,
+            "stage": name,
+            "wall_seconds": time.perf_counter() - start_wall,
+            "cpu_seconds": time.thread_time() - start_cpu,
+            "peak_memory_mb": None,
+        })
+
+@contextmanager
+def document_stage(profile, name="document"):
+    """
+    Measures the processing of a whole document as one stage
+
+    The record gets the wall time, the CPU time of the process and its
+    finished child processes, and the peak memory of the process. These
+    are only exact when the process handles one document at a time, as a
+    job worker does.
+
+    Args:
+        profile: List that receives a record like those of stage (with no
+            page), or None to measure nothing
+        name: Stage name
+    """
+    if profile is None:
+        yield
+        return
+    reset_peak_memory()
+    start_wall, start_cpu = time.perf_counter(), cpu_seconds()
+    try:
+        yield
+    finally:
+        profile.append({
+            "page": None,
+            "stage": name,
+            "wall_seconds": time.perf_counter() - start_wall,
+            "cpu_seconds": cpu_seconds() - start_cpu,
+            "peak_memory_mb": peak_memory_mb(),
+        })
+
+def set_page(records, page):
+    """Marks stage records with their 1-based page number and returns them"""
+    for record in records:
+        record["page"] = page
+    return records
+
+def _totals(records, key):
+    """Sums the times and keeps the highest peak memory of records grouped by a key function"""
+    totals = {}
+    for record in records:
+        total = totals.setdefault(key(record), {"count": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                                                "peak_memory_mb": None})
+        total["count"] += 1
+        total["wall_seconds"] += record["wall_seconds"]
+        total["cpu_seconds"] += record["cpu_seconds"]
+        if record["peak_memory_mb"] is not None:
+            total["peak_memory_mb"] = max(total["peak_memory_mb"] or 0.0, record["peak_memory_mb"])
+    return totals
+
+def stage_totals(profile):
+    """
+    Totals per stage over all pages
+
+    Returns:
+        dict: Stage name to {'count', 'wall_seconds', 'cpu_seconds', 'peak_memory_mb'}
+            in the order the stages first ran
+    """
+    return _totals(profile, lambda record: record["stage"])
+
+def page_totals(profile):
+    """
+    Totals per page over all stages; stages of the whole document are left out
+
+    Returns:
+        dict: 1-based page number to {'count', 'wall_seconds', 'cpu_seconds', 'peak_memory_mb'}
+    """
+    totals = _totals([record for record in profile if record["page"] is not None], lambda record: record["page"])
+    return dict(sorted(totals.items()))
+
+def to_json(profile):
+    """Exports a profile as JSON with the stage totals and every stage record"""
+    return json.dumps({"stages": stage_totals(profile), "records": profile}, indent=2)
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def to_prometheus(profile, labels=None):
+    """
+    Exports a profile in the Prometheus text exposition format
+
+    Each page and stage is one series of the wall time and CPU time gauges
+    (repeated stages of a page, such as the tiles of a large page, are added
+    up); stages of the whole document have no page label. Peak memory is only
+    exported for the document (see document_stage).
+
+    Args:
+        profile: Stage records (see stage)
+        labels: Optional dictionary of labels added to every series (e.g. the file name)
+
+    Returns:
+        str: Metrics text
+    """
+    series = _totals(profile, lambda record: (record["page"], record["stage"]))
+    metrics = [
+        ("wall_seconds", "Wall time of an OCR stage in seconds", "wall_seconds", 1),
+        ("cpu_seconds", "CPU time of an OCR stage in seconds (of the whole process for the document)",
+         "cpu_seconds", 1),
+        ("peak_memory_bytes", "Peak resident memory of the process during a document", "peak_memory_mb", 1024 ** 2),
+    ]
+
+    lines = []
+    for name, help_text, key, scale in metrics:
+        lines += [f"# HELP {METRIC_PREFIX}_{name} {help_text}", f"# TYPE {METRIC_PREFIX}_{name} gauge"]
+        for (page, stage_name), total in series.items():
+            if total[key] is None:
+                continue
+            series_labels = {**(labels or {}), "stage": stage_name}
+            if page is not None:
+                series_labels["page"] = page
+            label_text = ",".join(f'{label}="{_label_value(value)}"' for label, value in series_labels.items())
+            lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {round(total[key] * scale, 6)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,257 @@
+import io
+import math
+import os
+import platform
+import queue
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import pdf2image
+from PIL import Image
+from PyPDF2 import PdfReader
+
+# Default Poppler location used on Windows
+WINDOWS_POPPLER_PATH = r'C:\\Program Files\\poppler-24.08.0\\Library\bin'
+
+# Default render resolution (pdf2image's own default)
+DEFAULT_DPI = 200
+# Resolution of on-screen page previews
+PREVIEW_DPI = 100
+# Pages rendered per Poppler call
+RENDER_WINDOW = 4
+# Rendered windows that may wait for OCR before rendering pauses
+PREFETCH_WINDOWS = 2
+
+def poppler_kwargs():
+    """
+    Returns the Poppler arguments for pdf2image on this platform
+
+    Returns:
+        dict: {'poppler_path': ...} on Windows, empty elsewhere
+    """
+    if platform.system() == "Windows":
+        if not os.path.exists(WINDOWS_POPPLER_PATH):
+            raise Exception("Poppler path not found")
+        return {"poppler_path": WINDOWS_POPPLER_PATH}
+    return {}
+
+def convert_pdf_bytes(pdf_bytes, dpi=DEFAULT_DPI):
+    """
+    Converts a whole PDF to page images in memory
+
+    Args:
+        pdf_bytes: PDF file content
+        dpi: Render resolution
+
+    Returns:
+        list: PIL.Image objects, one per page
+    """
+    return pdf2image.convert_from_bytes(pdf_bytes, dpi=dpi, **poppler_kwargs())
+
+def count_pdf_pages(pdf_path):
+    """
+    Returns the number of pages of a PDF file
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Returns:
+        int: Page count
+    """
+    return pdf2image.pdfinfo_from_path(pdf_path, **poppler_kwargs())["Pages"]
+
+def count_pdf_bytes_pages(pdf_bytes, pdf_path=None):
+    """
+    Returns the number of pages of a PDF given as bytes
+
+    Args:
+        pdf_bytes: PDF file content
+        pdf_path: Optional file already holding the content; pdf2image
+            otherwise writes the bytes to a new temporary file
+
+    Returns:
+        int: Page count
+    """
+    if pdf_path is not None:
+        try:
+            return count_pdf_pages(pdf_path)
+        except Exception:
+            pass
+    return pdf2image.pdfinfo_from_bytes(pdf_bytes, **poppler_kwargs())["Pages"]
+
+def render_pdf_page(pdf_bytes, page_index, dpi=PREVIEW_DPI, pdf_path=None):
+    """
+    Renders a single PDF page in memory
+
+    Args:
+        pdf_bytes: PDF file content
+        page_index: 0-based page index
+        dpi: Render resolution
+        pdf_path: Optional file already holding the content (see count_pdf_bytes_pages)
+
+    Returns:
+        PIL.Image: Page image
+    """
+    if pdf_path is not None:
+        return _convert_window(pdf_path, pdf_bytes, page_index + 1, page_index + 1, dpi)[0]
+    return pdf2image.convert_from_bytes(
+        pdf_bytes,
+        dpi=dpi,
+        first_page=page_index + 1,
+        last_page=page_index + 1,
+        **poppler_kwargs()
+    )[0]
+
+def pdf_page_sizes(pdf_bytes):
+    """
+    Returns the size of every page in points, as Poppler renders it
+
+    Returns:
+        list: (width, height) per page: the media box, turned by the page rotation
+    """
+    sizes = []
+    for page in PdfReader(io.BytesIO(pdf_bytes)).pages:
+        width, height = float(page.mediabox.width), float(page.mediabox.height)
+        sizes.append((height, width) if page.rotation % 180 else (width, height))
+    return sizes
+
+def pixel_size(points, dpi):
+    """Size in pixels of a page size in points rendered at a resolution"""
+    return tuple(math.ceil(length * dpi / 72) for length in points)
+
+def render_pdf_region(pdf_path, page_index, dpi, box=None):
+    """
+    Renders a rectangle of a PDF page, so a very large page never exists whole in memory
+
+    pdftoppm is run directly, since pdf2image cannot crop: it renders only
+    the requested region and writes it to stdout.
+
+    Args:
+        pdf_path: Path to the PDF file
+        page_index: 0-based page index
+        dpi: Render resolution (may be fractional)
+        box: (left, top, right, bottom) in pixels at dpi; the whole page when None
+
+    Returns:
+        PIL.Image: RGB image of the region
+    """
+    poppler_path = poppler_kwargs().get("poppler_path")
+    command = [os.path.join(poppler_path, "pdftoppm") if poppler_path else "pdftoppm",
+               "-r", str(dpi), "-f", str(page_index + 1), "-l", str(page_index + 1)]
+    if box is not None:
+        left, top, right, bottom = box
+        command += ["-x", str(left), "-y", str(top), "-W", str(right - left), "-H", str(bottom - top)]
+    output = subprocess.run(command + [pdf_path], capture_output=True, check=True).stdout
+    image = Image.open(io.BytesIO(output))
+    image.load()
+    return image
+
+def _convert_window(pdf_path, pdf_bytes, first_page, last_page, dpi):
+    """
+    Renders a run of pages from the temporary PDF file
+
+    If Poppler cannot read the file, the pages are rendered from the bytes
+    instead (the alternative method the OCR app always fell back to).
+
+    Returns:
+        list: PIL.Image objects of the pages first_page..last_page (1-based)
+    """
+    kwargs = {"dpi": dpi, "first_page": first_page, "last_page": last_page, **poppler_kwargs()}
+    try:
+        return pdf2image.convert_from_path(pdf_path, **kwargs)
+    except Exception:
+        return pdf2image.convert_from_bytes(pdf_bytes, **kwargs)
+
+@contextmanager
+def _pdf_file(pdf_bytes, pdf_path=None):
+    """Yields a file holding the PDF: the given one, or a temporary file removed afterwards"""
+    if pdf_path is not None:
+        yield pdf_path
+        return
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "document.pdf")
+        with open(path, "wb") as f:
+            f.write(pdf_bytes)
+        yield path
+
+def _page_windows(pages, window):
+    """Groups sorted 0-based page indexes into runs of at most `window` consecutive pages"""
+    windows = []
+    for index in pages:
+        if windows and index == windows[-1][-1] + 1 and len(windows[-1]) < window:
+            windows[-1].append(index)
+        else:
+            windows.append([index])
+    return windows
+
+def iter_rendered_pages(pdf_bytes, pages=None, dpi=DEFAULT_DPI,
+                        window=RENDER_WINDOW, prefetch=PREFETCH_WINDOWS, pdf_path=None):
+    """
+    Renders PDF pages to images in a background thread
+
+    Pages are rendered a window at a time with first_page/last_page, so only
+    the pages waiting in the small prefetch queue exist at once, and rendering
+    overlaps with whatever the caller does with the yielded pages. Poppler
+    needs a file, so the PDF is written once to a temporary file unless
+    pdf_path already holds it; the page images come back in memory over pdftoppm's output instead of through
+    image files.
+
+    Args:
+        pdf_bytes: PDF file content
+        pages: Sorted 0-based page indexes to render (all pages when None)
+        dpi: Render resolution
+        window: Pages rendered per Poppler call
+        prefetch: Windows that may be rendered ahead of the caller
+        pdf_path: Optional file already holding the content (e.g. PageStore.pdf_path())
+
+    Yields:
+        tuple: (page_index, PIL.Image) in page order, page_index starting at 0
+    """
+    with _pdf_file(pdf_bytes, pdf_path) as pdf_path:
+        if pages is None:
+            try:
+                pages = range(count_pdf_pages(pdf_path))
+            except Exception:
+                pages = range(count_pdf_bytes_pages(pdf_bytes))
+        windows = _page_windows(pages, window)
+        rendered = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            # Block while the queue is full, unless the consumer has gone away
+            while not stop.is_set():
+                try:
+                    rendered.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def render():
+            try:
+                for run in windows:
+                    images = _convert_window(pdf_path, pdf_bytes, run[0] + 1, run[-1] + 1, dpi)
+                    if not put((run[0], images)):
+                        return
+            except Exception as e:
+                put(e)
+                return
+            put(None)
+
+        thread = threading.Thread(target=render, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = rendered.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                first_index, images = item
+                for offset, image in enumerate(images):
+                    yield first_index + offset, image
+        finally:
+            stop.set()
+            thread.join()
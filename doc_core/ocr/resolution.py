@@ -0,0 +1,121 @@
+import numpy as np
+
+from doc_core.ocr.image_processing import otsu_threshold, to_gray_array
+from doc_core.ocr.rendering import DEFAULT_DPI
+
+# Value of the render DPI setting that selects the resolution from the text size
+AUTO_DPI = "auto"
+# Resolution of the probe renders used to measure the text; body text is 10-15 pixels
+# high there, so whole-pixel measurements move the chosen resolution by less than 10%
+PROBE_DPI = 150
+# Pages probed per document (spread evenly over the pages to OCR)
+PROBE_PAGES = 3
+# Tesseract reads reliably from an x-height of about 16 pixels on; 11-12pt body
+# text reaches it at or below 200 DPI, and larger x-heights only cost time
+TARGET_X_HEIGHT = 16
+# Bounds and granularity of the chosen resolution
+MIN_DPI = 100
+MAX_DPI = 400
+DPI_STEP = 10
+
+def estimate_x_height(gray):
+    """
+    Estimates the x-height of the text on a page from its row ink profile
+
+    Within each text line every lowercase letter crosses the rows between
+    the baseline and the x-line, while only a few letters reach into the
+    ascender and descender rows. The longest run of rows crossed by at least
+    half as many strokes as the busiest row is therefore taken as the
+    line's x-height, and the median over all lines is returned. Strokes are
+    counted instead of ink pixels because the horizontal bars at the x-line
+    and the baseline would otherwise outweigh the rows between them.
+
+    Args:
+        gray: 2-D uint8 array of the page
+
+    Returns:
+        float: x-height in pixels, or None when no text lines were found
+    """
+    ink = gray <= otsu_threshold(gray)
+    if not 0.001 < ink.mean() < 0.5:
+        return None
+
+    rows = ink.sum(axis=1)
+    active = rows >= max(2, ink.shape[1] // 200)
+    # Strokes crossed by each row: the starts of its runs of ink
+    strokes = (np.diff(ink.astype(np.int8), axis=1, prepend=0) == 1).sum(axis=1)
+
+    heights = []
+    start = None
+    for y, is_active in enumerate(np.append(active, False)):
+        if is_active and start is None:
+            start = y
+        elif not is_active and start is not None:
+            profile = strokes[start:y]
+            core = _longest_run(profile >= profile.max() / 2)
+            if y - start >= 2:
+                heights.append(core)
+            start = None
+
+    return float(np.median(heights)) if heights else None
+
+def _longest_run(mask):
+    """Length of the longest run of True values"""
+    longest = current = 0
+    for value in mask:
+        current = current + 1 if value else 0
+        longest = max(longest, current)
+    return longest
+
+def dpi_for_x_height(x_height, probe_dpi=PROBE_DPI):
+    """
+    Returns the smallest resolution that brings text to the target x-height
+
+    Args:
+        x_height: x-height in pixels measured at probe_dpi
+        probe_dpi: Resolution the measurement was made at
+
+    Returns:
+        int: Render resolution, rounded up to DPI_STEP and kept within MIN_DPI-MAX_DPI
+    """
+    dpi = probe_dpi * TARGET_X_HEIGHT / x_height
+    dpi = int(np.ceil(dpi / DPI_STEP) * DPI_STEP)
+    return min(max(dpi, MIN_DPI), MAX_DPI)
+
+def choose_render_dpi(store, page_indexes, baseline_dpi=DEFAULT_DPI, scale_factor=1.0):
+    """
+    Picks a render resolution for OCR from low-resolution probes of a few pages
+
+    Args:
+        store: PageStore of the PDF
+        page_indexes: 0-based indexes of the pages that will be OCRed
+        baseline_dpi: Resolution used without the automatic mode, for the savings report
+        scale_factor: Resize factor applied after rendering without the automatic mode
+
+    Returns:
+        dict: 'dpi' (chosen resolution), 'x_height' (measured at PROBE_DPI,
+            None if no text was found), 'pixels' (total pixels rendered at the
+            chosen resolution) and 'pixels_saved' (versus baseline_dpi times
+            scale_factor; negative when the text needs more pixels)
+    """
+    page_indexes = list(page_indexes)
+    if not page_indexes:
+        return {"dpi": baseline_dpi, "x_height": None, "pixels": 0, "pixels_saved": 0}
+
+    step = max(len(page_indexes) // PROBE_PAGES, 1)
+    probes = [store.image(i, PROBE_DPI) for i in page_indexes[::step][:PROBE_PAGES]]
+    x_heights = [h for h in (estimate_x_height(to_gray_array(probe)) for probe in probes) if h]
+
+    x_height = float(np.median(x_heights)) if x_heights else None
+    dpi = dpi_for_x_height(x_height) if x_height else baseline_dpi
+
+    # Pixel counts scale with the square of the resolution
+    probe_pixels = np.mean([probe.width * probe.height for probe in probes]) * len(page_indexes)
+    pixels = probe_pixels * (dpi / PROBE_DPI) ** 2
+    baseline_pixels = probe_pixels * (baseline_dpi * scale_factor / PROBE_DPI) ** 2
+    return {
+        "dpi": dpi,
+        "x_height": x_height,
+        "pixels": int(pixels),
+        "pixels_saved": int(baseline_pixels - pixels),
+    }
@@ -0,0 +1,179 @@
+import io
+import zlib
+
+from PyPDF2 import PdfReader, PdfWriter
+
+from doc_core.ocr.image_processing import apply_geometry, preprocess_image
+
+# JPEG quality of the page images
+JPEG_QUALITY = 75
+# Resolution assumed for images that do not record one
+DEFAULT_IMAGE_DPI = 300
+# The invisible text is encoded as Windows-1254 (Turkish); the glyphs it has
+# in place of WinAnsiEncoding's are named in the font's Differences array
+TEXT_ENCODING = "cp1254"
+ENCODING_DIFFERENCES = "208 /Gbreve 221 /Idotaccent 222 /Scedilla 240 /gbreve 253 /dotlessi 254 /scedilla"
+# Average Helvetica glyph width as a share of the font size, used to stretch words over their boxes
+AVERAGE_GLYPH_WIDTH = 0.5
+# Share of the word box height below the baseline
+DESCENT_RATIO = 0.2
+
+def page_image_for_layout(img, layout):
+    """
+    Returns the page image the word boxes of a layout line up with
+
+    Deskewing and margin cropping move the text, so the page is rotated and
+    cropped the way the OCR pass recorded in the layout, keeping its colours
+    (resizing only scales the boxes). Tiled layouts have their boxes in page
+    coordinates already.
+    """
+    if layout.get("tiled"):
+        return img
+    if "geometry" in layout:
+        return apply_geometry(img, layout["geometry"])
+    # Layouts cached before the geometry was recorded: run the steps again
+    options = layout["preprocessing_options"]
+    steps = {op: options.get(op, False) for op in ('deskew', 'auto_crop')}
+    if not any(steps.values()):
+        return img
+    return preprocess_image(img, steps)
+
+def _pdf_string(text):
+    """Encodes text as a PDF literal string"""
+    data = text.encode(TEXT_ENCODING, 'replace')
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+class SearchablePdfWriter:
+    """
+    Writes a PDF of page images with an invisible, selectable text layer
+
+    Pages are written to the output as soon as they are added, so only the
+    page being added is held in memory. The text of each word is placed
+    over its box in text render mode 3 (invisible), which makes the scan
+    searchable and copyable while it still shows the original pixels.
+    """
+
+    # Object numbers reserved for the catalog, the page tree and the font
+    CATALOG, PAGES, FONT = 1, 2, 3
+
+    def __init__(self, output):
+        """
+        Args:
+            output: Binary file object the PDF is written to
+        """
+        self.output = output
+        self.position = 0
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 4
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(self.FONT, (
+            "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding << /Type /Encoding "
+            f"/BaseEncoding /WinAnsiEncoding /Differences [{ENCODING_DIFFERENCES}] >> >>"
+        ).encode())
+
+    def _write(self, data):
+        self.output.write(data)
+        self.position += len(data)
+
+    def _write_object(self, object_id, body, stream=None):
+        """Writes one indirect object, with a stream when given"""
+        self.offsets[object_id] = self.position
+        self._write(f"{object_id} 0 obj\n".encode() + body)
+        if stream is not None:
+            self._write(b"\nstream\n" + stream + b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    def _new_id(self):
+        self.next_id += 1
+        return self.next_id - 1
+
+    def _text_layer(self, layout, scale_x, scale_y, page_height):
+        """Content stream operators placing the words of a layout invisibly"""
+        ops = [b"BT 3 Tr"]
+        for line in layout["lines"]:
+            for word in line["words"]:
+                left, top, right, bottom = word["box"]
+                size = max((bottom - top) * scale_y, 1.0)
+                width = max((right - left) * scale_x, 1.0)
+                stretch = 100 * width / (max(len(word["text"]), 1) * AVERAGE_GLYPH_WIDTH * size)
+                baseline = page_height - bottom * scale_y + DESCENT_RATIO * size
+                ops.append(
+                    f"/F1 {size:.2f} Tf {stretch:.1f} Tz 1 0 0 1 {left * scale_x:.2f} {baseline:.2f} Tm ".encode()
+                    + _pdf_string(word["text"] + " ") + b" Tj"
+                )
+        ops.append(b"ET")
+        return b"\n".join(ops)
+
+    def add_page(self, image, layout=None, dpi=DEFAULT_IMAGE_DPI):
+        """
+        Adds a page showing an image, with the words of a layout as invisible text
+
+        Args:
+            image: PIL.Image the layout's boxes line up with (see page_image_for_layout)
+            layout: OCR layout of the page, or None for a page without text
+            dpi: Resolution of the image, which sets the page size
+        """
+        page_width, page_height = image.width * 72 / dpi, image.height * 72 / dpi
+
+        image = image.convert('L' if image.mode in ('1', 'L', 'LA') else 'RGB')
+        with io.BytesIO() as jpeg:
+            image.save(jpeg, 'JPEG', quality=JPEG_QUALITY)
+            jpeg_data = jpeg.getvalue()
+        image_id = self._new_id()
+        self._write_object(image_id, (
+            f"<< /Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} "
+            f"/ColorSpace /{'DeviceGray' if image.mode == 'L' else 'DeviceRGB'} /BitsPerComponent 8 "
+            f"/Filter /DCTDecode /Length {len(jpeg_data)} >>"
+        ).encode(), jpeg_data)
+
+        content = f"q {page_width:.2f} 0 0 {page_height:.2f} 0 0 cm /Im0 Do Q\n".encode()
+        if layout and layout["lines"]:
+            # Boxes are in the coordinates of the image the layout was recognized on
+            layout_width, layout_height = layout["size"]
+            content += self._text_layer(layout, page_width / layout_width, page_height / layout_height, page_height)
+        content = zlib.compress(content)
+        content_id = self._new_id()
+        self._write_object(content_id, f"<< /Filter /FlateDecode /Length {len(content)} >>".encode(), content)
+
+        page_id = self._new_id()
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent {self.PAGES} 0 R /MediaBox [0 0 {page_width:.2f} {page_height:.2f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> /Font << /F1 {self.FONT} 0 R >> >> "
+            f"/Contents {content_id} 0 R >>"
+        ).encode())
+        self.page_ids.append(page_id)
+
+    def close(self):
+        """Writes the page tree, the cross-reference table and the trailer"""
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._write_object(self.PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode())
+        self._write_object(self.CATALOG, f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>".encode())
+
+        xref_position = self.position
+        entries = [b"0000000000 65535 f \n"] + [
+            f"{self.offsets[object_id]:010d} 00000 n \n".encode() for object_id in range(1, self.next_id)
+        ]
+        self._write(f"xref\n0 {self.next_id}\n".encode() + b"".join(entries))
+        self._write(f"trailer\n<< /Size {self.next_id} /Root {self.CATALOG} 0 R >>\nstartxref\n{xref_position}\n%%EOF\n".encode())
+
+def insert_original_pages(ocr_pdf, original_bytes, from_original, output):
+    """
+    Combines the OCRed pages with pages taken unchanged from the original PDF
+
+    Pages that were read from their embedded text layer are already
+    searchable, so they are copied instead of being rendered and OCRed.
+
+    Args:
+        ocr_pdf: Binary file object holding the searchable OCR pages, in order
+        original_bytes: Content of the original PDF
+        from_original: One bool per page of the document, True to copy the original page
+        output: Binary file object the combined PDF is written to
+    """
+    original = PdfReader(io.BytesIO(original_bytes))
+    ocr_pages = iter(PdfReader(ocr_pdf).pages) if not all(from_original) else iter(())
+    writer = PdfWriter()
+    for i, copy in enumerate(from_original):
+        writer.add_page(original.pages[i] if copy else next(ocr_pages))
+    writer.write(output)
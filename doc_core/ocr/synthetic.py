@@ -0,0 +1,214 @@
+import io
+import os
+import random
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# TrueType fonts tried for the pages (Linux, Windows, macOS); the first few found are used
+FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSerif-Regular.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+    "C:/Windows/Fonts/times.ttf",
+    "C:/Windows/Fonts/cour.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/System/Library/Fonts/Supplemental/Times New Roman.ttf",
+    "/System/Library/Fonts/Supplemental/Courier New.ttf",
+]
+# Font sizes in points and noise levels (standard deviation of the added gray-level noise)
+FONT_SIZES = (10, 12, 16)
+NOISE_LEVELS = {"clean": 0, "light": 20, "heavy": 45}
+# Resolution and size (A4) of the generated pages
+PAGE_DPI = 200
+PAGE_SIZE_INCHES = (8.27, 11.69)
+MARGIN_INCHES = 0.8
+# Share of pixels flipped to black or white specks at the highest noise level
+SPECK_RATIO = 0.002
+
+# Source paragraphs; pages are filled with them in a seeded random order
+SAMPLE_TEXTS = {
+    "tur": [
+        "Şirketimizin yıllık faaliyet raporu, geçen yılın satış ve yatırım sonuçlarını özetlemektedir.",
+        "Yönetim kurulu, çalışanların özverili çabaları sayesinde hedeflerin büyük ölçüde aşıldığını belirtti.",
+        "Müşteri memnuniyeti anketine göre hizmet kalitesi önceki döneme kıyasla belirgin biçimde yükseldi.",
+        "İstanbul ve İzmir'deki yeni şubeler, bölgesel büyüme stratejisinin ilk adımlarını oluşturuyor.",
+        "Güneş enerjisi yatırımları, işletme giderlerini düşürürken çevresel etkimizi de azaltmaktadır.",
+        "Öğrencilere yönelik burs programı bu yıl üç yüz kişiye ulaşarak rekor bir katılım gösterdi.",
+        "Çağrı merkezine gelen şikâyetlerin çoğu, teslimat sürelerindeki gecikmelerle ilgiliydi.",
+        "Ağaçlandırma projesi kapsamında şehir çevresine on bin fidan dikilmesi planlanıyor.",
+    ],
+    "eng": [
+        "The annual report of the company summarizes the sales and investment results of the past year.",
+        "The board stated that the targets were largely exceeded thanks to the dedicated work of the staff.",
+        "According to the customer survey, service quality improved noticeably compared to the last period.",
+        "New branches in the northern region form the first steps of the regional growth strategy.",
+        "Solar energy investments reduce operating costs while also lowering our environmental impact.",
+        "The scholarship programme for students reached three hundred people this year, a record turnout.",
+        "Most of the complaints received by the call centre were about delays in delivery times.",
+        "Ten thousand saplings are planned to be planted around the city as part of the forestation project.",
+    ],
+}
+
+def find_fonts(limit=3):
+    """Returns up to limit installed TrueType fonts from FONT_CANDIDATES"""
+    return [path for path in FONT_CANDIDATES if os.path.exists(path)][:limit]
+
+def _load_font(font_path, size_px):
+    """Loads a font at a pixel size (Pillow's built-in font when no path is given)"""
+    if font_path is None:
+        return ImageFont.load_default(size=size_px)
+    return ImageFont.truetype(font_path, size_px)
+
+def _wrap(text, font, width):
+    """Breaks text into lines that fit a pixel width"""
+    lines = []
+    line = ""
+    for word in text.split():
+        candidate = f"{line} {word}".strip()
+        if line and font.getlength(candidate) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    if line:
+        lines.append(line)
+    return lines
+
+def add_noise(image, sigma, seed=0):
+    """
+    Adds scanner-like noise to a grayscale page
+
+    Args:
+        image: 'L' mode PIL.Image
+        sigma: Standard deviation of the Gaussian gray-level noise (0 for none)
+        seed: Random seed
+
+    Returns:
+        PIL.Image: Noisy copy
+    """
+    if not sigma:
+        return image
+    rng = np.random.default_rng(seed)
+    pixels = np.asarray(image, dtype=np.float32)
+    pixels = pixels + rng.normal(0, sigma, pixels.shape)
+
+    # Dust and speckles, more of them on noisier pages
+    specks = rng.random(pixels.shape) < SPECK_RATIO * sigma / max(NOISE_LEVELS.values())
+    pixels[specks] = rng.choice([0.0, 255.0], size=int(specks.sum()))
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+def render_page(lang, font_path=None, font_size=12, sigma=0, seed=0, dpi=PAGE_DPI):
+    """
+    Renders one page of text with a known transcription
+
+    Args:
+        lang: 'tur' or 'eng' (key of SAMPLE_TEXTS)
+        font_path: TrueType font, or None for Pillow's built-in font
+        font_size: Font size in points
+        sigma: Noise level (see add_noise)
+        seed: Random seed for the paragraph order and the noise
+        dpi: Page resolution
+
+    Returns:
+        tuple: (PIL.Image in 'L' mode, ground truth text with one line per printed line)
+    """
+    width, height = (round(inches * dpi) for inches in PAGE_SIZE_INCHES)
+    margin = round(MARGIN_INCHES * dpi)
+    font = _load_font(font_path, round(font_size * dpi / 72))
+    line_height = round(font_size * dpi / 72 * 1.5)
+
+    paragraphs = list(SAMPLE_TEXTS[lang])
+    random.Random(seed).shuffle(paragraphs)
+
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    lines = []
+    y = margin
+    for paragraph in paragraphs:
+        for line in _wrap(paragraph, font, width - 2 * margin):
+            if y + line_height > height - margin:
+                break
+            draw.text((margin, y), line, font=font, fill=0)
+            lines.append(line)
+            y += line_height
+        # Blank line between paragraphs
+        y += line_height // 2
+
+    return add_noise(image, sigma, seed), "\n".join(lines)
+
+def build_corpus(languages=("tur", "eng"), fonts=None, sizes=FONT_SIZES, noise_levels=None, dpi=PAGE_DPI):
+    """
+    Renders one page for every combination of language, font, size and noise level
+
+    Args:
+        languages: Keys of SAMPLE_TEXTS
+        fonts: Font paths (find_fonts() when None; Pillow's built-in font when none is installed)
+        sizes: Font sizes in points
+        noise_levels: Dictionary of noise level name to sigma (NOISE_LEVELS when None)
+        dpi: Page resolution
+
+    Returns:
+        list: Dictionaries with 'name', 'lang', 'font', 'size', 'noise', 'image' and 'text'
+    """
+    fonts = fonts if fonts is not None else find_fonts() or [None]
+    noise_levels = noise_levels or NOISE_LEVELS
+    corpus = []
+    for lang in languages:
+        for font in fonts:
+            font_name = os.path.splitext(os.path.basename(font))[0] if font else "default"
+            for size in sizes:
+                for noise, sigma in noise_levels.items():
+                    image, text = render_page(lang, font, size, sigma, seed=len(corpus), dpi=dpi)
+                    corpus.append({
+                        "name": f"{lang}-{font_name}-{size}pt-{noise}",
+                        "lang": lang,
+                        "font": font_name,
+                        "size": size,
+                        "noise": noise,
+                        "image": image,
+                        "text": text,
+                    })
+    return corpus
+
+def build_pdf(pages, dpi=PAGE_DPI):
+    """
+    Bundles page images into an image-only (scanned-like) PDF
+
+    Args:
+        pages: PIL.Image objects
+        dpi: Resolution the pages were rendered at
+
+    Returns:
+        bytes: PDF file content
+    """
+    with io.BytesIO() as output:
+        pages[0].save(output, "PDF", save_all=True, append_images=pages[1:], resolution=dpi)
+        return output.getvalue()
+
+def build_pdfs(corpus, pages_per_pdf=4, dpi=PAGE_DPI):
+    """
+    Groups corpus pages of the same language and noise level into multi-page PDFs
+
+    Returns:
+        list: Dictionaries with 'name', 'lang', 'noise', 'pdf' (bytes) and 'texts' (one per page)
+    """
+    groups = {}
+    for sample in corpus:
+        groups.setdefault((sample["lang"], sample["noise"]), []).append(sample)
+
+    pdfs = []
+    for (lang, noise), samples in groups.items():
+        for start in range(0, len(samples), pages_per_pdf):
+            chunk = samples[start:start + pages_per_pdf]
+            pdfs.append({
+                "name": f"{lang}-{noise}-{start // pages_per_pdf + 1}",
+                "lang": lang,
+                "noise": noise,
+                "pdf": build_pdf([sample["image"] for sample in chunk], dpi),
+                "texts": [sample["text"] for sample in chunk],
+            })
+    return pdfs
@@ -0,0 +1,40 @@
+from doc_core.pdf_text import iter_pdf_pages
+
+# A page needs at least this many non-space characters of embedded text...
+MIN_TEXT_CHARS = 40
+# ...and this share of letters/digits among them to skip OCR
+MIN_ALNUM_RATIO = 0.6
+# Embedded text with more broken glyphs than this is treated as unusable
+MAX_REPLACEMENT_RATIO = 0.02
+
+def is_usable_text_layer(text):
+    """
+    Decides whether the embedded text of a page is good enough to skip OCR
+
+    Args:
+        text: Text extracted from the page's text layer
+
+    Returns:
+        bool: True when the text can be used instead of OCR
+    """
+    chars = [c for c in text if not c.isspace()]
+    if len(chars) < MIN_TEXT_CHARS:
+        return False
+
+    alnum_ratio = sum(c.isalnum() for c in chars) / len(chars)
+    replacement_ratio = sum(c in "\ufffd\x00" for c in chars) / len(chars)
+    return alnum_ratio >= MIN_ALNUM_RATIO and replacement_ratio <= MAX_REPLACEMENT_RATIO
+
+def probe_text_layer(pdf_bytes):
+    """
+    Extracts the embedded text of every page and keeps only usable pages
+
+    Args:
+        pdf_bytes: PDF file content
+
+    Returns:
+        list: Page text, or None for pages that need OCR, one entry per page
+    """
+    # Runs in the calling process: the probe is cheap next to OCR, and the
+    # OCR job workers and page pool already use the cores
+    return [text if is_usable_text_layer(text) else None for text in iter_pdf_pages(pdf_bytes, workers=1)]
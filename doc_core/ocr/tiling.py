@@ -0,0 +1,253 @@
+import numpy as np
+from PIL import Image
+
+from doc_core.ocr import engine
+from doc_core.ocr.image_processing import otsu_threshold, preprocess_image
+from doc_core.ocr.profiling import stage
+from doc_core.ocr.rendering import render_pdf_region
+
+# Pages with more pixels than this are OCRed in tiles (a Letter or A4 page at 600 DPI stays whole)
+LARGE_IMAGE_PIXELS = 40_000_000
+# Edge length of a tile before preprocessing; bounds the memory of one OCR step
+TILE_SIZE = 3072
+# Overlap between neighbouring tiles, so a word cut by one tile's edge is whole in the other;
+# longer than the longest expected word (about 600 px at 600 DPI)
+TILE_OVERLAP = 1024
+# Words this close to a tile edge inside the page may be cut off; the neighbouring tile's copy is kept
+EDGE_MARGIN = 2
+# Options that need the whole page; they are not applied to tiles
+PAGE_OPTIONS = ('deskew', 'auto_crop')
+# Width of the page copy whole-page decisions are made on (the global Otsu threshold, the blank check)
+THRESHOLD_SAMPLE_WIDTH = 2000
+# A vertical gap of more than this many line heights starts a new paragraph
+PARAGRAPH_GAP = 1.5
+
+class PdfPageTiles:
+    """
+    A PDF page too large to render whole, rendered one tile at a time
+
+    Stands in for the page image in the OCR pipeline: it has the size of the
+    page at the render resolution, crop() renders only the requested region
+    and overview() a downscaled copy of the page. It holds just the path of
+    the document, so it is cheap to send to OCR processes.
+    """
+
+    mode = "RGB"
+
+    def __init__(self, pdf_path, page_index, dpi, size, file_hash):
+        """
+        Args:
+            pdf_path: PDF file (see PageStore.pdf_path)
+            page_index: 0-based page index
+            dpi: Render resolution
+            size: (width, height) of the page in pixels at dpi
+            file_hash: Hash of the document, which with the page and
+                resolution identifies the page for the OCR cache
+        """
+        self.pdf_path = pdf_path
+        self.page_index = page_index
+        self.dpi = dpi
+        self.size = tuple(size)
+        self.file_hash = file_hash
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    def crop(self, box):
+        """Renders the region (left, top, right, bottom) of the page"""
+        return render_pdf_region(self.pdf_path, self.page_index, self.dpi, box)
+
+    def overview(self, width):
+        """Renders the whole page at a resolution that makes it about `width` pixels wide"""
+        return render_pdf_region(self.pdf_path, self.page_index, self.dpi * width / self.width)
+
+def needs_tiling(image):
+    """Returns True for pages too large to preprocess and OCR in one piece"""
+    return image.width * image.height > LARGE_IMAGE_PIXELS
+
+def overview(image, width=THRESHOLD_SAMPLE_WIDTH):
+    """
+    Downscaled copy of a page for whole-page decisions (threshold, blank check)
+
+    Args:
+        image: PIL.Image or PdfPageTiles
+        width: Width of the copy
+
+    Returns:
+        PIL.Image: Copy of the page about `width` pixels wide (the page itself when narrower)
+    """
+    if isinstance(image, PdfPageTiles):
+        return image.overview(min(width, image.width))
+    if image.width <= width:
+        return image
+    return image.resize((width, max(1, round(image.height * width / image.width))), Image.BOX)
+
+def _spans(length, tile_size, overlap):
+    """
+    Splits one axis into overlapping tile spans
+
+    Returns:
+        list: (start, end, core_start, core_end) per tile; the core runs from
+            the middle of the overlap with the previous tile to the middle of
+            the overlap with the next one, so the cores cover the axis once
+    """
+    if length <= tile_size:
+        return [(0, length, 0, length)]
+    step = tile_size - overlap
+    starts = list(range(0, length - tile_size + 1, step))
+    if starts[-1] + tile_size < length:
+        starts.append(length - tile_size)
+
+    seams = [(next_start + start + tile_size) // 2 for start, next_start in zip(starts, starts[1:])]
+    core_starts = [0] + seams
+    core_ends = seams + [length]
+    return [(start, start + tile_size, core_start, core_end)
+            for start, core_start, core_end in zip(starts, core_starts, core_ends)]
+
+def tile_boxes(width, height, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """
+    Returns the overlapping tiles of a page, row by row
+
+    Args:
+        width: Page width
+        height: Page height
+        tile_size: Tile edge length
+        overlap: Overlap between neighbouring tiles
+
+    Returns:
+        list: (box, core) pairs of (left, top, right, bottom) boxes; a word
+            belongs to the tile whose core holds its centre (see owns_word)
+    """
+    return [
+        ((left, top, right, bottom), (core_left, core_top, core_right, core_bottom))
+        for top, bottom, core_top, core_bottom in _spans(height, tile_size, overlap)
+        for left, right, core_left, core_right in _spans(width, tile_size, overlap)
+    ]
+
+def owns_word(box, tile, core, width, height):
+    """
+    Decides whether a word read from a tile is kept from that tile
+
+    A word touching a tile edge inside the page may be cut off, and is
+    dropped; since the overlap is longer than a word, the neighbouring tile
+    has it whole. Of the remaining copies in the overlaps, the tile whose
+    core holds the word's centre keeps it.
+
+    Args:
+        box: Word box (left, top, right, bottom) in page coordinates
+        tile: Tile box in page coordinates
+        core: Core of the tile (see tile_boxes)
+        width: Page width
+        height: Page height
+
+    Returns:
+        bool: True when the word is kept from this tile
+    """
+    left, top, right, bottom = tile
+    if ((left > 0 and box[0] <= left + EDGE_MARGIN) or (top > 0 and box[1] <= top + EDGE_MARGIN)
+            or (right < width and box[2] >= right - EDGE_MARGIN)
+            or (bottom < height and box[3] >= bottom - EDGE_MARGIN)):
+        return False
+    centre_x, centre_y = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+    return core[0] <= centre_x < core[2] and core[1] <= centre_y < core[3]
+
+def tile_options(image, preprocessing_options):
+    """
+    Adapts preprocessing options so every tile of a page is treated alike
+
+    Deskewing and margin cropping need the whole page and are left out. An
+    Otsu threshold is computed once from a downscaled copy of the page and
+    applied as a fixed threshold, so neighbouring tiles are binarized the
+    same way; Sauvola is local and works per tile as it is.
+    """
+    options = {key: value for key, value in preprocessing_options.items() if key not in PAGE_OPTIONS}
+    if options.get('apply_threshold') and options.get('threshold_method') == 'otsu':
+        threshold = otsu_threshold(np.asarray(overview(image).convert('L')))
+        # Otsu keeps values above the threshold as paper, the fixed threshold keeps values from it on
+        options.update(threshold_method='fixed', threshold_value=threshold + 1)
+    return options
+
+def merge_lines(words):
+    """
+    Groups words from all tiles into lines and paragraphs in reading order
+
+    Lines run top to bottom and words left to right; a word joins a line
+    when its centre lies within the height of the line's first word.
+
+    Args:
+        words: Word dictionaries with 'text', 'conf' and 'box' in page coordinates
+
+    Returns:
+        list: Line dictionaries as in a layout ('block', 'par', 'line', 'box', 'words')
+    """
+    lines = []
+    for word in sorted(words, key=lambda word: (word["box"][1], word["box"][0])):
+        centre = (word["box"][1] + word["box"][3]) / 2
+        if lines and lines[-1]["words"][0]["box"][1] <= centre <= lines[-1]["words"][0]["box"][3]:
+            lines[-1]["words"].append(word)
+        else:
+            lines.append({"words": [word]})
+    if not lines:
+        return []
+
+    for line in lines:
+        line["words"].sort(key=lambda word: word["box"][0])
+        boxes = np.array([word["box"] for word in line["words"]])
+        line["box"] = [int(boxes[:, 0].min()), int(boxes[:, 1].min()), int(boxes[:, 2].max()), int(boxes[:, 3].max())]
+
+    line_height = float(np.median([line["box"][3] - line["box"][1] for line in lines]))
+    par = 1
+    for i, line in enumerate(lines):
+        if i and line["box"][1] - lines[i - 1]["box"][3] > PARAGRAPH_GAP * line_height:
+            par += 1
+        line.update(block=1, par=par, line=i + 1)
+    return lines
+
+def recognize_tiled(image, ocr_lang, preprocessing_options, profile=None):
+    """
+    OCRs a very large page tile by tile with bounded memory
+
+    Each overlapping tile is cropped (or, for a PdfPageTiles, rendered),
+    preprocessed and recognized on its own, so memory depends on the tile
+    size instead of the page size. Word
+    boxes are mapped back to page coordinates, words cut by a tile edge and
+    the second copies of words in the overlaps are dropped, and the words are merged into lines across the
+    tile seams.
+
+    Args:
+        image: PIL.Image of the page before preprocessing, or PdfPageTiles
+        ocr_lang: OCR language
+        preprocessing_options: Preprocessing options (see tile_options)
+        profile: Optional list that receives the stage records of every tile
+
+    Returns:
+        dict: Layout with 'lang', 'preprocessing_options', 'size', 'lines' and
+            'tiled' (True: the boxes are in page coordinates)
+    """
+    options = tile_options(image, preprocessing_options)
+    scale = options.get('scale_factor', 1.5) if options.get('apply_resize', False) else 1.0
+
+    words = []
+    for tile, core in tile_boxes(image.width, image.height):
+        left, top = tile[:2]
+        processed_tile = preprocess_image(image.crop(tile), options, profile=profile)
+        with stage(profile, "ocr"):
+            tile_words = engine.image_to_data(processed_tile, ocr_lang)
+        for word in tile_words:
+            box = [round(word["box"][0] / scale) + left, round(word["box"][1] / scale) + top,
+                   round(word["box"][2] / scale) + left, round(word["box"][3] / scale) + top]
+            if owns_word(box, tile, core, image.width, image.height):
+                words.append({"text": word["text"], "conf": word["conf"], "box": box})
+
+    return {
+        "lang": ocr_lang,
+        "preprocessing_options": preprocessing_options,
+        "size": list(image.size),
+        "lines": merge_lines(words),
+        "tiled": True,
+    }
@@ -0,0 +1,111 @@
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PyPDF2 import PdfReader
+
+# PDFs with fewer pages are extracted in the calling process
+PARALLEL_MIN_PAGES = 64
+# Number of pages handed to a worker process at a time
+PAGES_PER_CHUNK = 32
+
+# PDF bytes shared with each worker process (set by the pool initializer)
+_worker_pdf_bytes = None
+
+
+def _read_bytes(source):
+    """
+    Returns the raw bytes of a PDF source
+
+    Args:
+        source: Path, bytes or file-like object (e.g. a Streamlit upload)
+
+    Returns:
+        bytes: PDF content
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    source.seek(0)
+    return source.read()
+
+
+def _page_text(page):
+    """Extracts the text of a single page, never returning None"""
+    return page.extract_text() or ""
+
+
+def _init_worker(pdf_bytes):
+    """Stores the PDF bytes once per worker instead of once per chunk"""
+    global _worker_pdf_bytes
+    _worker_pdf_bytes = pdf_bytes
+
+
+def _extract_range(start, stop):
+    """Extracts the pages [start, stop) in a worker process"""
+    reader = PdfReader(io.BytesIO(_worker_pdf_bytes))
+    return [_page_text(reader.pages[i]) for i in range(start, stop)]
+
+
+def iter_pdf_pages(source, workers=None, progress_callback=None):
+    """
+    Yields the text of each PDF page in order
+
+    Large documents are split into page ranges that are extracted in a
+    process pool; pages are still yielded in document order as soon as
+    their range is finished.
+
+    Args:
+        source: Path, bytes or file-like object
+        workers: Number of worker processes (None: CPU count, 1: no pool)
+        progress_callback: Optional function called as progress_callback(done_pages, total_pages)
+
+    Yields:
+        str: Text of the next page
+    """
+    pdf_bytes = _read_bytes(source)
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    total = len(reader.pages)
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or total < PARALLEL_MIN_PAGES:
+        for i, page in enumerate(reader.pages):
+            yield _page_text(page)
+            if progress_callback:
+                progress_callback(i + 1, total)
+        return
+
+    ranges = [(start, min(start + PAGES_PER_CHUNK, total)) for start in range(0, total, PAGES_PER_CHUNK)]
+    done = 0
+    # 'spawn' avoids forking the multi-threaded Streamlit server and job workers
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)),
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(pdf_bytes,)) as executor:
+        futures = [executor.submit(_extract_range, start, stop) for start, stop in ranges]
+        for future in futures:
+            pages = future.result()
+            yield from pages
+            done += len(pages)
+            if progress_callback:
+                progress_callback(done, total)
+
+
+def extract_pdf_text(source, separator="\n", workers=None, progress_callback=None):
+    """
+    Extracts all text from a PDF file in a single join
+
+    Args:
+        source: Path, bytes or file-like object
+        separator: String placed between pages
+        workers: Number of worker processes (None: CPU count, 1: no pool)
+        progress_callback: Optional function called as progress_callback(done_pages, total_pages)
+
+    Returns:
+        str: Extracted text
+    """
+    return separator.join(iter_pdf_pages(source, workers=workers, progress_callback=progress_callback))
@@ -0,0 +1,53 @@
+import docx
+
+from doc_core.pdf_text import extract_pdf_text
+
+
+def read_pdf(file, progress_callback=None):
+    """
+    Extracts text from a PDF file, one line break per page
+
+    Args:
+        file: Path, bytes or file-like object
+        progress_callback: Optional function called as progress_callback(done_pages, total_pages)
+
+    Returns:
+        str: Extracted text
+    """
+    return extract_pdf_text(file, progress_callback=progress_callback)
+
+
+def read_docx(file):
+    """
+    Extracts the paragraph text of a DOCX file
+
+    Args:
+        file: Path or file-like object
+
+    Returns:
+        str: Extracted text
+    """
+    doc = docx.Document(file)
+    return "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
+
+
+def read_txt(file, encodings=("utf-8", "windows-1254", "latin-1")):
+    """
+    Decodes a text file, trying Turkish-friendly encodings in order
+
+    Args:
+        file: File-like object
+        encodings: Encodings to try
+
+    Returns:
+        str: Decoded text
+    """
+    content = file.read()
+    for encoding in encodings:
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+
+    # Last resort: drop undecodable bytes
+    return content.decode("utf-8", errors="ignore")
@@ -2,9 +2,13 @@ import streamlit as st
 import google.generativeai as genai
 import os
 import io
+import hashlib
 import pandas as pd
-from PyPDF2 import PdfReader
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import docx
+from doc_core.pdf_text import extract_pdf_text
+from doc_core.bm25 import collection_idf, create_bm25_index, search_bm25, simple_tokenize, split_into_chunks
 
 # Page configuration
 st.set_page_config(page_title="Smart Document Analysis Chatbot", page_icon="🤖", layout="wide")
@@ -16,6 +20,121 @@ genai.configure(api_key=GEMINI_API_KEY)
 # Initialize Gemini model
 model = genai.GenerativeModel('gemini-1.5-pro')
 
+# Conversation history limits
+MAX_VERBATIM_TURNS = 6  # user/assistant pairs kept word for word
+COMPACT_CHUNK_TURNS = 3  # user/assistant pairs folded into the summary per Gemini call
+HISTORY_TOKEN_BUDGET = 2000  # tokens of history allowed in a single prompt
+
+# Workspace retrieval limits
+TABLE_ROWS_PER_CHUNK = 50
+CHUNKS_PER_FILE = 4
+MAX_SOURCE_FILES = 3
+# Tables up to this many rows are sent to the model whole, so aggregate questions see every row
+WHOLE_TABLE_ROWS = 200
+
+
+def estimate_tokens(text):
+    """Rough token estimate for Gemini prompts (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+class ConversationHistory:
+    """Keeps the most recent turns verbatim and folds older ones into a rolling summary"""
+
+    def __init__(self, max_turns=MAX_VERBATIM_TURNS, token_budget=HISTORY_TOKEN_BUDGET,
+                 chunk_turns=COMPACT_CHUNK_TURNS):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.chunk_turns = chunk_turns
+        self.recent = deque()
+        self.pending = []  # Messages pushed out of the window, not summarized yet
+        self.summary = ""
+
+    def add(self, role, content, sources=None):
+        """
+        Adds a message and moves the oldest ones out of the verbatim window
+
+        Args:
+            role: 'user' or 'assistant'
+            content: Message text sent back to the model in later prompts
+            sources: Optional source file names, only shown in the chat
+        """
+        self.recent.append({"role": role, "content": content, "sources": sources or []})
+        while len(self.recent) > self.max_turns * 2:
+            self.pending.append(self.recent.popleft())
+
+    def compact(self, summarize_fn):
+        """
+        Folds messages that left the window into the rolling summary
+
+        Messages are collected until a whole chunk of turns has left the window,
+        so Gemini is asked for a new summary every few turns instead of every turn.
+        """
+        if len(self.pending) < self.chunk_turns * 2:
+            return
+
+        # The summary may use at most half of the history budget
+        max_chars = self.token_budget * 2
+        try:
+            summary = summarize_fn(self.summary, self.pending, max_chars)
+        except Exception:
+            # Fall back to a plain transcript of the dropped messages
+            summary = self.summary + "\n" + "\n".join(
+                f"{m['role']}: {m['content']}" for m in self.pending
+            )
+        self.pending = []
+
+        # An overlong summary loses its oldest part; the newest turns are always kept
+        summary = summary.strip()
+        if len(summary) > max_chars:
+            # Start at a whole word
+            summary = summary[-max_chars:].split(None, 1)[-1]
+        self.summary = summary
+
+    def build_context(self):
+        """Returns the summary plus as many recent messages as fit in the token budget"""
+        budget = self.token_budget - estimate_tokens(self.summary)
+        lines = []
+        # Messages waiting to be summarized are still sent word for word
+        for message in reversed(self.pending + list(self.recent)):
+            line = f"{message['role'].capitalize()}: {message['content']}"
+            cost = estimate_tokens(line)
+            if cost > budget:
+                break
+            lines.append(line)
+            budget -= cost
+        lines.reverse()
+
+        parts = []
+        if self.summary:
+            parts.append(f"Summary of the earlier conversation:\n{self.summary}")
+        if lines:
+            parts.append("Recent conversation:\n" + "\n".join(lines))
+        return "\n\n".join(parts)
+
+    def clear(self):
+        """Removes all stored messages and the summary"""
+        self.recent.clear()
+        self.pending = []
+        self.summary = ""
+
+
+def summarize_history(previous_summary, messages, max_chars):
+    """Asks Gemini to merge dropped messages into the running conversation summary"""
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    summary_prompt = f"""
+    Update the running summary of a conversation between a user and an assistant.
+    Keep facts, numbers, decisions and open questions. Answer with the summary only,
+    in a few sentences and at most {max_chars} characters.
+
+    Current summary:
+    {previous_summary or "(empty)"}
+
+    New messages:
+    {transcript}
+    """
+    return model.generate_content(summary_prompt).text
+
 
 # Function to extract data from different file types
 def extract_data_from_file(uploaded_file):
@@ -27,11 +146,13 @@ def extract_data_from_file(uploaded_file):
             return {"type": "text", "content": uploaded_file.read().decode('utf-8')}
 
         elif file_type == 'pdf':
-            # PDF files
-            text = ""
-            pdf_reader = PdfReader(io.BytesIO(uploaded_file.read()))
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
+            # PDF files (pages are joined once; large files use a process pool)
+            progress_bar = st.progress(0.0, text="Extracting PDF pages...")
+            text = extract_pdf_text(
+                uploaded_file,
+                progress_callback=lambda done, total: progress_bar.progress(done / total, text=f"Extracting page {done}/{total}...")
+            )
+            progress_bar.empty()
             return {"type": "text", "content": text}
 
         elif file_type in ['docx', 'doc']:
@@ -65,19 +186,93 @@ def extract_data_from_file(uploaded_file):
         return {"type": "unknown", "content": "This file type is not supported."}
 
     except Exception as e:
-        st.error(f"File processing error: {str(e)}")
-        return {"type": "error", "content": f"Error: {str(e)}"}
+        return {"type": "error", "content": f"File processing error: {str(e)}"}
+
+
+def split_document(file_data):
+    """Splits a document or table into the chunks that are searched"""
+    if file_data["type"] == "tabular":
+        df = file_data["dataframe"]
+        chunks = [file_data["description"]]
+        for start in range(0, len(df), TABLE_ROWS_PER_CHUNK):
+            chunks.append(df.iloc[start:start + TABLE_ROWS_PER_CHUNK].to_string(index=False))
+        return chunks
+    return split_into_chunks(file_data["content"])
+
+
+def table_statistics(df):
+    """Column statistics of a table (count, mean, min, max, most frequent value, ...)"""
+    return df.describe(include="all").to_string()
+
+
+def build_document_index(file_data):
+    """Splits a document or table into chunks and indexes them once"""
+    return create_bm25_index(split_document(file_data))
+
+
+def retrieve_from_workspace(workspace, question):
+    """
+    Routes a question to the most relevant files and chunks
+
+    Every file is searched in parallel with IDF weights taken over the whole
+    workspace, so chunk scores of different files can be compared.
+
+    Returns:
+        list: (file name, file data, hits) tuples, most relevant file first
+    """
+    files = list(workspace.values())
+    indexes = [file_data["index"] for file_data in files]
+    idf = collection_idf(indexes, simple_tokenize(question))
+    with ThreadPoolExecutor() as executor:
+        all_hits = list(executor.map(
+            lambda index: search_bm25(index, question, top_k=CHUNKS_PER_FILE, idf=idf), indexes
+        ))
+
+    # Files are ranked by their best chunk
+    ranked = sorted(
+        ((hits[0]["score"], file_data, hits) for file_data, hits in zip(files, all_hits) if hits),
+        key=lambda item: item[0],
+        reverse=True
+    )[:MAX_SOURCE_FILES]
+
+    if not ranked:
+        # No keyword match: give the model the beginning of each file instead
+        return [
+            (file_data["name"], file_data, [{"text": file_data["index"]["chunks"][0], "position": 0, "score": 0.0}])
+            for file_data in files[:MAX_SOURCE_FILES] if file_data["index"]["chunks"]
+        ]
+    return [(file_data["name"], file_data, hits) for _, file_data, hits in ranked]
+
+
+def format_sources(retrieved):
+    """
+    Builds the prompt section listing every retrieved chunk with its source
+
+    Tables always come with their column statistics; small tables are sent
+    whole instead of the matched rows.
+    """
+    sections = []
+    for name, file_data, hits in retrieved:
+        header = f"Source: {name}"
+        if file_data["type"] == "tabular":
+            header += f"\nTable Description: {file_data['description']}"
+            header += f"\nColumn Statistics:\n{file_data['statistics']}"
+            if len(file_data["dataframe"]) <= WHOLE_TABLE_ROWS:
+                sections.append(header + f"\n\n[{name} - all rows]\n{file_data['content']}")
+                continue
+        parts = [f"[{name} - part {hit['position'] + 1}]\n{hit['text']}" for hit in sorted(hits, key=lambda h: h["position"])]
+        sections.append(header + "\n\n" + "\n\n".join(parts))
+    return "\n\n---\n\n".join(sections)
 
 
 # Initialize session states
-if 'messages' not in st.session_state:
-    st.session_state.messages = []
+if 'history' not in st.session_state:
+    st.session_state.history = ConversationHistory()
 
-if 'document_data' not in st.session_state:
-    st.session_state.document_data = {"type": "", "content": "", "dataframe": None, "description": ""}
+if 'workspace' not in st.session_state:
+    st.session_state.workspace = {}
 
-if 'file_uploaded' not in st.session_state:
-    st.session_state.file_uploaded = False
+workspace = st.session_state.workspace
 
 # Display title
 st.title("Smart Document Analysis Chatbot")
@@ -85,71 +280,106 @@ st.markdown("This chatbot is designed to answer your questions about uploaded do
 
 # File uploader in sidebar
 with st.sidebar:
-    st.header("Upload File")
-    uploaded_file = st.file_uploader("Upload a file", type=["txt", "pdf", "docx", "doc", "csv", "xlsx", "xls"])
+    st.header("Upload Files")
+    uploaded_files = st.file_uploader(
+        "Upload one or more files",
+        type=["txt", "pdf", "docx", "doc", "csv", "xlsx", "xls"],
+        accept_multiple_files=True
+    )
+
+    # Files are keyed by a hash of their content, so a changed file is indexed again
+    uploaded = {hashlib.sha256(uploaded_file.getvalue()).hexdigest(): uploaded_file for uploaded_file in uploaded_files}
+
+    # Drop files that were removed from the uploader
+    for file_hash in list(workspace):
+        if file_hash not in uploaded:
+            del workspace[file_hash]
+
+    # Parse and index only files that are new to the workspace
+    for file_hash, uploaded_file in uploaded.items():
+        if file_hash in workspace:
+            continue
 
-    if uploaded_file is not None:
-        # Extract data from uploaded file
         file_data = extract_data_from_file(uploaded_file)
-
-        if file_data["type"] != "error":
-            st.session_state.document_data = file_data
-            st.session_state.file_uploaded = True
-            st.success(f"'{uploaded_file.name}' successfully uploaded!")
-
-            # Show different previews based on file type
-            if file_data["type"] == "tabular":
-                st.subheader("File Information")
-                st.write(file_data["description"])
-                with st.expander("Data Preview"):
+        if file_data["type"] in ("error", "unknown"):
+            st.error(f"'{uploaded_file.name}' could not be read. {file_data['content']}")
+            continue
+
+        file_data["name"] = uploaded_file.name
+        file_data["index"] = build_document_index(file_data)
+        if file_data["type"] == "tabular":
+            file_data["statistics"] = table_statistics(file_data["dataframe"])
+        workspace[file_hash] = file_data
+        st.success(f"'{uploaded_file.name}' successfully uploaded!")
+
+    if workspace:
+        st.subheader("Workspace")
+        for file_hash, file_data in workspace.items():
+            name = file_data["name"]
+            with st.expander(name):
+                # Show different previews based on file type
+                if file_data["type"] == "tabular":
+                    st.write(file_data["description"])
                     st.dataframe(file_data["dataframe"].head(10))
-            else:
-                # Show document preview
-                with st.expander("Document Preview"):
+                else:
                     st.text_area("Document Content", file_data["content"][:5000] +
-                                 ("..." if len(file_data["content"]) > 5000 else ""), height=300, disabled=True)
+                                 ("..." if len(file_data["content"]) > 5000 else ""), height=300, disabled=True,
+                                 key=f"preview_{file_hash}")
+                st.caption(f"{len(file_data['index']['chunks'])} indexed parts")
 
     if st.button("Clear Chat"):
-        st.session_state.messages = []
+        st.session_state.history.clear()
         st.experimental_rerun()
 
 # Display data in main section (for tabular data)
-if st.session_state.file_uploaded and st.session_state.document_data["type"] == "tabular":
-    df = st.session_state.document_data["dataframe"]
+for file_data in workspace.values():
+    if file_data["type"] != "tabular":
+        continue
+    name = file_data["name"]
+    df = file_data["dataframe"]
 
     # Show basic statistics
-    st.subheader("Data Summary")
-
-    # Show first 5 rows
-    st.write("First 5 rows:")
-    st.dataframe(df.head())
-
-    # Column types
-    st.write("Column data types:")
-    st.dataframe(pd.DataFrame(df.dtypes, columns=["Data Type"]))
-
-    # Summary statistics for numerical columns
-    numeric_columns = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-    if numeric_columns:
-        st.write("Summary statistics for numerical columns:")
-        st.dataframe(df[numeric_columns].describe())
-
-# Display chat messages
-for message in st.session_state.messages:
+    with st.expander(f"Data Summary: {name}"):
+        # Show first 5 rows
+        st.write("First 5 rows:")
+        st.dataframe(df.head())
+
+        # Column types
+        st.write("Column data types:")
+        st.dataframe(pd.DataFrame(df.dtypes, columns=["Data Type"]))
+
+        # Summary statistics for numerical columns
+        numeric_columns = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+        if numeric_columns:
+            st.write("Summary statistics for numerical columns:")
+            st.dataframe(df[numeric_columns].describe())
+
+# Display chat messages (older turns are only kept as a summary)
+history = st.session_state.history
+if history.summary:
+    with st.expander("Earlier conversation (summarized)"):
+        st.write(history.summary)
+
+for message in history.pending + list(history.recent):
     with st.chat_message(message["role"]):
         st.write(message["content"])
+        if message["sources"]:
+            st.write("**Sources:** " + ", ".join(message["sources"]))
 
 # Get user input
-prompt = st.chat_input("Type your question here...", disabled=not st.session_state.file_uploaded)
+prompt = st.chat_input("Type your question here...", disabled=not workspace)
 
 # Show warning if no file is uploaded
-if not st.session_state.file_uploaded:
-    st.warning("Please upload a file from the left sidebar first (TXT, PDF, DOCX, CSV, or Excel).")
+if not workspace:
+    st.warning("Please upload files from the left sidebar first (TXT, PDF, DOCX, CSV, or Excel).")
 
 # Process user input
-if prompt and st.session_state.file_uploaded:
+if prompt and workspace:
+    # Conversation so far, limited to the history token budget
+    conversation_context = history.build_context() or "(no previous messages)"
+
     # Add user message to chat history
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    history.add("user", prompt)
 
     # Display user message
     with st.chat_message("user"):
@@ -158,39 +388,24 @@ if prompt and st.session_state.file_uploaded:
     # Generate AI response
     with st.chat_message("assistant"):
         with st.spinner("Thinking..."):
-            # Create prompt based on file type
-            document_data = st.session_state.document_data
-
-            if document_data["type"] == "tabular":
-                # Special prompt for tabular data
-                full_prompt = f"""
-                You are an expert assistant in data analysis.
-                You need to analyze the following table data and answer the user's questions.
+            # Route the question to the relevant files and chunks
+            retrieved = retrieve_from_workspace(workspace, prompt)
+            source_names = [name for name, _, _ in retrieved]
 
-                Table Description:
-                {document_data["description"]}
+            full_prompt = f"""
+            You are an expert assistant on the uploaded documents and tables.
+            The excerpts below were selected from the user's files as the most relevant to the question.
+            Based on this information, answer the user's question. For table data, provide a data-driven,
+            clear, and understandable response. Mention which source file each fact comes from.
+            If you don't know the answer to a question, honestly say you don't know.
 
-                Table Data:
-                {document_data["content"]}
+            Excerpts:
+            {format_sources(retrieved)}
 
-                User Question: {prompt}
+            {conversation_context}
 
-                Please provide a data-driven, clear, and understandable response. If the question cannot be answered 
-                with the available data, indicate this and suggest what the user might ask instead.
-                """
-            else:
-                # Prompt for text documents
-                full_prompt = f"""
-                You are an expert assistant on the uploaded document.
-                The text below contains information related to the uploaded document.
-                Based on this information, answer the user's questions.
-                If you don't know the answer to a question, honestly say you don't know.
-
-                Document Content:
-                {document_data["content"]}
-
-                User Question: {prompt}
-                """
+            User Question: {prompt}
+            """
 
             # Get response from Gemini
             response = model.generate_content(full_prompt)
@@ -198,9 +413,14 @@ if prompt and st.session_state.file_uploaded:
 
             # Display response
             st.write(response_text)
+            if source_names:
+                st.write("**Sources:** " + ", ".join(source_names))
+
+            # Add assistant response to chat history (the source list is not sent back to the model)
+            history.add("assistant", response_text, source_names)
 
-            # Add assistant response to chat history
-            st.session_state.messages.append({"role": "assistant", "content": response_text})
+    # Fold turns that left the verbatim window into the summary
+    history.compact(summarize_history)
 
 # Additional information in sidebar
 with st.sidebar:
@@ -216,9 +436,9 @@ with st.sidebar:
     - XLSX/XLS (Excel files)
 
     Usage:
-    1. Upload a file from the left sidebar
-    2. Ask your question after the file is successfully uploaded
-    3. The AI will respond based on the information in your file
+    1. Upload one or more files from the left sidebar
+    2. Ask your question after the files are successfully uploaded
+    3. The AI will respond based on the most relevant files and list the sources it used
 
     Example questions (for CSV/Excel):
     - "What's the highest value in this data?"
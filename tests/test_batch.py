@@ -0,0 +1,156 @@
+import os
+
+import pytest
+
+from doc_core.jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+batch = pytest.importorskip("doc_core.ocr.batch")
+
+SETTINGS = {"ocr_lang": "tur", "preprocessing_options": {}}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "manifest.sqlite3"))
+
+
+def write(path, data=b"scan"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_output_keeps_the_input_extension(tmp_path):
+    pdf = str(tmp_path / "scan.pdf")
+    tif = str(tmp_path / "scan.tif")
+    assert batch.output_path(pdf) == pdf + ".txt"
+    assert batch.output_path(pdf) != batch.output_path(tif)
+
+
+def test_output_dir_mirrors_the_input_folders(tmp_path):
+    base = str(tmp_path / "in")
+    path = os.path.join(base, "a", "scan.pdf")
+    out = str(tmp_path / "out")
+    assert batch.output_path(path, out, base) == os.path.join(out, "a", "scan.pdf.txt")
+    assert batch.output_path(path, out) == os.path.join(out, "scan.pdf.txt")
+
+
+def test_collect_inputs_walks_directories_and_globs(tmp_path):
+    first = write(tmp_path / "in" / "a.pdf")
+    second = write(tmp_path / "in" / "sub" / "b.TIF")
+    write(tmp_path / "in" / "notes.txt")
+    other = write(tmp_path / "other" / "c.png")
+    assert batch.collect_inputs([str(tmp_path / "in"), str(tmp_path / "other" / "*.png")]) == sorted(
+        [first, second, other])
+
+
+def test_submit_skips_done_files_and_resumes_unfinished_ones(tmp_path, queue):
+    done = write(tmp_path / "done.pdf")
+    unfinished = write(tmp_path / "unfinished.pdf")
+    job_ids, submitted, skipped, resumed = batch.submit_files(queue, [done, unfinished], SETTINGS)
+    assert (len(job_ids), submitted, skipped, resumed) == (2, 2, 0, 0)
+
+    jobs = {job["payload"]["path"]: job for job in queue.list(batch.TASK)}
+    queue.claim("worker-1")  # done.pdf, submitted first
+    queue.finish(jobs[done]["id"], {})
+    write(tmp_path / "done.pdf.txt", b"text")
+
+    job_ids, submitted, skipped, resumed = batch.submit_files(queue, [done, unfinished], SETTINGS)
+    assert (job_ids, submitted, skipped, resumed) == ([jobs[unfinished]["id"]], 0, 1, 1)
+
+
+def test_submit_redoes_a_done_file_whose_output_is_missing(tmp_path, queue):
+    path = write(tmp_path / "scan.pdf")
+    (job_id,), _, _, _ = batch.submit_files(queue, [path], SETTINGS)
+    queue.claim("worker-1")
+    queue.finish(job_id, {})
+
+    job_ids, submitted, skipped, _ = batch.submit_files(queue, [path], SETTINGS)
+    assert (submitted, skipped) == (1, 0)
+    assert job_ids != [job_id]
+
+
+def test_submit_cancels_the_stale_job_of_a_changed_file(tmp_path, queue):
+    path = write(tmp_path / "scan.pdf")
+    (old_id,), _, _, _ = batch.submit_files(queue, [path], SETTINGS)
+    queue.claim("worker-1")
+    write(tmp_path / "scan.pdf", b"a longer scan")
+
+    (new_id,), submitted, _, _ = batch.submit_files(queue, [path], SETTINGS)
+    assert submitted == 1 and new_id != old_id
+    assert queue.get(old_id)["state"] == FAILED
+    assert queue.get(new_id)["state"] == QUEUED
+
+    # The worker still running the old job cannot mark it done
+    queue.finish(old_id, {})
+    assert queue.get(old_id)["state"] == FAILED
+
+
+def test_changed_settings_resubmit_the_file(tmp_path, queue):
+    path = write(tmp_path / "scan.pdf")
+    (old_id,), _, _, _ = batch.submit_files(queue, [path], SETTINGS)
+    (new_id,), submitted, _, _ = batch.submit_files(queue, [path], {**SETTINGS, "ocr_lang": "eng"})
+    assert submitted == 1
+    assert queue.get(old_id)["state"] == FAILED
+    assert queue.get(new_id)["payload"]["ocr_lang"] == "eng"
+
+
+def test_stale_job_does_not_write_its_output(tmp_path, queue):
+    path = write(tmp_path / "scan.pdf")
+    batch.submit_files(queue, [path], SETTINGS)
+    payload = queue.claim("worker-1")["payload"]
+    write(tmp_path / "scan.pdf", b"a longer scan")
+    with pytest.raises(RuntimeError, match="changed"):
+        batch.ocr_file_task(payload, None, lambda fraction, message="": None)
+    assert not os.path.exists(payload["output"])
+
+
+def test_prune_removes_superseded_and_orphaned_jobs(tmp_path, queue):
+    kept = write(tmp_path / "kept.pdf")
+    removed = write(tmp_path / "removed.pdf")
+    (first_id, removed_id), _, _, _ = batch.submit_files(queue, [kept, removed], SETTINGS)
+    for job_id in (first_id, removed_id):
+        queue.claim("worker-1")
+        queue.finish(job_id, {})
+    (latest_id,), _, _, _ = batch.submit_files(queue, [kept], SETTINGS)  # Output missing: submitted again
+    os.remove(removed)
+
+    assert batch.prune_manifest(queue) == 2
+    assert [job["id"] for job in queue.list(batch.TASK)] == [latest_id]
+    assert batch.prune_manifest(queue) == 0
+
+
+def test_prune_keeps_unfinished_jobs_of_missing_files(tmp_path, queue):
+    path = write(tmp_path / "scan.pdf")
+    (job_id,), _, _, _ = batch.submit_files(queue, [path], SETTINGS)
+    queue.claim("worker-1")
+    os.remove(path)
+    assert batch.prune_manifest(queue) == 0
+    assert queue.get(job_id)["state"] == RUNNING
+
+
+def test_queue_reads_only_the_requested_jobs(queue):
+    first = queue.submit("tasks:echo")
+    second = queue.submit("tasks:echo")
+    third = queue.submit("tasks:echo")
+    queue.claim("worker-1")
+    queue.finish(first, {})
+
+    assert queue.states([first, third]) == {first: DONE, third: QUEUED}
+    assert [job["id"] for job in queue.list(job_ids=[third, first])] == [first, third]
+    assert queue.list(job_ids=[]) == []
+    queue.delete([second])
+    assert queue.get(second) is None
+
+
+def test_cancel_applies_only_to_unfinished_jobs(queue):
+    done = queue.submit("tasks:echo")
+    queue.claim("worker-1")
+    queue.finish(done, {})
+    queued = queue.submit("tasks:echo", input_bytes=b"data")
+
+    queue.cancel(done)
+    queue.cancel(queued, "Superseded")
+    assert queue.get(done)["state"] == DONE
+    assert (queue.get(queued)["state"], queue.get(queued)["error"]) == (FAILED, "Superseded")
+    assert queue.claim("worker-1") is None
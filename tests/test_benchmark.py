@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from doc_core.ocr.benchmark import character_error_rate, levenshtein, normalize_text
+
+
+def reference_distance(a, b):
+    """Textbook dynamic-programming edit distance"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("", "", 0),
+    ("abc", "", 3),
+    ("", "abc", 3),
+    ("kitten", "sitting", 3),
+    ("flaw", "lawn", 2),
+    ("çığır", "cigir", 4),
+    ("same", "same", 0),
+])
+def test_levenshtein_known_distances(a, b, distance):
+    assert levenshtein(a, b) == distance
+    assert levenshtein(b, a) == distance
+
+
+def test_levenshtein_matches_the_dynamic_programming_table():
+    rng = random.Random(0)
+    for _ in range(300):
+        # Lengths around 64 also cover bit columns wider than one machine word
+        a = "".join(rng.choice("abcğış ") for _ in range(rng.randint(0, 80)))
+        b = "".join(rng.choice("abcğış ") for _ in range(rng.randint(0, 80)))
+        assert levenshtein(a, b) == reference_distance(a, b)
+
+
+def test_normalize_text_collapses_whitespace():
+    assert normalize_text("  Merhaba\n\n dünya\t! ") == "Merhaba dünya !"
+
+
+def test_character_error_rate():
+    assert character_error_rate("Merhaba dünya", "Merhaba\ndünya\n") == 0
+    assert character_error_rate("abcd", "abed") == 0.25
+    assert character_error_rate("ab", "ab and more") == 4.5
+    assert character_error_rate("", "") == 0
+    assert character_error_rate(" ", "text") == 1
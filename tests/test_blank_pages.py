@@ -0,0 +1,81 @@
+import random
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from doc_core.ocr.blank_pages import classify_page, find_components, has_text_line, is_blank_page
+
+# A4 at 150 DPI
+PAGE_SIZE = (1240, 1754)
+DPI = 150
+
+
+def _page():
+    return Image.new("L", PAGE_SIZE, 255)
+
+
+def _text_page(text, points, top=0.4):
+    page = _page()
+    font = ImageFont.load_default(size=round(points * DPI / 72))
+    ImageDraw.Draw(page).text((PAGE_SIZE[0] * 0.15, PAGE_SIZE[1] * top), text, font=font, fill=0)
+    return page
+
+
+def test_empty_page_is_blank():
+    assert classify_page(_page()) == "blank"
+
+
+def test_dust_is_blank():
+    page = _page()
+    draw = ImageDraw.Draw(page)
+    rng = random.Random(0)
+    for _ in range(40):
+        x, y = rng.randrange(PAGE_SIZE[0]), rng.randrange(PAGE_SIZE[1])
+        draw.ellipse([x, y, x + 4, y + 4], fill=0)
+    assert classify_page(page) == "blank"
+
+
+def test_page_number_alone_is_skipped():
+    assert is_blank_page(_text_page("12", 11, top=0.95))
+
+
+def test_stamp_and_signature_are_near_blank():
+    page = _page()
+    draw = ImageDraw.Draw(page)
+    draw.ellipse([800, 1400, 1050, 1650], outline=0, width=6)
+    draw.line([(200, 1500), (250, 1460), (290, 1530), (340, 1450), (380, 1510)], fill=0, width=5)
+    assert classify_page(page) == "near_blank"
+
+
+@pytest.mark.parametrize("text, points", [("EK-1 RAPOR", 22), ("BÖLÜM 3", 18), ("Ek Tablolar", 14)])
+def test_heading_only_pages_are_content(text, points):
+    assert classify_page(_text_page(text, points)) == "content"
+
+
+def test_full_text_page_is_content():
+    page = _page()
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.load_default(size=round(11 * DPI / 72))
+    for y in range(150, PAGE_SIZE[1] - 150, 35):
+        draw.text((150, y), "The quick brown fox jumps over the lazy dog again", font=font, fill=0)
+    assert classify_page(page) == "content"
+
+
+def test_components_are_labelled_with_their_boxes():
+    mask = np.zeros((10, 12), dtype=bool)
+    mask[1:4, 1:3] = True
+    mask[4, 3] = True  # touches the first block diagonally
+    mask[6:9, 8:11] = True
+    assert sorted(find_components(mask)) == [(7, 1, 1, 5, 4), (9, 6, 8, 9, 11)]
+
+
+def test_text_line_needs_aligned_glyphs():
+    def glyph(left, top=100, height=8, width=6):
+        return (width * height // 2, top, left, top + height, left + width)
+
+    assert has_text_line([glyph(10), glyph(20), glyph(30), glyph(40)])
+    # Too few glyphs, glyphs too far apart, or not on one line
+    assert not has_text_line([glyph(10), glyph(20)])
+    assert not has_text_line([glyph(10), glyph(60), glyph(110), glyph(160)])
+    assert not has_text_line([glyph(10, top=100), glyph(20, top=140), glyph(30, top=180), glyph(40, top=220)])
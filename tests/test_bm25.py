@@ -0,0 +1,27 @@
+import pytest
+
+from doc_core.bm25 import collection_idf, create_bm25_index, search_bm25, simple_tokenize
+
+
+def test_scores_with_collection_idf_match_a_single_index():
+    first = ["the cat sat on the mat", "dogs chase the cat", "a quiet afternoon"]
+    second = ["invoice total for march", "the cat invoice"]
+    query = "cat invoice"
+
+    indexes = [create_bm25_index(first), create_bm25_index(second)]
+    idf = collection_idf(indexes, simple_tokenize(query))
+    combined = create_bm25_index(first + second)
+    expected = collection_idf([combined], simple_tokenize(query))
+    assert idf == expected
+
+    hits = [hit for index in indexes for hit in search_bm25(index, query, top_k=5, idf=idf)]
+    assert max(hits, key=lambda hit: hit["score"])["text"] == "the cat invoice"
+    assert all(hit["score"] > 0 for hit in hits)
+
+
+def test_single_chunk_files_are_found_with_collection_idf():
+    indexes = [create_bm25_index(["short note about budgets"]), create_bm25_index(["unrelated", "text"])]
+    idf = collection_idf(indexes, simple_tokenize("budgets"))
+    hits = search_bm25(indexes[0], "budgets", idf=idf)
+    assert [hit["position"] for hit in hits] == [0]
+    assert hits[0]["score"] == pytest.approx(idf["budgets"] * 2.5 / (1 + 1.5))
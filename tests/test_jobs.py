@@ -0,0 +1,176 @@
+import os
+import time
+
+import pytest
+
+from doc_core import jobs
+from doc_core.jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue, WorkerPool
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_job_goes_from_queued_to_done(queue):
+    job_id = queue.submit("tasks:echo", {"n": 1}, b"input")
+    assert queue.get(job_id)["state"] == QUEUED
+
+    job = queue.claim("worker-1")
+    assert (job["id"], job["payload"], job["input"]) == (job_id, {"n": 1}, b"input")
+    assert queue.get(job_id)["state"] == RUNNING
+
+    queue.set_progress(job_id, 0.5, "half")
+    assert (queue.get(job_id)["progress"], queue.get(job_id)["message"]) == (0.5, "half")
+
+    queue.finish(job_id, {"ok": True})
+    job = queue.get(job_id)
+    assert (job["state"], job["progress"], job["result"]) == (DONE, 1, {"ok": True})
+    assert queue.claim("worker-1") is None
+
+
+def test_failed_job_keeps_its_error(queue):
+    job_id = queue.submit("tasks:echo")
+    queue.claim("worker-1")
+    queue.fail(job_id, "Traceback ...")
+    assert (queue.get(job_id)["state"], queue.get(job_id)["error"]) == (FAILED, "Traceback ...")
+
+
+def test_jobs_are_claimed_oldest_first(queue):
+    first = queue.submit("tasks:echo")
+    second = queue.submit("tasks:echo")
+    assert [queue.claim("w")["id"], queue.claim("w")["id"]] == [first, second]
+    assert queue.counts() == {RUNNING: 2}
+
+
+def test_released_jobs_are_resumed_without_using_an_attempt(queue):
+    job_id = queue.submit("tasks:echo")
+    for _ in range(jobs.MAX_ATTEMPTS + 1):
+        queue.claim("pid-1")
+        queue.release_worker("pid-1")
+    assert queue.get(job_id)["state"] == QUEUED
+    assert queue.claim("pid-2")["id"] == job_id
+
+
+def test_requeue_worker_only_takes_back_its_jobs(queue):
+    dead = queue.submit("tasks:echo")
+    alive = queue.submit("tasks:echo")
+    queue.claim("pid-1")
+    queue.claim("pid-2")
+
+    assert queue.requeue_worker("pid-1") == 1
+    assert queue.get(dead)["state"] == QUEUED
+    assert queue.get(alive)["state"] == RUNNING
+
+
+def test_requeue_stale_respects_the_lease(queue):
+    job_id = queue.submit("tasks:echo")
+    queue.claim("pid-1")
+    assert queue.requeue_stale(lease_seconds=60) == 0
+
+    time.sleep(0.05)
+    assert queue.requeue_stale(lease_seconds=0.01) == 1
+    assert queue.get(job_id)["state"] == QUEUED
+
+
+def test_heartbeat_renews_the_lease(queue):
+    job_id = queue.submit("tasks:echo")
+    queue.claim("pid-1")
+    time.sleep(0.05)
+    queue.heartbeat(job_id)
+    assert queue.requeue_stale(lease_seconds=0.04) == 0
+    assert queue.get(job_id)["state"] == RUNNING
+
+
+def test_job_fails_after_max_attempts(queue):
+    job_id = queue.submit("tasks:echo")
+    for _ in range(jobs.MAX_ATTEMPTS - 1):
+        queue.claim("pid-1")
+        queue.requeue_worker("pid-1")
+        assert queue.get(job_id)["state"] == QUEUED
+
+    queue.claim("pid-1")
+    queue.requeue_worker("pid-1")
+    job = queue.get(job_id)
+    assert job["state"] == FAILED
+    assert "Worker process died" in job["error"]
+
+
+def test_pool_restarts_dead_workers(tmp_path):
+    pool = WorkerPool(str(tmp_path / "jobs.sqlite3"), workers=1, supervise_interval=3600)
+    pool.start()
+    try:
+        pool.processes[0].terminate()
+        pool.processes[0].join()
+        assert pool.check() == 1
+        assert pool.processes[0].is_alive()
+    finally:
+        pool.stop()
+    assert pool.processes == []
+
+
+def test_pool_start_leaves_jobs_of_live_workers_running(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    queue = JobQueue(db_path)
+    live = queue.submit("tasks:echo")
+    dead = queue.submit("tasks:echo")
+    queue.claim(jobs._worker_name(os.getpid()))
+    queue.claim("pid-999999999")
+    assert queue.running_workers()
+
+    pool = WorkerPool(db_path, supervise_interval=3600)
+    pool.workers = 0  # Only the recovery at start-up is tested
+    pool.start()
+    pool.stop()
+    assert queue.get(live)["state"] == RUNNING
+    assert queue.get(dead)["state"] == QUEUED
+
+
+def test_old_finished_jobs_are_deleted(queue):
+    done = queue.submit("tasks:echo")
+    failed = queue.submit("tasks:echo")
+    recent = queue.submit("tasks:echo")
+    running = queue.submit("tasks:echo")
+    for _ in range(4):
+        queue.claim("pid-1")
+    queue.finish(done, {})
+    queue.fail(failed, "error")
+    queue.finish(recent, {})
+    with queue._connect() as conn:
+        conn.execute("UPDATE jobs SET updated_at = 0 WHERE id IN (?, ?, ?)", (done, failed, running))
+
+    assert queue.delete_finished(3600) == 2
+    assert queue.states([done, failed, recent, running]) == {recent: DONE, running: RUNNING}
+
+
+def test_pool_start_deletes_old_finished_jobs_unless_kept(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    queue = JobQueue(db_path)
+    job_id = queue.submit("tasks:echo")
+    queue.claim("pid-1")
+    queue.finish(job_id, {})
+    with queue._connect() as conn:
+        conn.execute("UPDATE jobs SET updated_at = 0")
+
+    for retention, expected in ((None, {job_id: DONE}), (3600, {})):
+        pool = WorkerPool(db_path, supervise_interval=3600, retention_seconds=retention)
+        pool.workers = 0  # Only the clean-up at start-up is tested
+        pool.start()
+        pool.stop()
+        assert queue.states([job_id]) == expected
+
+
+def test_old_exports_are_removed(tmp_path, monkeypatch):
+    from doc_core.ocr import pipeline
+
+    monkeypatch.setattr(pipeline, "EXPORT_DIR", str(tmp_path / "exports"))
+    assert pipeline.remove_old_exports(3600) == 0
+    os.makedirs(pipeline.EXPORT_DIR)
+    old, new = (os.path.join(pipeline.EXPORT_DIR, name) for name in ("old.pdf", "new.pdf"))
+    for path in (old, new):
+        with open(path, "wb") as f:
+            f.write(b"%PDF")
+    os.utime(old, (0, 0))
+
+    assert pipeline.remove_old_exports(3600) == 1
+    assert os.listdir(pipeline.EXPORT_DIR) == ["new.pdf"]
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from doc_core.ocr import engine, layout
+from doc_core.ocr.image_processing import preprocess_image
+
+
+def _band_words(img, ocr_lang, psm=None):
+    """Stand-in for Tesseract: one word per dark band of rows; single lines and the top band read badly"""
+    rows = (np.asarray(img.convert("L")) < 128).any(axis=1)
+    words, top = [], None
+    for y, ink in enumerate(list(rows) + [False]):
+        if ink and top is None:
+            top = y
+        elif not ink and top is not None:
+            words.append({"block": 1, "par": 1, "line": len(words) + 1, "text": f"w{top}", "conf": 20 if psm or top == 20 else 90,
+                          "box": [0, top, img.width, y]})
+            top = None
+    return words
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def image_to_data(img, ocr_lang, psm=None):
+        calls.append(psm)
+        return _band_words(img, ocr_lang, psm)
+
+    monkeypatch.setattr(engine, "image_to_data", image_to_data)
+    return calls
+
+
+def _page():
+    page = Image.new("L", (300, 200), 255)
+    draw = ImageDraw.Draw(page)
+    for top in (20, 60, 100):
+        draw.rectangle([20, top, 250, top + 12], fill=0)
+    return page
+
+
+def test_low_confidence_lines_are_not_reocred_from_the_same_pixels(calls):
+    page = _page()
+    plain, thresholded = {}, {"apply_threshold": True, "threshold_value": 128}
+    previous = layout.recognize_layout(preprocess_image(page, plain), "eng", plain)
+    calls.clear()
+
+    # The first update tries the low-confidence line on its own and keeps the old reading
+    updated, reocr_lines = layout.update_layout(page, previous, "eng", thresholded)
+    assert (reocr_lines, calls) == (1, [layout.PSM_SINGLE_LINE])
+    calls.clear()
+
+    # The pixels of the lines are the same under both settings: nothing is OCRed again
+    updated, reocr_lines = layout.update_layout(page, updated, "eng", plain)
+    assert (reocr_lines, calls) == (0, [])
+    assert layout.layout_text(updated) == layout.layout_text(previous)
+
+
+def test_geometry_changes_need_a_full_ocr(calls):
+    page = _page()
+    previous = layout.recognize_layout(preprocess_image(page, {}), "eng", {})
+    calls.clear()
+    options = {"apply_resize": True, "scale_factor": 2}
+    updated, reocr_lines = layout.update_layout(page, previous, "eng", options)
+    assert (reocr_lines, calls) == (None, [None])
+    assert updated["size"] == [600, 400]
@@ -0,0 +1,124 @@
+import os
+import re
+import sys
+from collections import Counter
+from string import punctuation
+
+import numpy as np
+import pytest
+
+# The summarizer app is not part of the doc_core package; it imports its module from its own folder
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "text_summarizer_local"))
+local_summarizer = pytest.importorskip("local_summarizer")
+
+SENTENCES = [
+    "Kedi bahçede oturuyor ve kuşları izliyor.",
+    "Bahçede bir kedi ile bir köpek oynuyor.",
+    "Ancak köpek kuşları kovalamayı seviyor.",
+    "Hava bugün çok güzel.",
+    "Kuşlar ağaçta şarkı söylüyor, kedi kuşları izliyor.",
+    "Bu ve bu.",
+]
+
+
+@pytest.fixture
+def ozetleyici(monkeypatch):
+    # Built without __init__, which downloads NLTK data
+    ozetleyici = object.__new__(local_summarizer.MetinOzetleyici)
+    ozetleyici.stop_words = {"ve", "bu", "ile", "bir", "çok"}
+    ozetleyici.punctuation = set(punctuation)
+    monkeypatch.setattr(local_summarizer, "word_tokenize", lambda text: re.findall(r"\w+|[^\w\s]", text))
+    return ozetleyici
+
+
+def _reference_similarity(ozetleyici, cumleler, baglacli):
+    """Pairwise similarities as the summarizer computed them before the sparse product"""
+    vectors = []
+    for cumle in cumleler:
+        words = [word.lower() for word in local_summarizer.word_tokenize(cumle)]
+        counts = Counter(w for w in words if w not in ozetleyici.stop_words and w not in ozetleyici.punctuation)
+        vectors.append({word: 1 + count * 0.3 for word, count in counts.items()})
+
+    n = len(cumleler)
+    similarity = np.zeros((n, n))
+    for i in range(n):
+        for j in range(n):
+            norm = np.sqrt(sum(v * v for v in vectors[i].values()) * sum(v * v for v in vectors[j].values()))
+            if i == j or norm == 0:
+                continue
+            dot = sum(weight * vectors[j].get(word, 0) for word, weight in vectors[i].items())
+            similarity[i, j] = dot / norm * (1.2 if baglacli[j] else 1.0)
+    return similarity
+
+
+def _similarity(ozetleyici, **kwargs):
+    kelimeler = [[word.lower() for word in local_summarizer.word_tokenize(c)] for c in SENTENCES]
+    baglacli = np.array([ozetleyici._baglac_iceriyor(k) for k in kelimeler])
+    return ozetleyici._benzerlik_matrisi(ozetleyici._terim_matrisi(kelimeler), baglacli, **kwargs), baglacli
+
+
+def test_sparse_similarity_matches_the_pairwise_computation(ozetleyici):
+    similarity, baglacli = _similarity(ozetleyici)
+    assert baglacli.tolist() == [False, False, True, False, False, False]
+    np.testing.assert_allclose(similarity.toarray(), _reference_similarity(ozetleyici, SENTENCES, baglacli), atol=1e-12)
+    # The sentence made only of stop words has no similarities instead of NaN
+    assert similarity[5].nnz == 0 and similarity[:, 5].nnz == 0
+
+
+def test_small_row_blocks_give_the_same_similarities(ozetleyici, monkeypatch):
+    full, _ = _similarity(ozetleyici)
+    monkeypatch.setattr(local_summarizer, "BLOK_SATIR", 2)
+    blocked, _ = _similarity(ozetleyici)
+    np.testing.assert_allclose(blocked.toarray(), full.toarray())
+
+
+def test_sentence_graph_and_pagerank_match_networkx(ozetleyici):
+    nx = pytest.importorskip("networkx")
+    similarity, _ = _similarity(ozetleyici)
+    graph = ozetleyici._cumle_grafi(similarity)
+
+    # The summarizer used to build the graph with networkx from the dense matrix
+    nx_graph = nx.from_numpy_array(similarity.toarray())
+    np.testing.assert_allclose(graph.toarray(), nx.to_numpy_array(nx_graph), atol=1e-12)
+
+    scores, steps, converged = ozetleyici._pagerank(graph)
+    expected = nx.pagerank(nx_graph)
+    assert converged and steps < local_summarizer.PAGERANK_EN_FAZLA_ADIM
+    np.testing.assert_allclose(scores, [expected[i] for i in range(len(SENTENCES))], atol=1e-5)
+    assert scores.sum() == pytest.approx(1)
+
+
+def test_pagerank_reports_when_it_does_not_converge(ozetleyici):
+    similarity, _ = _similarity(ozetleyici)
+    scores, steps, converged = ozetleyici._pagerank(ozetleyici._cumle_grafi(similarity), en_fazla_adim=1)
+    assert (steps, converged) == (1, False)
+    assert len(scores) == len(SENTENCES)
+
+
+def test_neighbours_and_threshold_limit_the_graph(ozetleyici):
+    full, _ = _similarity(ozetleyici)
+    nearest, _ = _similarity(ozetleyici, komsu_sayisi=1)
+    for i in range(len(SENTENCES)):
+        row = full[i].toarray().ravel()
+        kept = nearest[i].toarray().ravel()
+        assert np.count_nonzero(kept) == min(1, np.count_nonzero(row))
+        if row.any():
+            assert kept.max() == row.max()
+
+    threshold = 0.2
+    limited, _ = _similarity(ozetleyici, esik=threshold)
+    expected = full.toarray()
+    expected[expected <= threshold] = 0
+    np.testing.assert_allclose(limited.toarray(), expected)
+
+
+def test_each_sentence_is_tokenized_once(ozetleyici, monkeypatch):
+    calls = []
+    tokenize = local_summarizer.word_tokenize
+    monkeypatch.setattr(local_summarizer, "word_tokenize", lambda text: calls.append(text) or tokenize(text))
+    monkeypatch.setattr(local_summarizer, "pos_tag", lambda words: [(word, "NN") for word in words])
+    monkeypatch.setattr(ozetleyici, "_metin_temizle", lambda metin: metin, raising=False)
+    monkeypatch.setattr(ozetleyici, "_cumle_ayir", lambda metin: list(SENTENCES), raising=False)
+
+    ozetleyici.ozetle(" ".join(SENTENCES))
+    assert sorted(calls) == sorted(SENTENCES)
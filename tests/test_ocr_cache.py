@@ -0,0 +1,83 @@
+import itertools
+import types
+
+import pytest
+from PIL import Image
+
+from doc_core.ocr import cache as cache_module
+from doc_core.ocr.cache import EVICT_TO_RATIO, OcrCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Makes every last_used timestamp one second later than the previous one"""
+    ticks = itertools.count(1)
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(time=lambda: float(next(ticks))))
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return OcrCache(str(tmp_path), max_bytes=100)
+
+
+def test_hits_and_misses_are_counted(cache):
+    assert cache.get("a") is None
+    cache.put("a", "text")
+    assert cache.get("a") == "text"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["size_bytes"]) == (1, 1, 1, 4)
+
+
+def test_least_recently_used_entries_are_evicted_first(cache):
+    for key in "abc":
+        cache.put(key, key * 30)
+    # Reading 'a' makes 'b' the least recently used entry
+    assert cache.get("a") == "a" * 30
+    cache.put("d", "d" * 30)
+
+    assert cache.get("b") is None
+    assert [cache.get(key) is not None for key in "acd"] == [True, True, True]
+
+
+def test_eviction_trims_below_the_target_size(cache):
+    for key in "abcdef":
+        cache.put(key, key * 20)
+    assert cache.stats()["size_bytes"] <= 100 * EVICT_TO_RATIO
+    assert cache.get("f") == "f" * 20
+    assert cache.get("a") is None
+
+
+def test_layouts_share_the_size_limit(cache):
+    cache.put("text", "t" * 40)
+    cache.put_layout("page", {"lines": ["x" * 60]})
+    # The older text entry goes first once text and layouts exceed the limit
+    assert cache.get("text") is None
+    assert cache.get_layout("page") == {"lines": ["x" * 60]}
+
+
+def test_partial_layout_updates_are_counted(cache):
+    cache.put_layout("page", {"lines": []})
+    cache.put_layout("page", {"lines": []}, partial=True)
+    assert cache.stats()["partial"] == 1
+
+
+def test_clear_removes_entries_and_counters(cache):
+    cache.put("a", "text")
+    cache.get("a")
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "partial": 0, "entries": 0, "size_bytes": 0}
+
+
+def test_keys_depend_on_page_and_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "tesseract_version", lambda tesseract_cmd: "tesseract 5.3.0")
+    cache = OcrCache(str(tmp_path))
+    page = Image.new("L", (40, 600), 255)
+    other = page.copy()
+    other.putpixel((5, 500), 0)
+
+    page_key = cache.make_page_key(page)
+    assert page_key == cache.make_page_key(page.copy())
+    assert page_key != cache.make_page_key(other)
+    assert cache.make_key(page_key, "tur", {"deskew": True}) == cache.make_key(page_key, "tur", {"deskew": True})
+    assert cache.make_key(page_key, "tur", {"deskew": True}) != cache.make_key(page_key, "eng", {"deskew": True})
+    assert cache.make_key(page_key, "tur", {}) != cache.make_key(page_key, "tur", {"deskew": True})
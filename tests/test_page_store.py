@@ -0,0 +1,79 @@
+import os
+
+import pytest
+from PIL import Image
+
+from doc_core.ocr import page_store, rendering
+from doc_core.ocr.page_store import PageStore
+from doc_core.ocr.tiling import PdfPageTiles
+
+
+@pytest.fixture
+def poppler(monkeypatch):
+    """Stand-in for pdf2image that records the files Poppler is run on and fails on bytes"""
+    paths = []
+
+    def convert_from_path(pdf_path, dpi, first_page, last_page, **kwargs):
+        with open(pdf_path, "rb") as f:
+            assert f.read() == b"%PDF-test"
+        paths.append(pdf_path)
+        return [Image.new("L", (dpi, dpi), page) for page in range(first_page, last_page + 1)]
+
+    def pdfinfo_from_path(pdf_path, **kwargs):
+        paths.append(pdf_path)
+        return {"Pages": 5}
+
+    def from_bytes(*args, **kwargs):
+        raise AssertionError("the PDF was written to a new temporary file")
+
+    monkeypatch.setattr(rendering.pdf2image, "convert_from_path", convert_from_path)
+    monkeypatch.setattr(rendering.pdf2image, "pdfinfo_from_path", pdfinfo_from_path)
+    monkeypatch.setattr(rendering.pdf2image, "convert_from_bytes", from_bytes)
+    monkeypatch.setattr(rendering.pdf2image, "pdfinfo_from_bytes", from_bytes)
+    return paths
+
+
+def test_store_renders_every_page_from_one_file(poppler):
+    store = PageStore(b"%PDF-test", is_pdf=True)
+    assert store.page_count() == 5
+    assert store.image(1, 50).getpixel((0, 0)) == 2
+    assert store.image(3, 72).size == (72, 72)
+    assert [index for index, _ in store.iter_images([0, 1, 2], 50)] == [0, 1, 2]
+    assert len(set(poppler)) == 1
+
+    path = store.pdf_path()
+    store.close()
+    assert not os.path.exists(path)
+
+
+def test_stored_pages_are_not_rendered_again(poppler):
+    store = PageStore(b"%PDF-test", is_pdf=True)
+    store.image(0, 50)
+    calls = len(poppler)
+    store.image(0, 50)
+    assert len(poppler) == calls
+
+
+def test_temporary_file_is_removed_with_the_store(poppler):
+    store = PageStore(b"%PDF-test", is_pdf=True)
+    path = store.pdf_path()
+    del store
+    assert not os.path.exists(path)
+
+
+def test_pages_too_large_to_render_whole_come_as_tiles(poppler, monkeypatch):
+    # An A0 sheet next to an A4 page
+    monkeypatch.setattr(page_store, "pdf_page_sizes", lambda pdf_bytes: [(2384, 3370), (595, 842)])
+    store = PageStore(b"%PDF-test", is_pdf=True)
+    (first, large), (second, normal) = store.iter_images([0, 1], 600)
+    assert (first, second) == (0, 1)
+    assert isinstance(large, PdfPageTiles) and large.size == (19867, 28084)
+    assert large.pdf_path == store.pdf_path()
+    assert isinstance(normal, Image.Image)
+
+
+def test_importing_the_store_keeps_the_decompression_bomb_guard():
+    assert Image.MAX_IMAGE_PIXELS < page_store.MAX_PAGE_PIXELS
+    with page_store._pixel_limit(page_store.MAX_PAGE_PIXELS):
+        assert Image.MAX_IMAGE_PIXELS == page_store.MAX_PAGE_PIXELS
+    assert Image.MAX_IMAGE_PIXELS < page_store.MAX_PAGE_PIXELS
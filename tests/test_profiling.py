@@ -0,0 +1,49 @@
+import threading
+import time
+
+from doc_core.ocr import profiling
+from doc_core.ocr.profiling import document_stage, stage, stage_totals, to_prometheus
+
+
+def _spin(stop):
+    while not stop.is_set():
+        pass
+
+
+def test_stage_cpu_time_leaves_out_other_threads():
+    profile = []
+    stop = threading.Event()
+    busy = threading.Thread(target=_spin, args=(stop,))
+    busy.start()
+    try:
+        with stage(profile, "render", 1):
+            time.sleep(0.3)
+    finally:
+        stop.set()
+        busy.join()
+
+    (record,) = profile
+    assert record["wall_seconds"] >= 0.3
+    assert record["cpu_seconds"] < 0.1
+    assert record["peak_memory_mb"] is None
+
+
+def test_peak_memory_is_reported_for_the_document_only(monkeypatch):
+    resets = []
+    monkeypatch.setattr(profiling, "reset_peak_memory", lambda: resets.append(True))
+    monkeypatch.setattr(profiling, "peak_memory_mb", lambda: 512.0)
+
+    profile = []
+    with document_stage(profile):
+        with stage(profile, "ocr", 1):
+            pass
+        with stage(profile, "ocr", 2):
+            pass
+    assert resets == [True]
+
+    totals = stage_totals(profile)
+    assert totals["ocr"]["peak_memory_mb"] is None
+    assert totals["document"]["peak_memory_mb"] == 512.0
+    metrics = to_prometheus(profile)
+    assert 'ocr_stage_peak_memory_bytes{stage="document"} 536870912.0' in metrics
+    assert metrics.count("ocr_stage_peak_memory_bytes{") == 1
@@ -0,0 +1,42 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from doc_core.ocr.image_processing import apply_geometry, preprocess_image
+from doc_core.ocr.searchable_pdf import page_image_for_layout
+
+OPTIONS = {"deskew": True, "auto_crop": True}
+
+
+def _skewed_colour_page():
+    page = Image.new("RGB", (600, 400), "white")
+    draw = ImageDraw.Draw(page)
+    for top in range(80, 300, 40):
+        draw.rectangle([120, top, 480, top + 14], fill=(200, 30, 30))
+    return page.rotate(3, resample=Image.BICUBIC, fillcolor="white")
+
+
+def test_preprocessing_records_the_rotation_and_crop():
+    geometry = {}
+    processed = preprocess_image(_skewed_colour_page(), OPTIONS, geometry=geometry)
+    assert abs(geometry["deskew_angle"] + 3) <= 0.5
+    left, top, right, bottom = geometry["crop_box"]
+    assert (right - left, bottom - top) == processed.size
+
+
+def test_page_image_keeps_the_colours_and_lines_up_with_the_ocr_pass():
+    page = _skewed_colour_page()
+    geometry = {}
+    processed = preprocess_image(page, OPTIONS, geometry=geometry)
+    layout = {"preprocessing_options": OPTIONS, "geometry": geometry, "size": list(processed.size), "lines": []}
+
+    image = page_image_for_layout(page, layout)
+    assert image.mode == "RGB" and image.size == processed.size
+    difference = np.abs(np.asarray(image.convert("L"), dtype=int) - np.asarray(processed, dtype=int))
+    assert difference.mean() < 2
+
+
+def test_empty_geometry_leaves_the_page_as_it_is():
+    page = _skewed_colour_page()
+    assert apply_geometry(page, {}) is page
+    assert page_image_for_layout(page, {"preprocessing_options": {}, "geometry": {}, "lines": []}) is page
+    assert page_image_for_layout(page, {"tiled": True, "preprocessing_options": OPTIONS, "lines": []}) is page
@@ -0,0 +1,35 @@
+import pytest
+
+from doc_core.jobs import share_workers
+
+
+@pytest.mark.parametrize("sizes, workers", [
+    ([1, 1, 1], 8),
+    ([10, 1, 1], 8),
+    ([5, 3, 2], 7),
+    ([1, 1, 1, 1, 1, 1, 1], 8),
+    ([0, 0], 5),
+    ([100], 6),
+])
+def test_shares_add_up_to_the_workers(sizes, workers):
+    shares = share_workers(sizes, workers)
+    assert sum(shares) == workers
+    assert min(shares) >= 1
+
+
+def test_rounding_never_exceeds_the_workers():
+    # Rounding each share separately would give 3 + 3 + 3 = 9
+    assert share_workers([1, 1, 1], 8) == [3, 3, 2]
+
+
+def test_largest_file_gets_most_workers():
+    assert share_workers([80, 10, 10], 8) == [5, 2, 1]
+    assert share_workers([10, 80, 10], 8)[1] == 5
+
+
+def test_one_worker_per_file_when_files_outnumber_workers():
+    assert share_workers([5, 4, 3, 2, 1], 3) == [1, 1, 1, 1, 1]
+
+
+def test_no_files():
+    assert share_workers([], 4) == []
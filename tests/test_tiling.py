@@ -0,0 +1,98 @@
+from PIL import Image
+
+from doc_core.ocr import tiling
+from doc_core.ocr.tiling import TILE_OVERLAP, merge_lines, owns_word, tile_boxes
+
+
+def test_tile_cores_cover_the_page_once():
+    width, height = 7000, 5000
+    tiles = tile_boxes(width, height)
+    covered = sum((core[2] - core[0]) * (core[3] - core[1]) for _, core in tiles)
+    assert covered == width * height
+    for box, core in tiles:
+        assert box[0] <= core[0] < core[2] <= box[2] and box[1] <= core[1] < core[3] <= box[3]
+        assert box[2] <= width and box[3] <= height
+
+
+def test_small_page_is_one_tile():
+    assert tile_boxes(1000, 800) == [((0, 0, 1000, 800), (0, 0, 1000, 800))]
+
+
+def test_word_touching_an_interior_edge_is_dropped():
+    tile, core = (0, 0, 3072, 3072), (0, 0, 2560, 3072)
+    assert not owns_word([2500, 100, 3072, 140], tile, core, 6000, 3072)
+    assert owns_word([2000, 100, 2500, 140], tile, core, 6000, 3072)
+    # The page edge does not cut words
+    assert owns_word([0, 100, 300, 140], tile, core, 6000, 3072)
+
+
+def fake_page(monkeypatch, page_words):
+    """Makes every tile read the words of the page it overlaps, cut off at the tile edges"""
+    image = Image.new("L", (7000, 1200), 255)
+    tiles = iter(tile_boxes(image.width, image.height))
+
+    def image_to_data(processed_tile, ocr_lang):
+        left, top, right, bottom = next(tiles)[0]
+        words = []
+        for text, box in page_words:
+            cut = [max(box[0], left), max(box[1], top), min(box[2], right), min(box[3], bottom)]
+            if cut[0] >= cut[2] or cut[1] >= cut[3]:
+                continue
+            # A cut word is read only partly
+            shown = text[:max(1, len(text) * (cut[2] - cut[0]) // (box[2] - box[0]))]
+            words.append({"text": shown, "conf": 90,
+                          "box": [cut[0] - left, cut[1] - top, cut[2] - left, cut[3] - top]})
+        return words
+
+    monkeypatch.setattr(tiling, "preprocess_image", lambda tile, options, profile=None: tile)
+    monkeypatch.setattr(tiling.engine, "image_to_data", image_to_data)
+    return image
+
+
+def test_words_across_tile_seams_are_kept_once_and_whole(monkeypatch):
+    # A 600 px word (a long word at 600 DPI) across each seam, near each tile edge and inside the tiles
+    width = 600
+    assert width < TILE_OVERLAP
+    starts = [100, 1800, 2500, 2800, 3000, 4500, 5100, 6300]
+    page_words = [(f"word{i}" + "x" * 20, [start, 500, start + width, 560]) for i, start in enumerate(starts)]
+    image = fake_page(monkeypatch, page_words)
+
+    layout = tiling.recognize_tiled(image, "eng", {})
+    assert layout["tiled"] and layout["size"] == [7000, 1200]
+    assert len(layout["lines"]) == 1
+    assert [(word["text"], word["box"]) for word in layout["lines"][0]["words"]] == page_words
+
+
+def test_merge_lines_orders_words_and_splits_paragraphs():
+    words = [
+        {"text": "world", "conf": 90, "box": [200, 10, 300, 40]},
+        {"text": "hello", "conf": 90, "box": [10, 12, 150, 42]},
+        {"text": "again", "conf": 90, "box": [10, 60, 150, 90]},
+        {"text": "later", "conf": 90, "box": [10, 300, 150, 330]},
+    ]
+    lines = merge_lines(words)
+    assert [[word["text"] for word in line["words"]] for line in lines] == [["hello", "world"], ["again"], ["later"]]
+    assert [line["par"] for line in lines] == [1, 1, 2]
+    assert lines[0]["box"] == [10, 10, 300, 42]
+    assert merge_lines([]) == []
+
+
+def test_pdf_page_is_rendered_tile_by_tile(monkeypatch):
+    regions = []
+
+    def render_pdf_region(pdf_path, page_index, dpi, box=None):
+        regions.append((dpi, box))
+        if box is None:
+            return Image.new("RGB", (2000, 1400), "white")
+        return Image.new("RGB", (box[2] - box[0], box[3] - box[1]), "white")
+
+    monkeypatch.setattr(tiling, "render_pdf_region", render_pdf_region)
+    monkeypatch.setattr(tiling.engine, "image_to_data", lambda tile, ocr_lang: [])
+    page = tiling.PdfPageTiles("doc.pdf", 0, 600, (9000, 6300), "hash")
+
+    options = {"apply_threshold": True, "threshold_method": "otsu"}
+    layout = tiling.recognize_tiled(page, "eng", options)
+    assert layout["size"] == [9000, 6300]
+    assert [box for _, box in regions[1:]] == [box for box, _ in tile_boxes(9000, 6300)]
+    # Only the threshold overview is rendered whole, at a reduced resolution
+    assert regions[0] == (600 * 2000 / 9000, None)
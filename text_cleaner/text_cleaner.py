@@ -1,13 +1,9 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import PyPDF2
 import docx
-import re
 import nltk
-from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize, sent_tokenize
-from TurkishStemmer import TurkishStemmer
 from nltk.util import ngrams
 from sklearn.feature_extraction.text import TfidfVectorizer
 from collections import Counter
@@ -15,7 +11,6 @@ import io
 import pickle
 import string
 from typing import List, Optional, Dict, Tuple
-import zeyrek
 import json
 from datetime import datetime
 import matplotlib.pyplot as plt
@@ -23,131 +18,23 @@ import seaborn as sns
 from wordcloud import WordCloud
 from difflib import SequenceMatcher
 
+from doc_core.pdf_text import extract_pdf_text
+from doc_core.cleaning import clean_text
+
 # NLTK kaynaklarını indir
 nltk.download('punkt')
 nltk.download('stopwords')
 nltk.download('wordnet')
 nltk.download('averaged_perceptron_tagger')
 
-# Türkçe morfolojik analiz için Zeyrek
-analyzer = zeyrek.MorphAnalyzer()
-
-# Türkçe stemmer
-stemmer = TurkishStemmer()
-
-def normalize_turkish_chars(text: str) -> str:
-    """Türkçe karakterleri korur ve diğer özel karakterleri temizler."""
-    # Türkçe karakterleri koru
-    text = text.replace('i', 'i').replace('I', 'İ')
-    text = text.replace('ı', 'ı').replace('İ', 'İ')
-    
-    # Diğer özel karakterleri temizle
-    special_chars = {
-        '\'': '',
-        '"': '',
-        ''': '',
-        ''': '',
-        '"': '',
-        '"': '',
-        '«': '',
-        '»': '',
-        '—': '-',
-        '–': '-'
-    }
-    for old, new in special_chars.items():
-        text = text.replace(old, new)
-    return text
-
-def get_turkish_stopwords() -> set:
-    """Genişletilmiş Türkçe stopwords listesi."""
-    stop_words = set(stopwords.words('turkish'))
-    
-    # Ek Türkçe stop words
-    additional_stops = {
-        've', 'veya', 'ile', 'için', 'gibi', 'kadar', 'göre', 'ancak', 'fakat',
-        'ama', 'lakin', 'yani', 'da', 'de', 'ki', 'mi', 'mu', 'mı', 'mü',
-        'bir', 'bu', 'şu', 'şey', 'böyle', 'şöyle', 'öyle', 'nasıl', 'neden',
-        'ne', 'niye', 'kim', 'hangi', 'hani', 'çünkü', 'zira', 'eğer', 'ise',
-        'ama', 'fakat', 'lakin', 'yalnız', 'ancak', 'oysa', 'oysaki', 'halbuki',
-        'üzere', 'diye', 'ayrıca', 'hem', 'bile', 'dahi'
-    }
-    stop_words.update(additional_stops)
-    return stop_words
-
-def clean_turkish_text(text: str) -> str:
-    """Türkçe metni temizler ve düzenler."""
-    # Gereksiz boşlukları temizle
-    text = ' '.join(text.split())
-    
-    # Sayıları temizle (tarihler hariç)
-    text = re.sub(r'(?<!\d)\d+(?!\d)', '', text)
-    
-    # URL'leri temizle
-    text = re.sub(r'http\S+|www.\S+', '', text)
-    
-    # E-posta adreslerini temizle
-    text = re.sub(r'\S+@\S+', '', text)
-    
-    return text
-
-def turkish_stem(word: str, stem_type: str = 'turkish') -> str:
-    """Türkçe kelime kökünü bulur."""
-    if stem_type == 'none':
-        return word
-    elif stem_type == 'turkish':
-        return stemmer.stem(word)
-    elif stem_type == 'zeyrek':
-        results = analyzer.analyze(word)
-        if results:
-            return results[0][0].lemma
-        return word
-    return word
-
-def clean_text(text: str, 
-               normalize_chars: bool = True,
-               remove_nums: bool = True,
-               remove_puncts: bool = True,
-               remove_stopwords: bool = True,
-               stem_type: str = 'turkish') -> str:
-    """Gelişmiş Türkçe metin temizleme fonksiyonu"""
-    
-    # Hiçbiri seçeneği kontrol edilir
-    if stem_type == 'none' and not any([normalize_chars, remove_nums, remove_puncts, remove_stopwords]):
-        return text
-    
-    # Temel temizlik
-    text = clean_turkish_text(text)
-    
-    if normalize_chars:
-        text = normalize_turkish_chars(text)
-    
-    # Noktalama işaretlerini temizle (özel karakterleri koru)
-    if remove_puncts:
-        text = re.sub(r'[^\w\s\u0080-\uffff]', ' ', text)
-    
-    # Fazla boşlukları temizle
-    text = ' '.join(text.split())
-    
-    # Kelimelere ayır
-    words = word_tokenize(text)
-    
-    # Küçük harfe çevir (İ ve I harflerini doğru şekilde)
-    words = [word.replace('I', 'ı').replace('İ', 'i').lower() for word in words]
-    
-    if remove_stopwords:
-        stop_words = get_turkish_stopwords()
-        words = [word for word in words if word not in stop_words]
-    
-    # Stemming/Lemmatization uygula
-    words = [turkish_stem(word, stem_type) for word in words]
-    
-    return ' '.join(words)
-
 def read_pdf(file):
-    pdf_reader = PyPDF2.PdfReader(file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text()
+    progress_bar = st.progress(0.0, text="PDF sayfaları okunuyor...")
+    text = extract_pdf_text(
+        file,
+        separator="",
+        progress_callback=lambda done, total: progress_bar.progress(done / total, text=f"Sayfa {done}/{total} okunuyor...")
+    )
+    progress_bar.empty()
     return text
 
 def read_docx(file):
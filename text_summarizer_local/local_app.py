@@ -1,9 +1,12 @@
 import streamlit as st
-import PyPDF2
 import docx
 import nltk
 import io
-from local_summarizer import MetinOzetleyici
+import os
+import time
+
+from doc_core.pdf_text import extract_pdf_text
+from doc_core.jobs import JOB_DIR, JobQueue, WorkerPool, QUEUED, RUNNING, FAILED
 
 # Page configuration
 st.set_page_config(
@@ -56,10 +59,13 @@ st.markdown('<h1 class="main-header">📝 Yerel Metin Özetleyici</h1>', unsafe_
 st.markdown('<p class="sub-header">PDF, TXT veya DOCX dosyalarınızı yükleyin ve yapay zeka kullanmadan özetleyin!</p>', unsafe_allow_html=True)
 
 def extract_text_from_pdf(file):
-    pdf_reader = PyPDF2.PdfReader(file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text()
+    progress_bar = st.progress(0.0, text="PDF sayfaları okunuyor...")
+    text = extract_pdf_text(
+        file,
+        separator="",
+        progress_callback=lambda done, total: progress_bar.progress(done / total, text=f"Sayfa {done}/{total} okunuyor...")
+    )
+    progress_bar.empty()
     return text
 
 def extract_text_from_docx(file):
@@ -72,8 +78,18 @@ def extract_text_from_docx(file):
 def extract_text_from_txt(file):
     return file.getvalue().decode("utf-8")
 
-# Initialize summarizer
-summarizer = MetinOzetleyici()
+@st.cache_resource
+def get_job_queue():
+    """Özetleme işçi süreçlerini sunucu başına bir kez başlatır ve iş kuyruğunu döndürür"""
+    db_path = os.path.join(JOB_DIR, "ozet.sqlite3")
+    WorkerPool(db_path).start()
+    return JobQueue(db_path)
+
+job_queue = get_job_queue()
+
+# Sayfa yenilendiğinde bu sekmenin işini geri yükle
+if "ozet_job" not in st.session_state and "job" in st.query_params:
+    st.session_state.ozet_job = st.query_params["job"]
 
 # File upload
 uploaded_file = st.file_uploader("Dosyanızı buraya yükleyin", type=['pdf', 'txt', 'docx'])
@@ -108,35 +124,64 @@ if uploaded_file is not None:
             with st.expander("Orijinal Metin"):
                 st.text(text)
             
-            # Summarize button
+            # Summarize button: the summary is produced by a background worker
             if st.button("Özetle"):
-                with st.spinner("Özet oluşturuluyor..."):
-                    # Summarize text
-                    summary = summarizer.ozetle(text, summary_length)
-                    
-                    # Show statistics
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("Orijinal Kelime Sayısı", len(text.split()))
-                    with col2:
-                        st.metric("Özet Kelime Sayısı", len(summary.split()))
-                    with col3:
-                        st.metric("Sıkıştırma Oranı", f"%{int((1 - len(summary.split()) / len(text.split())) * 100)}")
-                    
-                    # Show summary
-                    st.subheader("Özet")
-                    st.markdown(f'<div class="answer-container">{summary}</div>', unsafe_allow_html=True)
-                    
-                    # Download summary button
-                    st.download_button(
-                        label="Özeti İndir",
-                        data=summary,
-                        file_name="ozet.txt",
-                        mime="text/plain"
-                    )
+                job_id = job_queue.submit(
+                    "local_summarizer:ozetle_gorevi",
+                    {"metin": text, "ozet_uzunlugu": summary_length}
+                )
+                st.session_state.ozet_job = job_id
+                st.query_params["job"] = job_id
     except Exception as e:
         st.error(f"An error occurred: {str(e)}")
 
+# Poll the status of the submitted job
+poll_job = False
+if "ozet_job" in st.session_state:
+    job = job_queue.get(st.session_state.ozet_job)
+    
+    if job is None:
+        st.warning("Özetleme işi bulunamadı.")
+        del st.session_state.ozet_job
+    elif job["state"] in (QUEUED, RUNNING):
+        if job["state"] == QUEUED:
+            st.info("Boşta bir işçi bekleniyor...")
+        st.progress(job["progress"], text=job["message"] or "Özet oluşturuluyor...")
+        st.caption(f"İş numarası: {job['id']} - sayfayı yenileyebilirsiniz, iş devam eder.")
+        poll_job = True
+    elif job["state"] == FAILED:
+        st.error(f"An error occurred: {job['error'].strip().splitlines()[-1]}")
+    else:
+        original_text = job["payload"]["metin"]
+        summary = job["result"]["ozet"]
+        
+        # Show statistics
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Orijinal Kelime Sayısı", len(original_text.split()))
+        with col2:
+            st.metric("Özet Kelime Sayısı", len(summary.split()))
+        with col3:
+            st.metric("Sıkıştırma Oranı", f"%{int((1 - len(summary.split()) / len(original_text.split())) * 100)}")
+        
+        graf = job["result"].get("graf")
+        if graf:
+            st.caption(f"{graf['cumle_sayisi']} cümle, {graf['kenar_sayisi']} benzerlik bağlantısı; "
+                       f"PageRank {graf['pagerank_adim']} adımda "
+                       f"{'yakınsadı' if graf['pagerank_yakinsadi'] else 'yakınsamadı'}.")
+        
+        # Show summary
+        st.subheader("Özet")
+        st.markdown(f'<div class="answer-container">{summary}</div>', unsafe_allow_html=True)
+        
+        # Download summary button
+        st.download_button(
+            label="Özeti İndir",
+            data=summary,
+            file_name="ozet.txt",
+            mime="text/plain"
+        )
+
 # Footer
 st.markdown("---")
 st.markdown("Made with ❤️ by Ugur Demirkaya")
@@ -169,4 +214,9 @@ st.markdown("""
             <p style='color: #666; font-size: 14px;'>Desteğiniz için teşekkürler!</p>
         </div>
     </div>
-""", unsafe_allow_html=True) 
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Check the running job again after a short pause
+if poll_job:
+    time.sleep(1)
+    st.rerun()
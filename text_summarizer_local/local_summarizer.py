@@ -1,15 +1,26 @@
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.cluster.util import cosine_distance
 from nltk.tokenize.punkt import PunktSentenceTokenizer
 from nltk.tag import pos_tag
 from string import punctuation
 import numpy as np
-from typing import List, Dict, Tuple
-import networkx as nx
+from scipy import sparse
+from collections import Counter
+from typing import List, Dict, Tuple, Optional
 import re
 
+# Bu kadar cümleye kadar her cümle tüm komşularıyla bağlanır (sonuçlar tam grafla aynıdır);
+# daha uzun metinlerde her cümle yalnızca en benzer KOMSU_SAYISI cümleyi tutar
+TAM_GRAF_SINIRI = 2000
+KOMSU_SAYISI = 20
+# Benzerlikleri hesaplanan satır bloğu; bellek n x n yerine blok x n ile sınırlı kalır
+BLOK_SATIR = 512
+# PageRank: sönüm katsayısı, yakınsama toleransı (düğüm başına) ve en fazla adım sayısı
+PAGERANK_SONUM = 0.85
+PAGERANK_TOLERANS = 1.0e-6
+PAGERANK_EN_FAZLA_ADIM = 100
+
 class MetinOzetleyici:
     def __init__(self):
         # Gerekli NLTK verilerini indir
@@ -63,10 +74,11 @@ class MetinOzetleyici:
         
         return temiz_cumleler
     
-    def _cumle_onem_skoru(self, cumle: str) -> float:
-        """Cümlenin önem skorunu hesaplar."""
+    def _cumle_onem_skoru(self, cumle: str, kelimeler: Optional[List[str]] = None) -> float:
+        """Cümlenin önem skorunu hesaplar (kelimeler verilirse cümle yeniden ayrılmaz)."""
         # Kelimeleri ve POS etiketlerini al
-        kelimeler = word_tokenize(cumle.lower())
+        if kelimeler is None:
+            kelimeler = word_tokenize(cumle.lower())
         pos_tags = pos_tag(kelimeler)
         
         # Önemli kelime sayısı
@@ -82,48 +94,140 @@ class MetinOzetleyici:
         
         return (onemli_kelime_sayisi + anlamli_kelime_sayisi) * uzunluk_skoru
     
-    def _cumle_benzerlik_skoru(self, cumle1: str, cumle2: str) -> float:
-        """İki cümle arasındaki benzerlik skorunu hesaplar."""
-        # Cümleleri küçük harfe çevir ve kelimelere ayır
-        kelimeler1 = [word.lower() for word in word_tokenize(cumle1)]
-        kelimeler2 = [word.lower() for word in word_tokenize(cumle2)]
-        
-        # Stop words ve noktalama işaretlerini kaldır
-        kelimeler1 = [w for w in kelimeler1 if w not in self.stop_words and w not in self.punctuation]
-        kelimeler2 = [w for w in kelimeler2 if w not in self.stop_words and w not in self.punctuation]
-        
-        # Tüm benzersiz kelimeleri bul
-        tum_kelimeler = list(set(kelimeler1 + kelimeler2))
-        
-        # Her cümle için vektör oluştur
-        vektor1 = [0] * len(tum_kelimeler)
-        vektor2 = [0] * len(tum_kelimeler)
-        
-        # Vektörleri doldur (TF-IDF benzeri ağırlıklandırma)
-        for i, kelime in enumerate(tum_kelimeler):
-            if kelime in kelimeler1:
-                vektor1[i] = 1 + kelimeler1.count(kelime) * 0.3
-            if kelime in kelimeler2:
-                vektor2[i] = 1 + kelimeler2.count(kelime) * 0.3
-        
-        # Kosinüs benzerliğini hesapla
-        return 1 - cosine_distance(vektor1, vektor2)
+    def _terim_matrisi(self, cumle_kelimeleri: List[List[str]]) -> sparse.csr_matrix:
+        """
+        Cümlelerin küçük harfli kelimelerinden ağırlıklı terim matrisini oluşturur.
+        
+        Args:
+            cumle_kelimeleri: Her cümlenin küçük harfli kelimeleri
+            
+        Returns:
+            Cümle x kelime seyrek matrisi; cümlede geçen her kelimenin
+            ağırlığı 1 + 0.3 * tekrar sayısı (stop words ve noktalama hariç)
+        """
+        sozluk = {}
+        satirlar, sutunlar, agirliklar = [], [], []
+        for i, kelimeler in enumerate(cumle_kelimeleri):
+            sayilar = Counter(w for w in kelimeler if w not in self.stop_words and w not in self.punctuation)
+            for kelime, sayi in sayilar.items():
+                satirlar.append(i)
+                sutunlar.append(sozluk.setdefault(kelime, len(sozluk)))
+                agirliklar.append(1 + sayi * 0.3)
+        
+        return sparse.csr_matrix((agirliklar, (satirlar, sutunlar)), shape=(len(cumle_kelimeleri), len(sozluk)))
     
-    def _cumle_baglanti_kontrolu(self, cumle1: str, cumle2: str) -> bool:
-        """İki cümle arasında mantıksal bağlantı olup olmadığını kontrol eder."""
+    def _baglac_iceriyor(self, kelimeler: List[str]) -> bool:
+        """Cümlenin (küçük harfli kelimeleri) önceki cümleye bağlayan bir bağlaç içerip içermediğini kontrol eder."""
         baglac_listesi = ['ancak', 'fakat', 'lakin', 'ama', 'çünkü', 'zira', 
                          'dolayısıyla', 'böylece', 'ayrıca', 'dahası']
         
-        kelimeler2 = word_tokenize(cumle2.lower())
-        return any(baglac in kelimeler2 for baglac in baglac_listesi)
+        return any(baglac in kelimeler for baglac in baglac_listesi)
+    
+    def _benzerlik_matrisi(self, terimler: sparse.csr_matrix, baglacli: np.ndarray,
+                           komsu_sayisi: Optional[int] = None, esik: float = 0.0) -> sparse.csr_matrix:
+        """
+        Cümle çiftlerinin benzerliklerini satır blokları halinde seyrek çarpımla hesaplar.
+        
+        Args:
+            terimler: Ağırlıklı terim matrisi (bkz. _terim_matrisi)
+            baglacli: Her cümle için bağlaç içerip içermediği
+            komsu_sayisi: Her cümlede tutulacak en benzer komşu sayısı (None: hepsi)
+            esik: Bu değerden büyük olmayan benzerlikler atılır
+            
+        Returns:
+            Seyrek benzerlik matrisi; [i, j] iki cümlenin kosinüs benzerliği,
+            j bağlaçlı ise 1.2 katı, köşegen sıfır
+        """
+        # Satırları birim uzunluğa getir (kelimesi kalmayan cümleler sıfır kalır)
+        normlar = np.sqrt(np.asarray(terimler.multiply(terimler).sum(axis=1)).ravel())
+        ters_normlar = np.divide(1.0, normlar, out=np.zeros_like(normlar), where=normlar > 0)
+        birim = (sparse.diags(ters_normlar) @ terimler).tocsr()
+        birim_t = birim.T.tocsr()
+        bonus = np.where(baglacli, 1.2, 1.0)
+        
+        bloklar = []
+        for baslangic in range(0, birim.shape[0], BLOK_SATIR):
+            blok = (birim[baslangic:baslangic + BLOK_SATIR] @ birim_t).tocsr()
+            satirlar = np.repeat(np.arange(blok.shape[0]), np.diff(blok.indptr))
+            
+            # Bağlaçlı cümlelere bonus ver
+            blok.data *= bonus[blok.indices]
+            # Cümlenin kendisiyle benzerliği ve eşiği geçmeyenler hariç
+            blok.data[(blok.indices == satirlar + baslangic) | (blok.data <= esik)] = 0
+            blok.eliminate_zeros()
+            
+            if komsu_sayisi is not None:
+                blok = self._en_yakin_komsular(blok, komsu_sayisi)
+            bloklar.append(blok)
+        
+        return sparse.vstack(bloklar, format='csr')
+    
+    def _en_yakin_komsular(self, benzerlik: sparse.csr_matrix, komsu_sayisi: int) -> sparse.csr_matrix:
+        """Her satırda yalnızca en büyük komsu_sayisi benzerliği tutar."""
+        for i in np.flatnonzero(np.diff(benzerlik.indptr) > komsu_sayisi):
+            satir = benzerlik.data[benzerlik.indptr[i]:benzerlik.indptr[i + 1]]
+            # Kısmi sıralama: en büyük komsu_sayisi değer sona gelir, öncekiler atılır
+            satir[np.argpartition(satir, -komsu_sayisi)[:-komsu_sayisi]] = 0
+        benzerlik.eliminate_zeros()
+        return benzerlik
+    
+    def _cumle_grafi(self, benzerlik: sparse.csr_matrix) -> sparse.csr_matrix:
+        """
+        Benzerlik matrisinden yönsüz, ağırlıklı cümle grafını (CSR) oluşturur.
+        
+        Bir çift için iki yönde de benzerlik varsa sonraki cümlenin satırındaki
+        değer kullanılır, yalnızca birinde varsa o değer (networkx'in yönsüz
+        grafa dönüştürmesiyle aynı sonuç).
+        """
+        alt = sparse.tril(benzerlik, k=-1, format='csr')
+        ust = sparse.triu(benzerlik, k=1, format='csr').T.tocsr()
+        # Üst üçgende olup alt üçgende karşılığı olmayan kenarlar
+        alt = alt + ust - ust.multiply(alt.astype(bool))
+        return (alt + alt.T).tocsr()
+    
+    def _pagerank(self, graf: sparse.csr_matrix, sonum: float = PAGERANK_SONUM,
+                  tolerans: float = PAGERANK_TOLERANS, en_fazla_adim: int = PAGERANK_EN_FAZLA_ADIM) -> Tuple[np.ndarray, int, bool]:
+        """
+        Ağırlıklı PageRank skorlarını vektörel kuvvet yinelemesiyle hesaplar.
+        
+        Args:
+            graf: Kenar ağırlıkları matrisi (bkz. _cumle_grafi)
+            sonum: Sönüm katsayısı
+            tolerans: Düğüm başına yakınsama toleransı (adımlar arası L1 farkı)
+            en_fazla_adim: En fazla yineleme sayısı
+            
+        Returns:
+            (skorlar, adım sayısı, yakınsadı mı); kenarı olmayan cümlelerin
+            skoru tüm cümlelere eşit dağıtılır
+        """
+        n = graf.shape[0]
+        derece = np.asarray(graf.sum(axis=1)).ravel()
+        ters_derece = np.divide(1.0, derece, out=np.zeros_like(derece), where=derece != 0)
+        # Satırları normalleştirilmiş geçiş matrisinin transpozu: x @ P yerine P_t @ x
+        gecis_t = (sparse.diags(ters_derece) @ graf).T.tocsr()
+        kenarsiz = derece == 0
+        
+        x = np.full(n, 1.0 / n)
+        for adim in range(1, en_fazla_adim + 1):
+            onceki = x
+            x = sonum * (gecis_t @ x + x[kenarsiz].sum() / n) + (1 - sonum) / n
+            if np.abs(x - onceki).sum() < n * tolerans:
+                return x, adim, True
+        return x, en_fazla_adim, False
     
-    def ozetle(self, metin: str, ozet_uzunlugu: float = 0.3) -> str:
+    def ozetle(self, metin: str, ozet_uzunlugu: float = 0.3, komsu_sayisi: Optional[int] = None,
+               benzerlik_esigi: float = 0.0, istatistik: Optional[Dict] = None) -> str:
         """
         Metni özetler.
         
         Args:
             metin: Özetlenecek metin
             ozet_uzunlugu: Özetin orijinal metne oranı (0-1 arası)
+            komsu_sayisi: Grafta her cümlenin tuttuğu en benzer komşu sayısı
+                (None: TAM_GRAF_SINIRI cümleye kadar hepsi, sonrasında KOMSU_SAYISI)
+            benzerlik_esigi: Bu değerden büyük olmayan benzerlikler grafa alınmaz
+            istatistik: Verilirse 'cumle_sayisi', 'kenar_sayisi', 'pagerank_adim'
+                ve 'pagerank_yakinsadi' alanlarıyla doldurulan sözlük
             
         Returns:
             Özetlenmiş metin
@@ -137,28 +241,29 @@ class MetinOzetleyici:
         if len(cumleler) <= 1:
             return metin
         
+        # Küçük harfli kelimeler bir kez çıkarılır; önem skoru, bağlaç kontrolü ve terim matrisi bunları kullanır
+        kucuk_kelimeler = [[word.lower() for word in word_tokenize(cumle)] for cumle in cumleler]
+        
         # Her cümle için önem skoru hesapla
-        onem_skorlari = {i: self._cumle_onem_skoru(cumle) 
+        onem_skorlari = {i: self._cumle_onem_skoru(cumle, kucuk_kelimeler[i]) 
                         for i, cumle in enumerate(cumleler)}
         
         # Benzerlik matrisini oluştur
-        benzerlik_matrisi = np.zeros((len(cumleler), len(cumleler)))
-        for i in range(len(cumleler)):
-            for j in range(len(cumleler)):
-                if i != j:
-                    benzerlik = self._cumle_benzerlik_skoru(cumleler[i], cumleler[j])
-                    # Bağlaçlı cümlelere bonus ver
-                    if self._cumle_baglanti_kontrolu(cumleler[i], cumleler[j]):
-                        benzerlik *= 1.2
-                    benzerlik_matrisi[i][j] = benzerlik
+        baglacli = np.array([self._baglac_iceriyor(kelimeler) for kelimeler in kucuk_kelimeler])
+        if komsu_sayisi is None and len(cumleler) > TAM_GRAF_SINIRI:
+            komsu_sayisi = KOMSU_SAYISI
+        benzerlik_matrisi = self._benzerlik_matrisi(self._terim_matrisi(kucuk_kelimeler), baglacli,
+                                                    komsu_sayisi, benzerlik_esigi)
         
         # PageRank algoritmasını uygula
-        nx_graph = nx.from_numpy_array(benzerlik_matrisi)
-        scores = nx.pagerank(nx_graph)
+        graf = self._cumle_grafi(benzerlik_matrisi)
+        pagerank, adim, yakinsadi = self._pagerank(graf)
+        if istatistik is not None:
+            istatistik.update(cumle_sayisi=len(cumleler), kenar_sayisi=graf.nnz // 2,
+                              pagerank_adim=adim, pagerank_yakinsadi=yakinsadi)
         
         # PageRank skorlarını önem skorları ile birleştir
-        for i in scores:
-            scores[i] = scores[i] * 0.7 + onem_skorlari[i] * 0.3
+        scores = {i: float(pagerank[i]) * 0.7 + onem_skorlari[i] * 0.3 for i in range(len(cumleler))}
         
         # Cümleleri skorlarına göre sırala
         ranked_sentences = sorted(
@@ -181,6 +286,31 @@ class MetinOzetleyici:
         
         return ozet
 
+# İşçi süreci başına tek özetleyici (NLTK verileri bir kez yüklenir)
+_ozetleyici = None
+
+def ozetle_gorevi(payload: Dict, veri: bytes, ilerleme) -> Dict:
+    """
+    İş kuyruğu görevi: metni bir işçi sürecinde özetler.
+    
+    Args:
+        payload: 'metin' ve 'ozet_uzunlugu' alanlarını içeren sözlük
+        veri: Kullanılmaz (metin payload içinde gelir)
+        ilerleme: ilerleme(oran, mesaj) şeklinde çağrılan fonksiyon
+        
+    Returns:
+        {'ozet': özet metni, 'graf': cümle grafı ve PageRank istatistikleri (bkz. MetinOzetleyici.ozetle)}
+    """
+    global _ozetleyici
+    if _ozetleyici is None:
+        ilerleme(0.1, "Dil verileri yükleniyor...")
+        _ozetleyici = MetinOzetleyici()
+    
+    ilerleme(0.3, "Özet oluşturuluyor...")
+    istatistik = {}
+    ozet = _ozetleyici.ozetle(payload["metin"], payload["ozet_uzunlugu"], istatistik=istatistik)
+    return {"ozet": ozet, "graf": istatistik}
+
 if __name__ == "__main__":
     # Test metni
     test_metin = """
@@ -14,10 +14,10 @@ import streamlit as st
 import os
 import tempfile
 from pathlib import Path
-import PyPDF2
-from docx import Document
 import io
-import re
+
+from doc_core.readers import read_pdf, read_docx, read_txt
+from doc_core.summarizer import TextProcessor
 
 # Uygulama yapılandırması
 st.set_page_config(
@@ -34,10 +34,12 @@ class FileProcessor:
     def extract_text_from_pdf(file):
         """PDF dosyasından metin çıkarır"""
         try:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
+            progress_bar = st.progress(0.0, text="📖 PDF sayfaları okunuyor...")
+            text = read_pdf(
+                file,
+                progress_callback=lambda done, total: progress_bar.progress(done / total, text=f"📖 Sayfa {done}/{total} okunuyor...")
+            )
+            progress_bar.empty()
             return text
         except Exception as e:
             st.error(f"PDF okuma hatası: {str(e)}")
@@ -47,11 +49,7 @@ class FileProcessor:
     def extract_text_from_docx(file):
         """DOCX dosyasından metin çıkarır"""
         try:
-            doc = Document(file)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            return read_docx(file)
         except Exception as e:
             st.error(f"DOCX okuma hatası: {str(e)}")
             return None
@@ -60,173 +58,11 @@ class FileProcessor:
     def extract_text_from_txt(file):
         """TXT dosyasından metin çıkarır - Türkçe karakter desteği ile"""
         try:
-            content = file.read()
-            # Türkçe karakterler için farklı encoding'leri dene
-            encodings = ['utf-8', 'windows-1254', 'latin-1']
-            
-            for encoding in encodings:
-                try:
-                    text = content.decode(encoding)
-                    return text
-                except UnicodeDecodeError:
-                    continue
-            
-            # Hiçbiri çalışmazsa son çare
-            return content.decode('utf-8', errors='ignore')
-            
+            return read_txt(file)
         except Exception as e:
             st.error(f"TXT okuma hatası: {str(e)}")
             return None
 
-class TextProcessor:
-    """Metin işleme ve özetleme sınıfı"""
-    
-    @staticmethod
-    def clean_text(text):
-        """Metni temizler ve düzenler"""
-        if not text:
-            return ""
-        
-        # Satır sonlarını normalize et
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
-        
-        # Birden fazla boşluğu tek boşlukla değiştir
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Paragraf sonlarını koru
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        
-        # Sayfa numaralarını kaldır
-        text = re.sub(r'\n\s*\d+\s*\n', '\n', text)
-        
-        return text.strip()
-
-    @staticmethod
-    def find_key_sentences(sentences, target_count=4):
-        """Anahtar cümleleri bulur - Türkçe dil özelliklerine göre optimize edilmiş"""
-        if len(sentences) <= target_count:
-            return sentences
-        
-        # Türkçe anahtar kelimeler
-        key_terms = [
-            'sonuç', 'önemli', 'ana', 'temel', 'başlıca', 'genel', 'toplam', 'değerlendirme',
-            'karar', 'öneri', 'hedef', 'amaç', 'planlama', 'strateji', 'politika', 'uygulama',
-            'problem', 'çözüm', 'analiz', 'inceleme', 'araştırma', 'gelişim', 'ilerleme',
-            'bulgular', 'veriler', 'istatistik', 'rakamlar', 'oran', 'artış', 'azalış'
-        ]
-        
-        scored_sentences = []
-        
-        for i, sentence in enumerate(sentences):
-            score = 0
-            sentence_lower = sentence.lower()
-            
-            # Uzunluk puanı (optimal cümle uzunluğu)
-            length = len(sentence.split())
-            if 10 <= length <= 25:
-                score += 3
-            elif 8 <= length <= 30:
-                score += 2
-            elif 5 <= length <= 35:
-                score += 1
-            
-            # Anahtar kelime puanı
-            for term in key_terms:
-                if term in sentence_lower:
-                    score += 2
-            
-            # Pozisyon puanı
-            total_sentences = len(sentences)
-            if i < total_sentences * 0.2:  # İlk %20
-                score += 3
-            elif i > total_sentences * 0.8:  # Son %20
-                score += 2
-            
-            # Sayısal veri içeren cümleler
-            if re.search(r'\d+', sentence):
-                score += 1
-            
-            scored_sentences.append((sentence, score, i))
-        
-        # Puana göre sırala ve en iyi cümleleri seç
-        scored_sentences.sort(key=lambda x: x[1], reverse=True)
-        
-        # Orijinal sırayı koruyarak döndür
-        selected = sorted(scored_sentences[:target_count], key=lambda x: x[2])
-        return [s[0] for s in selected]
-
-    @staticmethod
-    def create_coherent_summary(sentences, word_count, total_sentences, paragraph_count):
-        """Tutarlı ve akıcı özet oluşturur"""
-        
-        if total_sentences <= 3:
-            return f"""
-**📄 BELGE ÖZETİ**
-
-**📋 İçerik Özeti:**
-{' '.join(sentences)} Bu belge kısa ve öz bir içerik sunmaktadır.
-
-**📊 Değerlendirme:**
-Toplam {word_count} kelimelik bu belge, temel konuları kapsamaktadır.
-
----
-**📈 Belge Bilgileri:** {word_count:,} kelime, {total_sentences} cümle
-"""
-        
-        # Anahtar cümleleri seç
-        key_sentences = TextProcessor.find_key_sentences(sentences, target_count=6)
-        
-        # İki paragraf oluştur
-        first_para_sentences = key_sentences[:3]
-        second_para_sentences = key_sentences[3:]
-        
-        # Geçiş kelimeleri
-        transitions_first = ["", "Ayrıca, ", "Bu kapsamda, "]
-        transitions_second = ["", "Buna ek olarak, ", "Sonuç olarak, "]
-        
-        # Paragrafları oluştur
-        first_paragraph = ""
-        for i, sentence in enumerate(first_para_sentences):
-            transition = transitions_first[i] if i < len(transitions_first) else ""
-            first_paragraph += transition + sentence + " "
-        
-        second_paragraph = ""
-        for i, sentence in enumerate(second_para_sentences):
-            transition = transitions_second[i] if i < len(transitions_second) else ""
-            second_paragraph += transition + sentence + " "
-        
-        # Belge değerlendirmesi
-        if word_count > 1000:
-            doc_assessment = "kapsamlı ve detaylı bir analiz"
-        elif word_count > 500:
-            doc_assessment = "orta düzeyde ayrıntılı bir inceleme"
-        else:
-            doc_assessment = "özet bir değerlendirme"
-        
-        return f"""
-**📄 BELGE ÖZETİ**
-
-**📋 Ana İçerik ve Konu:**
-{first_paragraph.strip()}
-
-**📊 Gelişmeler ve Sonuç:**
-{second_paragraph.strip()} Bu belge {doc_assessment} sunmaktadır.
-
----
-**📈 Belge Analizi:** {word_count:,} kelime, {paragraph_count} paragraf, {total_sentences} cümle
-"""
-
-    @classmethod
-    def summarize_text(cls, text):
-        """Ana özetleme fonksiyonu"""
-        sentences = [s.strip() for s in text.split('.') if s.strip() and len(s.strip()) > 10]
-        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-        
-        word_count = len(text.split())
-        total_sentences = len(sentences)
-        
-        return cls.create_coherent_summary(sentences, word_count, total_sentences, len(paragraphs))
-
 class StreamlitUI:
     """Streamlit kullanıcı arayüzü sınıfı"""
     